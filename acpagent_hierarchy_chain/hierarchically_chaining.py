@@ -104,7 +104,8 @@ Now, create a plan for the user's query.
                 if agent_name.lower() == agent["name"].lower():
                     try:
                         response = await agent["client"].run_sync(agent=agent_name, input=question)
-                        result = response.output[0].parts[0].content
+                        # Streaming agents return their answer as several parts.
+                        result = "".join(part.content for part in response.output[0].parts if part.content)
                         results.append(result)
                     except Exception as e:
                         result = f"Error calling agent: {e}"
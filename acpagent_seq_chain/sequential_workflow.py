@@ -24,7 +24,8 @@ async def run_rag_agent(question: str) -> str:
         run1 = await ragagent.run_sync(
             agent="rag_agent", input=f"Context: {question} What is the waiting period for rehabilitation?"
         )
-        rag_agent_output = run1.output[0].parts[0].content
+        # The RAG agent streams its answer as several parts.
+        rag_agent_output = "".join(part.content for part in run1.output[0].parts if part.content)
         print(Fore.LIGHTMAGENTA_EX+ rag_agent_output + Fore.RESET)
         print(f"{Fore.CYAN}RAG Agent Output: {rag_agent_output}{Style.RESET_ALL}")
         return rag_agent_output
@@ -0,0 +1,124 @@
+"""
+Simulation: a burst of duplicated questions against a rate-limited LLM.
+
+The LLM is a stand-in for Groq that takes --latency seconds per call and
+answers 429 once its token bucket (--rpm per minute, --burst at once) runs
+dry. Each run makes --calls LLM calls through a crew pool of --pool slots,
+as rag_agent does, and fails on its first 429. --requests runs are sent at
+once, cycling through --distinct questions, under three policies:
+
+* baseline: every run calls the LLM directly,
+* admission: calls wait in an AdmissionController sized to the same quota,
+* admission + coalescing: identical questions also share one run (SingleFlight).
+
+Usage:
+    uv run python benchmarks/bench_admission.py [--requests 120] [--distinct 30] [--rpm 1200]
+"""
+
+import argparse
+import asyncio
+import threading
+import time
+from typing import Optional
+
+from crewai_acp_rag.admission import AdmissionController, TokenBucket
+from crewai_acp_rag.coalesce import SingleFlight, normalize_question
+
+
+class RateLimited(Exception):
+    pass
+
+
+class FakeGroq:
+    """Rejects calls beyond its quota instead of queueing them."""
+
+    def __init__(self, rpm: float, burst: float, latency: float):
+        self.rate = rpm / 60.0
+        self.burst = burst
+        self.latency = latency
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.calls = 0
+        self.rejected = 0
+        self.lock = threading.Lock()
+
+    def call(self) -> str:
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.calls += 1
+            if self.tokens < 1:
+                self.rejected += 1
+                raise RateLimited()
+            self.tokens -= 1
+        time.sleep(self.latency)
+        return "answer"
+
+
+async def scenario(args: argparse.Namespace, admit: bool, coalesce: bool) -> str:
+    groq = FakeGroq(args.rpm, args.burst, args.latency)
+    admission: Optional[AdmissionController] = None
+    if admit:
+        admission = AdmissionController(requests_per_minute=args.rpm)
+        admission.requests = TokenBucket(args.rpm, capacity=args.burst)
+    inflight = SingleFlight()
+    pool = asyncio.Semaphore(args.pool)
+
+    def crew_run() -> str:
+        answer = ""
+        for _ in range(args.calls):
+            if admission is not None:
+                admission.admit()
+            answer = groq.call()
+        return answer
+
+    async def run(question: str) -> bool:
+        key = normalize_question(question)
+        try:
+            if coalesce and await inflight.wait(key) is not None:
+                return True
+            async with inflight.lead(key) as flight, pool:
+                flight.set_result(await asyncio.to_thread(crew_run))
+            return True
+        except RateLimited:
+            return False
+
+    questions = [f"What is the waiting period for procedure {i % args.distinct}?" for i in range(args.requests)]
+    start = time.perf_counter()
+    results = await asyncio.gather(*(run(q) for q in questions))
+    elapsed = time.perf_counter() - start
+
+    line = (
+        f"completed {sum(results):4d}/{len(results)}  LLM calls {groq.calls:4d}  "
+        f"429s {groq.rejected:4d}  elapsed {elapsed:6.2f} s"
+    )
+    if admission is not None:
+        stats = admission.stats()
+        line += f"  max queue {stats['max_queue_depth']:3d}  wait p95 {stats['wait_ms']['p95']:8.1f} ms"
+    if coalesce:
+        line += f"  coalesced {inflight.stats()['coalesced']}"
+    return line
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=120)
+    parser.add_argument("--distinct", type=int, default=30)
+    parser.add_argument("--rpm", type=float, default=1200)
+    parser.add_argument("--burst", type=float, default=20)
+    parser.add_argument("--calls", type=int, default=2)
+    parser.add_argument("--latency", type=float, default=0.1)
+    parser.add_argument("--pool", type=int, default=4)
+    args = parser.parse_args()
+
+    for name, admit, coalesce in (
+        ("baseline", False, False),
+        ("admission", True, False),
+        ("admission + coalescing", True, True),
+    ):
+        print(f"{name:<24} {asyncio.run(scenario(args, admit, coalesce))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Evaluation: semantic answer cache threshold on paraphrases and near misses.
+
+Fills a ``SemanticAnswerCache`` with the questions of questions.json, then
+asks each probe in cache_probes.json. A probe is either a paraphrase of one
+cached question (``matches`` names it), which should hit, or a near miss
+that only looks like one, e.g. "waiting period for cataract surgery" against
+"waiting period for rehabilitation", which must miss: a hit would return
+another benefit's answer.
+
+For each threshold it reports the paraphrases answered correctly and the
+wrong answers (a near miss that hit, or a paraphrase that hit another
+question), then recommends the lowest threshold without wrong answers plus
+--margin. The closest near misses are listed, since they set that floor.
+
+Usage:
+    uv run python benchmarks/bench_answer_cache.py [--margin 0.01]
+"""
+
+import argparse
+import json
+from pathlib import Path
+
+import numpy as np
+from common import load_questions
+
+from crewai_acp_rag.embeddings import EMBEDDER_MODEL, embed_documents
+from crewai_acp_rag.semantic_cache import SemanticAnswerCache
+
+PROBES_FILE = Path(__file__).with_name("cache_probes.json")
+THRESHOLDS = np.round(np.arange(0.80, 1.0, 0.01), 2)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--margin", type=float, default=0.01, help="Added to the lowest safe threshold")
+    parser.add_argument("--closest", type=int, default=8, help="Near misses to list")
+    args = parser.parse_args()
+
+    cached = [q["question"] for q in load_questions()]
+    probes = json.loads(PROBES_FILE.read_text(encoding="utf-8"))
+    paraphrases = sum(1 for probe in probes if probe["matches"])
+    print(f"{EMBEDDER_MODEL}: {len(cached)} cached questions, {paraphrases} paraphrases, {len(probes) - paraphrases} near misses")
+
+    cached_vectors = embed_documents(cached)
+    probe_vectors = embed_documents([probe["question"] for probe in probes])
+    scores = probe_vectors @ cached_vectors.T
+    best = scores.argmax(axis=1)
+    best_score = scores.max(axis=1)
+    correct = np.array([probe["matches"] == cached[slot] for probe, slot in zip(probes, best)])
+    expected = np.array([probe["matches"] is not None for probe in probes])
+
+    print(f"{'threshold':>9} {'paraphrase hits':>16} {'wrong answers':>14}")
+    safe = None
+    for threshold in THRESHOLDS:
+        hit = best_score >= threshold
+        right = int((hit & correct).sum())
+        wrong = int((hit & ~correct).sum())
+        if wrong == 0 and safe is None:
+            safe = float(threshold)
+        print(f"{threshold:9.2f} {right:>9d}/{paraphrases:<6d} {wrong:>14d}")
+
+    print("\nClosest near misses:")
+    near_misses = [i for i in np.argsort(-best_score) if not expected[i]][: args.closest]
+    for i in near_misses:
+        print(f"  {best_score[i]:.3f}  {probes[i]['question']!r} -> {cached[best[i]]!r}")
+
+    if safe is None:
+        print("\nNo threshold below 1.0 avoids every wrong answer")
+        return
+    recommended = round(min(safe + args.margin, 0.99), 2)
+
+    # Check the recommendation through the cache itself, as the agent would use it.
+    cache = SemanticAnswerCache(threshold=recommended, max_entries=len(cached))
+    for question, vector in zip(cached, cached_vectors):
+        cache.store(question, vector, question)
+    answers = [cache.lookup(vector) for vector in probe_vectors]
+    right = sum(answer is not None and answer == probe["matches"] for answer, probe in zip(answers, probes))
+    wrong = sum(answer is not None and answer != probe["matches"] for answer, probe in zip(answers, probes))
+    print(
+        f"\nLowest threshold without wrong answers: {safe:.2f}; recommended RAG_CACHE_THRESHOLD={recommended:.2f} "
+        f"({right}/{paraphrases} paraphrases answered from the cache, {wrong} wrong answers)"
+    )
+
+
+if __name__ == "__main__":
+    main()
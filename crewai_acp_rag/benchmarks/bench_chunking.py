@@ -0,0 +1,134 @@
+"""
+Benchmark: tool calls and prompt tokens per answer, fixed-size vs section chunking.
+
+Both chunkers index the same corpus into their own directory under
+--index-dir. By default the agent is simulated: each policy search returns
+the next 4 hybrid hits, as a follow-up search would, until one contains the
+expected phrase from questions.json (at most --max-calls tool calls). With
+the section chunker a second simulated agent first reads the section
+matching the question and only searches if that section lacks the answer.
+Prompt tokens
+count the tool output the LLM re-reads on every step after it arrives
+(4 characters per token); the fixed system prompt is left out.
+
+--live runs the real crew against Groq instead (GROQ_API_KEY required),
+counting tool calls and the prompt tokens Groq reports.
+
+Usage:
+    uv run python benchmarks/bench_chunking.py [--source rbhs_info.pdf] [--index-dir .rag_index_chunking] [--live]
+"""
+
+import argparse
+import os
+import statistics
+from typing import Callable, Dict, List, Optional, Tuple
+
+from common import contains_answer, load_questions
+
+from crewai_acp_rag.embeddings import embed_query
+from crewai_acp_rag.hybrid import HybridRetriever
+from crewai_acp_rag.index import CHUNKER_CONFIG, PolicyIndex
+from crewai_acp_rag.ingest import load_or_build_index
+from crewai_acp_rag.sections import SectionIndex
+from crewai_acp_rag.tools import format_passages
+
+STRATEGIES = ("fixed", "sections")
+TOP_K = 4
+
+
+def simulate(
+    index: PolicyIndex,
+    retriever: HybridRetriever,
+    question: Dict[str, str],
+    max_calls: int,
+    sections: Optional[SectionIndex],
+) -> Tuple[int, int, bool]:
+    """Tool calls, prompt tokens and whether the answer was found for one question."""
+    outputs: List[str] = []
+    if sections is not None:
+        hits = sections.lookup(embed_query(question["question"]), top_k=1)
+        if hits:
+            outputs.append(sections.render(hits[0][0]))
+    lookups = len(outputs)
+
+    ranked = retriever.search(question["question"], embed_query(question["question"]), top_k=TOP_K * max_calls)
+    while not contains_answer(outputs[-1] if outputs else "", question["expected"]) and len(outputs) < max_calls:
+        searches = len(outputs) - lookups
+        outputs.append(format_passages(index, ranked[searches * TOP_K : (searches + 1) * TOP_K]))
+
+    found = any(contains_answer(output, question["expected"]) for output in outputs)
+    # The LLM call after tool call i re-reads outputs 1..i.
+    prompt_tokens = sum(sum(len(output) for output in outputs[: i + 1]) // 4 for i in range(len(outputs)))
+    return len(outputs), prompt_tokens, found
+
+
+def live(index: PolicyIndex, strategy: str) -> Callable[[Dict[str, str]], Tuple[int, int, bool]]:
+    """Run one question through the real crew; returns tool calls, prompt tokens and answer check."""
+    from crewai import LLM
+    from crewai.utilities.events import ToolUsageStartedEvent, crewai_event_bus
+
+    from crewai_acp_rag.crew_pool import CrewTemplate
+    from crewai_acp_rag.tools import HybridSearchTool, SectionLookupTool
+
+    tools = [HybridSearchTool(index=index)]
+    if strategy == "sections":
+        tools.append(SectionLookupTool(index=index))
+    template = CrewTemplate(
+        agent_config=dict(
+            role="Senior Insurance Coverage Assistant",
+            goal="Use the information retrieved from the vectorstore to answer the question",
+            backstory="You are an expert insurance agent. Answer from the retrieved policy context only.",
+            allow_delegation=False,
+        ),
+        task_config=dict(description="{question}", expected_output="A clear and concise answer to the question"),
+        llm=LLM(api_key=os.environ["GROQ_API_KEY"], model="groq/llama-3.3-70b-versatile"),
+        tools=tools,
+    )
+    tool_calls = [0]
+
+    @crewai_event_bus.on(ToolUsageStartedEvent)
+    def count_tool_call(source, event) -> None:
+        tool_calls[0] += 1
+
+    def run(question: Dict[str, str]) -> Tuple[int, int, bool]:
+        tool_calls[0] = 0
+        output = template.build().kickoff(inputs={"question": question["question"]})
+        return tool_calls[0], output.token_usage.prompt_tokens, contains_answer(output.raw, question["expected"])
+
+    return run
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--source", default="rbhs_info.pdf")
+    parser.add_argument("--index-dir", default=".rag_index_chunking")
+    parser.add_argument("--max-calls", type=int, default=3)
+    parser.add_argument("--live", action="store_true", help="Run the crew against Groq")
+    args = parser.parse_args()
+
+    questions = load_questions()
+    embed_query("warm-up")
+    print(f"{len(questions)} questions{' (live)' if args.live else ''}")
+    for strategy in STRATEGIES:
+        chunker = dict(CHUNKER_CONFIG, strategy=strategy)
+        index = load_or_build_index(args.source, os.path.join(args.index_dir, strategy), chunker=chunker)
+        runs: Dict[str, Callable[[Dict[str, str]], Tuple[int, int, bool]]] = {}
+        if args.live:
+            runs["agent"] = live(index, strategy)
+        else:
+            retriever = HybridRetriever(index)
+            runs["search"] = lambda q: simulate(index, retriever, q, args.max_calls, None)
+            if strategy == "sections":
+                sections = SectionIndex(index)
+                runs["section+search"] = lambda q: simulate(index, retriever, q, args.max_calls, sections)
+
+        for name, run in runs.items():
+            calls, tokens, found = zip(*(run(q) for q in questions))
+            print(
+                f"{strategy:<9} {name:<15} {len(index):4d} chunks  tool calls/answer {statistics.mean(calls):.2f}  "
+                f"prompt tokens/answer {statistics.mean(tokens):6.0f}  answered {sum(found)}/{len(found)}"
+            )
+
+
+if __name__ == "__main__":
+    main()
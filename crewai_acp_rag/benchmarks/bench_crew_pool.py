@@ -0,0 +1,93 @@
+"""
+Micro-benchmark: per-request crew setup cost, before and after pooling.
+
+"before" builds a new Agent, Task and Crew for every request, as rag_agent
+used to. "after" borrows a crew from a CrewPool, copies it as
+``CrewPool.kickoff`` does and interpolates the question into the copy.
+Neither path calls the LLM, so only setup overhead is measured.
+
+Usage:
+    uv run python benchmarks/bench_crew_pool.py [--requests 200]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import List
+
+from crewai import LLM
+from crewai.tools import BaseTool
+
+from crewai_acp_rag.crew_pool import CrewPool, CrewTemplate
+
+QUESTION = "What is the waiting period for rehabilitation?"
+
+
+class StubSearchTool(BaseTool):
+    name: str = "Search the policy document's content"
+    description: str = "Stub tool used for benchmarking."
+
+    def _run(self, query: str) -> str:
+        return ""
+
+
+def make_template(verbose: bool) -> CrewTemplate:
+    return CrewTemplate(
+        agent_config=dict(
+            role="Senior Insurance Coverage Assistant",
+            goal="Use the information retrieved from the vectorstore to answer the question",
+            backstory="You are an expert insurance agent designed to assist with coverage queries.",
+            allow_delegation=False,
+        ),
+        task_config=dict(
+            description="{question}",
+            expected_output="A comprehensive response as to the users question",
+        ),
+        llm=LLM(model="groq/llama-3.3-70b-versatile", api_key="benchmark"),
+        tools=[StubSearchTool()],
+        verbose=verbose,
+        max_retry_limit=5,
+    )
+
+
+def report(label: str, samples: List[float]) -> None:
+    samples_us = sorted(s * 1e6 for s in samples)
+    p95 = samples_us[int(len(samples_us) * 0.95) - 1]
+    print(f"{label:<28} mean {statistics.mean(samples_us):>10.1f} us   p95 {p95:>10.1f} us")
+
+
+def bench_per_request(requests: int) -> List[float]:
+    template = make_template(verbose=True)
+    samples = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        crew = template.build()
+        crew.tasks[0].interpolate_inputs_and_add_conversation_history({"question": QUESTION})
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+async def bench_pooled(requests: int) -> List[float]:
+    pool = CrewPool(make_template(verbose=False), size=4)
+    pool.prewarm()
+    samples = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        async with pool.acquire() as crew:
+            crew.copy().tasks[0].interpolate_inputs_and_add_conversation_history({"question": QUESTION})
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    report("before (build per request)", bench_per_request(args.requests))
+    report("after (pooled crew)", asyncio.run(bench_pooled(args.requests)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Benchmark: query-embedding throughput with and without micro-batching.
+
+For each concurrency level, that many client threads embed questions from
+questions.json back to back. "unbatched" calls the model once per query, as
+rag_agent used to; "batched" goes through a QueryEmbeddingBatcher, which
+embeds the queries that arrive together in one forward pass.
+
+Usage:
+    uv run python benchmarks/bench_embed_batching.py [--queries 512] [--window-ms 2] [--max-batch 64]
+"""
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List
+
+import numpy as np
+from common import latency_summary, load_questions
+
+from crewai_acp_rag.embeddings import QueryEmbeddingBatcher, embed_documents, get_embedding_model
+
+CONCURRENCY_LEVELS = (1, 8, 64)
+
+
+def run_clients(embed: Callable[[str], np.ndarray], questions: List[str], queries: int, concurrency: int) -> tuple:
+    latencies: List[float] = []
+
+    def client(worker: int) -> None:
+        for i in range(worker, queries, concurrency):
+            start = time.perf_counter()
+            embed(questions[i % len(questions)])
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(client, range(concurrency)))
+    return queries / (time.perf_counter() - start), latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=512, help="Queries embedded per run")
+    parser.add_argument("--window-ms", type=float, default=2.0)
+    parser.add_argument("--max-batch", type=int, default=64)
+    args = parser.parse_args()
+
+    questions = [q["question"] for q in load_questions()]
+    get_embedding_model()
+    embed_documents(questions)  # warm up
+
+    print(f"{'concurrency':>11}  {'mode':<10} {'queries/s':>10}  {'mean batch':>10}  latency")
+    for concurrency in CONCURRENCY_LEVELS:
+        qps, latencies = run_clients(lambda q: embed_documents([q])[0], questions, args.queries, concurrency)
+        print(f"{concurrency:>11}  {'unbatched':<10} {qps:>10.1f}  {1.0:>10.1f}  {latency_summary(latencies)}")
+
+        batcher = QueryEmbeddingBatcher(window_ms=args.window_ms, max_batch_size=args.max_batch)
+        qps, latencies = run_clients(batcher.embed, questions, args.queries, concurrency)
+        print(
+            f"{concurrency:>11}  {'batched':<10} {qps:>10.1f}  {batcher.mean_batch_size:>10.1f}  "
+            f"{latency_summary(latencies)}"
+        )
+
+
+if __name__ == "__main__":
+    main()
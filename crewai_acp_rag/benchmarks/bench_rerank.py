@@ -0,0 +1,67 @@
+"""
+Benchmark: retrieval latency, answer recall and context size with and without reranking.
+
+"retrieval" is what HybridSearchTool shows the agent today: the top
+--top-k hybrid hits. "reranked" retrieves --candidates hits, scores them
+with the cross-encoder in one batch and keeps the best --top-n, falling back
+to the retrieval order when a rerank exceeds --budget-ms. Recall counts
+questions whose expected phrase (questions.json) is in the passages shown;
+context is the size of the tool output the LLM reads.
+
+Usage:
+    uv run python benchmarks/bench_rerank.py [--candidates 20] [--top-n 3] [--budget-ms 300]
+"""
+
+import argparse
+import statistics
+import time
+
+from common import contains_answer, latency_summary, load_questions
+
+from crewai_acp_rag.embeddings import embed_query
+from crewai_acp_rag.hybrid import HybridRetriever
+from crewai_acp_rag.ingest import load_or_build_index
+from crewai_acp_rag.rerank import RERANKER_MODEL, Reranker
+from crewai_acp_rag.tools import candidate_count, format_passages, rerank_hits
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--source", default="rbhs_info.pdf")
+    parser.add_argument("--index-dir", default=".rag_index")
+    parser.add_argument("--model", default=RERANKER_MODEL)
+    parser.add_argument("--top-k", type=int, default=4, help="Passages shown without reranking")
+    parser.add_argument("--candidates", type=int, default=20)
+    parser.add_argument("--top-n", type=int, default=3)
+    parser.add_argument("--budget-ms", type=float, default=300)
+    args = parser.parse_args()
+
+    index = load_or_build_index(args.source, args.index_dir)
+    retriever = HybridRetriever(index)
+    questions = load_questions()
+    reranker = Reranker(args.model, candidates=args.candidates, top_n=args.top_n, budget_ms=args.budget_ms)
+    reranker.warm_up()
+    embed_query("warm-up")
+
+    print(f"{len(questions)} questions, {len(index)} chunks")
+    for name, active in (("retrieval", None), ("reranked", reranker)):
+        samples, context_chars, found = [], [], 0
+        for q in questions:
+            start = time.perf_counter()
+            hits = retriever.search(q["question"], embed_query(q["question"]), candidate_count(args.top_k, active))
+            hits = rerank_hits(index, active, q["question"], hits, args.top_k)
+            samples.append(time.perf_counter() - start)
+            output = format_passages(index, hits)
+            context_chars.append(len(output))
+            found += contains_answer(output, q["expected"])
+        print(
+            f"{name:<10} recall {found / len(questions):.2f}  "
+            f"context {statistics.mean(context_chars):6.0f} chars (~{statistics.mean(context_chars) / 4:5.0f} tokens)  "
+            f"{latency_summary(samples)}"
+        )
+    stats = reranker.stats()
+    print(f"reranker: {stats['reranked']} reranked, {stats['timeouts']} over budget, {stats['errors']} errors")
+
+
+if __name__ == "__main__":
+    main()
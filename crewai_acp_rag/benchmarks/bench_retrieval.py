@@ -0,0 +1,61 @@
+"""
+Benchmark: recall@k and latency of dense-only vs hybrid BM25 + dense retrieval.
+
+"dense" is the ranking PolicySearchTool returns; "hybrid" is HybridSearchTool's.
+Both include query embedding time. Relevance is judged against the fixed
+question set in questions.json.
+
+Usage:
+    uv run python benchmarks/bench_retrieval.py [--source rbhs_info.pdf] [--alpha 0.5]
+"""
+
+import argparse
+import time
+from typing import Callable, List, Tuple
+
+from common import latency_summary, load_questions, recall_at_k
+
+from crewai_acp_rag.embeddings import embed_query
+from crewai_acp_rag.hybrid import HybridRetriever
+from crewai_acp_rag.ingest import load_or_build_index
+
+K_VALUES = (1, 3, 5)
+
+
+def run(search: Callable[[str], List[Tuple[int, float]]], questions: list, texts: list) -> Tuple[list, list]:
+    ranked, samples = [], []
+    for q in questions:
+        start = time.perf_counter()
+        hits = search(q["question"])
+        samples.append(time.perf_counter() - start)
+        ranked.append([texts[i] for i, _ in hits])
+    return ranked, samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--source", default="rbhs_info.pdf")
+    parser.add_argument("--index-dir", default=".rag_index")
+    parser.add_argument("--alpha", type=float, default=0.5, help="Dense weight in the hybrid blend")
+    args = parser.parse_args()
+
+    index = load_or_build_index(args.source, args.index_dir)
+    texts = list(index.chunks.texts())
+    questions = load_questions()
+    retriever = HybridRetriever(index, alpha=args.alpha)
+    top_k = max(K_VALUES)
+    embed_query("warm-up")
+
+    rankers = {
+        "dense": lambda q: index.search(embed_query(q), top_k=top_k),
+        "hybrid": lambda q: retriever.search(q, embed_query(q), top_k=top_k),
+    }
+    print(f"{len(questions)} questions, {len(index)} chunks")
+    for name, search in rankers.items():
+        ranked, samples = run(search, questions, texts)
+        recalls = "  ".join(f"recall@{k} {recall_at_k(ranked, questions, k):.2f}" for k in K_VALUES)
+        print(f"{name:<8} {recalls}  {latency_summary(samples)}")
+
+
+if __name__ == "__main__":
+    main()
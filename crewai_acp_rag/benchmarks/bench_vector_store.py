@@ -0,0 +1,76 @@
+"""
+Benchmark: memory, recall and latency of the float32, float16 and int8 search matrices.
+
+Every precision searches the same index (dense only, as PolicySearchTool
+does). Recall@k is judged against the fixed question set in questions.json;
+"top-5 overlap" is the fraction of the float32 top 5 that each precision
+also returns. Memory is the search matrix plus the chunk store, compared
+with the previous layout of a float32 matrix and one Python dict per chunk.
+
+Usage:
+    uv run python benchmarks/bench_vector_store.py [--source rbhs_info.pdf] [--index-dir .rag_index]
+"""
+
+import argparse
+import time
+import tracemalloc
+from typing import List
+
+from common import latency_summary, load_questions, recall_at_k
+
+from crewai_acp_rag.embeddings import embed_documents
+from crewai_acp_rag.index import VECTOR_DTYPES, PolicyIndex
+from crewai_acp_rag.ingest import load_or_build_index
+
+K_VALUES = (1, 3, 5)
+
+
+def legacy_nbytes(index: PolicyIndex) -> int:
+    """Float32 matrix plus chunk records held as Python dicts."""
+    tracemalloc.start()
+    records = list(index.chunks)
+    chunk_bytes, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del records
+    return index.embeddings.nbytes + chunk_bytes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--source", default="rbhs_info.pdf")
+    parser.add_argument("--index-dir", default=".rag_index")
+    args = parser.parse_args()
+
+    load_or_build_index(args.source, args.index_dir)
+    questions = load_questions()
+    query_vectors = embed_documents([q["question"] for q in questions])
+    top_k = max(K_VALUES)
+
+    baseline: List[List[int]] = []
+    print(f"{len(questions)} questions")
+    for vector_dtype in VECTOR_DTYPES:
+        index = PolicyIndex.load(args.index_dir, vector_dtype=vector_dtype)
+        texts = list(index.chunks.texts())
+        if vector_dtype == "float32":
+            print(f"{len(index)} chunks; previous layout (float32 + chunk dicts): {legacy_nbytes(index) / 1024:.1f} KiB")
+
+        ranked_ids, samples = [], []
+        for vector in query_vectors:
+            start = time.perf_counter()
+            hits = index.search(vector, top_k=top_k)
+            samples.append(time.perf_counter() - start)
+            ranked_ids.append([i for i, _ in hits])
+        if not baseline:
+            baseline = ranked_ids
+
+        ranked = [[texts[i] for i in ids] for ids in ranked_ids]
+        recalls = "  ".join(f"recall@{k} {recall_at_k(ranked, questions, k):.2f}" for k in K_VALUES)
+        overlap = sum(len(set(ids) & set(ref)) for ids, ref in zip(ranked_ids, baseline)) / (len(baseline) * top_k)
+        print(
+            f"{vector_dtype:<8} {index.nbytes / 1024:8.1f} KiB  {recalls}  "
+            f"top-{top_k} overlap {overlap:.2f}  {latency_summary(samples)}"
+        )
+
+
+if __name__ == "__main__":
+    main()
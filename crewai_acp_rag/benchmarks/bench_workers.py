@@ -0,0 +1,176 @@
+"""
+Load test: RAG server throughput and index memory as the worker count grows.
+
+For each worker count the server is started with a stubbed LLM that makes one
+policy search and then answers, so a run exercises ACP handling, question
+embedding, retrieval and the crew loop but not Groq. --requests runs are
+sent at --concurrency through the ACP client, and throughput is reported.
+
+Memory is read from /proc for every process of the server: "index RSS" and
+"index PSS" cover only the memory-mapped index files. PSS divides shared
+pages between the processes mapping them, so an index PSS that stays flat
+as workers are added means the workers share a single copy.
+
+Usage:
+    uv run python benchmarks/bench_workers.py [--workers 1 2 4] [--requests 200] [--concurrency 16]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Union
+
+import httpx
+from acp_sdk.client import Client
+from acp_sdk.models import Message, MessagePart
+from crewai.llms.base_llm import BaseLLM
+from common import load_questions
+
+TASK_RE = re.compile(r"Current Task: (.*)")
+
+
+class StubLLM(BaseLLM):
+    """Answers instantly: one policy search for the task, then a final answer."""
+
+    def __init__(self) -> None:
+        super().__init__(model="stub")
+
+    def call(self, messages: Union[str, List[Dict[str, str]]], *args: Any, **kwargs: Any) -> str:
+        if isinstance(messages, str):
+            messages = [dict(role="user", content=messages)]
+        # A tool result comes back as the latest message, ending in "Observation: ...".
+        if "Observation:" in messages[-1]["content"]:
+            return "Thought: I now know the final answer\nFinal Answer: Stubbed answer for load testing."
+        match = TASK_RE.search("\n".join(m["content"] for m in messages))
+        query = json.dumps({"query": match.group(1) if match else "policy coverage"})
+        return f"Thought: I should search the policy.\nAction: Search the policy document's content\nAction Input: {query}"
+
+
+def run_stub_worker() -> None:
+    """Worker process: the real server with the Groq LLM swapped for StubLLM."""
+    import crewai_acp_rag.agent as agent
+
+    agent.AdmittedLLM = lambda **kwargs: StubLLM()
+    agent.main()
+
+
+def serve(workers: int, port: int) -> None:
+    from crewai_acp_rag.ingest import load_or_build_index
+    from crewai_acp_rag.workers import serve_workers
+
+    load_or_build_index()
+    serve_workers([sys.executable, __file__, "--worker"], workers, "127.0.0.1", port)
+
+
+def process_tree(pid: int) -> List[int]:
+    pids = [pid]
+    for child in Path(f"/proc/{pid}/task/{pid}/children").read_text().split():
+        pids.extend(process_tree(int(child)))
+    return pids
+
+
+def memory_kib(pids: List[int], index_dir: str) -> Dict[str, int]:
+    index_dir = os.path.abspath(index_dir)
+    totals = dict(index_rss=0, index_pss=0, total_pss=0)
+    for pid in pids:
+        in_index = False
+        for line in Path(f"/proc/{pid}/smaps").read_text().splitlines():
+            fields = line.split()
+            if not fields[0].endswith(":"):
+                in_index = len(fields) >= 6 and fields[5].startswith(index_dir)
+            elif fields[0] == "Pss:":
+                totals["total_pss"] += int(fields[1])
+                if in_index:
+                    totals["index_pss"] += int(fields[1])
+            elif fields[0] == "Rss:" and in_index:
+                totals["index_rss"] += int(fields[1])
+    return totals
+
+
+async def wait_ready(base_url: str, workers: int, timeout: float = 600) -> None:
+    # Each request lands on an arbitrary worker; require a run of successes.
+    deadline = time.monotonic() + timeout
+    streak = 0
+    async with httpx.AsyncClient() as http:
+        while streak < 4 * workers:
+            if time.monotonic() > deadline:
+                raise TimeoutError("Server did not become ready")
+            try:
+                ready = (await http.get(f"{base_url}/readyz")).status_code == 200
+            except httpx.TransportError:
+                ready = False
+            streak = streak + 1 if ready else 0
+            if not ready:
+                await asyncio.sleep(0.5)
+
+
+async def load(base_url: str, questions: List[str], requests: int, concurrency: int) -> float:
+    limit = asyncio.Semaphore(concurrency)
+    async with Client(base_url=base_url, timeout=300) as client:
+
+        async def one(i: int) -> None:
+            async with limit:
+                message = Message(parts=[MessagePart(content=f"{questions[i % len(questions)]} ({i})")])
+                run = await client.run_sync(agent="rag_agent", input=[message])
+                if run.status != "completed":
+                    raise RuntimeError(f"Run {run.run_id} {run.status}: {run.error}")
+
+        await one(0)  # warm-up
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(1, requests + 1)))
+        return requests / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--port", type=int, default=8101)
+    parser.add_argument("--serve", type=int, metavar="WORKERS", help=argparse.SUPPRESS)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_stub_worker()
+        return
+    if args.serve:
+        serve(args.serve, args.port)
+        return
+
+    env = dict(
+        os.environ,
+        GROQ_API_KEY=os.getenv("GROQ_API_KEY", "benchmark"),
+        RAG_STREAMING="false",
+        RAG_CACHE_SIZE="0",
+        RAG_GROQ_RPM="0",
+        RAG_GROQ_TPM="0",
+    )
+    index_dir = env.get("RAG_INDEX_DIR", ".rag_index")
+    questions = [q["question"] for q in load_questions()]
+    base_url = f"http://127.0.0.1:{args.port}"
+
+    print(f"{'workers':>7}  {'runs/s':>8}  {'index RSS':>10}  {'index PSS':>10}  {'total PSS':>10}")
+    for workers in args.workers:
+        proc = subprocess.Popen([sys.executable, __file__, "--serve", str(workers), "--port", str(args.port)], env=env)
+        try:
+            asyncio.run(wait_ready(base_url, workers))
+            throughput = asyncio.run(load(base_url, questions, args.requests, args.concurrency))
+            mem = memory_kib(process_tree(proc.pid), index_dir)
+        finally:
+            proc.terminate()
+            proc.wait()
+        print(
+            f"{workers:>7}  {throughput:>8.1f}  {mem['index_rss'] / 1024:>7.1f} MiB  "
+            f"{mem['index_pss'] / 1024:>7.1f} MiB  {mem['total_pss'] / 1024:>7.1f} MiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""
+Shared helpers for the retrieval benchmarks.
+
+``questions.json`` is a fixed set of questions over ``rbhs_info.pdf``, each
+with a short phrase that a passage must contain to count as relevant.
+"""
+
+import json
+import statistics
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+QUESTIONS_FILE = Path(__file__).with_name("questions.json")
+
+
+def load_questions() -> List[Dict[str, str]]:
+    """Load the fixed question set."""
+    return json.loads(QUESTIONS_FILE.read_text(encoding="utf-8"))
+
+
+def contains_answer(text: str, expected: str) -> bool:
+    """Whether a passage contains the expected phrase, ignoring case and spacing."""
+    return " ".join(expected.lower().split()) in " ".join(text.lower().split())
+
+
+def recall_at_k(ranked_texts: Sequence[Sequence[str]], questions: Sequence[Dict[str, str]], k: int) -> float:
+    """Fraction of questions with a relevant passage in their top ``k``."""
+    found = sum(
+        any(contains_answer(text, q["expected"]) for text in texts[:k]) for texts, q in zip(ranked_texts, questions)
+    )
+    return found / len(questions)
+
+
+def latency_summary(samples: Sequence[float]) -> str:
+    """Format mean and p95 of a list of durations in seconds, as milliseconds."""
+    ms = sorted(s * 1000 for s in samples)
+    p95 = ms[max(int(len(ms) * 0.95) - 1, 0)]
+    return f"mean {statistics.mean(ms):8.2f} ms  p95 {p95:8.2f} ms"
@@ -0,0 +1,190 @@
+"""
+Admission control for Groq calls.
+
+Groq enforces per-minute quotas on requests and tokens and answers 429 once
+either is exceeded; CrewAI then burns its retries and the run fails. An
+``AdmissionController`` holds one token bucket per quota and makes each LLM
+call wait for its share before it is sent, so a burst of runs queues up and
+drains at the quota's pace instead of failing.
+
+Buckets hand out reservations in arrival order: a call takes its tokens
+immediately, letting the bucket go negative, and sleeps until the refill has
+paid the debt back. Waiting calls therefore need no condition variable and
+are admitted first come, first served.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional, Union
+
+from crewai import LLM
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled continuously at a per-minute rate.
+    """
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        """
+        Args:
+            per_minute: Tokens added per minute
+            capacity: Most tokens the bucket holds (default: one minute's worth)
+        """
+        if per_minute <= 0:
+            raise ValueError("per_minute must be positive")
+        self.rate = per_minute / 60.0
+        self.capacity = capacity if capacity is not None else per_minute
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, cost: float) -> float:
+        """
+        Take ``cost`` tokens, borrowing against future refills if needed.
+
+        A cost above the capacity is clamped to it, so an oversized call
+        waits for a full bucket rather than forever.
+
+        Args:
+            cost: Tokens the caller needs
+
+        Returns:
+            float: Seconds the caller must wait before using the tokens
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= min(cost, self.capacity)
+            return max(0.0, -self._tokens / self.rate)
+
+
+class AdmissionController:
+    """
+    Paces LLM calls to a requests-per-minute and tokens-per-minute quota.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float = 0,
+        tokens_per_minute: float = 0,
+        completion_tokens: int = 512,
+        window: int = 1024,
+    ):
+        """
+        Args:
+            requests_per_minute: Request quota (0 for no limit)
+            tokens_per_minute: Prompt plus completion token quota (0 for no limit)
+            completion_tokens: Tokens assumed for each response when reserving
+            window: Number of recent waits kept for the latency percentiles
+        """
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+        self.completion_tokens = completion_tokens
+
+        self.admitted = 0
+        self.delayed = 0
+        self.max_queue_depth = 0
+        self._queue_depth = 0
+        self._waits: deque = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    @property
+    def queue_depth(self) -> int:
+        """Calls currently waiting for admission."""
+        return self._queue_depth
+
+    def admit(self, prompt_tokens: int = 0) -> float:
+        """
+        Block the calling thread until a call may be sent.
+
+        Args:
+            prompt_tokens: Estimated prompt size of the call
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        delay = 0.0
+        if self.requests is not None:
+            delay = self.requests.reserve(1)
+        if self.tokens is not None:
+            delay = max(delay, self.tokens.reserve(prompt_tokens + self.completion_tokens))
+
+        with self._lock:
+            self.admitted += 1
+            self._waits.append(delay)
+            if delay > 0:
+                self.delayed += 1
+                self._queue_depth += 1
+                self.max_queue_depth = max(self.max_queue_depth, self._queue_depth)
+        if delay > 0:
+            logger.info(f"Groq quota reached, delaying call by {delay:.2f}s")
+            try:
+                time.sleep(delay)
+            finally:
+                with self._lock:
+                    self._queue_depth -= 1
+        return delay
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Report admission counters.
+
+        Returns:
+            Dict[str, Any]: Queue depth, admitted and delayed calls, and wait times in milliseconds
+        """
+        with self._lock:
+            waits = sorted(self._waits)
+        return dict(
+            queue_depth=self._queue_depth,
+            max_queue_depth=self.max_queue_depth,
+            admitted=self.admitted,
+            delayed=self.delayed,
+            wait_ms=dict(
+                mean=round(sum(waits) / len(waits) * 1000, 1) if waits else 0.0,
+                p95=round(waits[max(int(len(waits) * 0.95) - 1, 0)] * 1000, 1) if waits else 0.0,
+                max=round(waits[-1] * 1000, 1) if waits else 0.0,
+            ),
+        )
+
+
+def estimate_tokens(messages: Union[str, List[Dict[str, str]]]) -> int:
+    """
+    Rough prompt size in tokens (about four characters per token).
+
+    Args:
+        messages: Prompt as passed to ``LLM.call``
+
+    Returns:
+        int: Estimated token count
+    """
+    if isinstance(messages, str):
+        return len(messages) // 4
+    return sum(len(str(m.get("content", ""))) for m in messages) // 4
+
+
+class AdmittedLLM(LLM):
+    """
+    ``LLM`` whose calls first pass through an ``AdmissionController``.
+
+    CrewAI calls the LLM from the thread running the crew, so waiting for
+    admission blocks only that run.
+    """
+
+    def __init__(self, admission: AdmissionController, **kwargs: Any):
+        """
+        Args:
+            admission: Controller shared by every call to the model
+            **kwargs: Arguments for ``LLM``
+        """
+        super().__init__(**kwargs)
+        self.admission = admission
+
+    def call(self, messages: Union[str, List[Dict[str, str]]], *args: Any, **kwargs: Any) -> Union[str, Any]:
+        self.admission.admit(estimate_tokens(messages))
+        return super().call(messages, *args, **kwargs)
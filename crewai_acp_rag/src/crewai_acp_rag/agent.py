@@ -1,74 +1,181 @@
-from pdb import run
-from crewai import Agent, Crew, Process, Task
-from crewai.project import CrewBase, agent, crew, task
-from crewai.agents.agent_builder.base_agent import BaseAgent
-from typing import List
-from crewai_tools import PDFSearchTool
-from langchain_openai import ChatOpenAI
+from crewai import LLM
+from typing import Any, Dict, List, Optional
 from crewai_tools import SerperDevTool
-from crewai.tools import tool
+from crewai.tools import BaseTool
+import logging
 import os
+import sys
 from os import getenv
 from dotenv import load_dotenv
 
 load_dotenv()
-
-from langchain_groq import ChatGroq
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
 
 from collections.abc import AsyncGenerator
-from acp_sdk.models import Message, MessagePart
-from acp_sdk.server import RunYield, RunYieldResume, Server
+from acp_sdk.models import Message
+from acp_sdk.server import RunYield, RunYieldResume
 from acp_sdk.models.platform import PlatformUIAnnotation, PlatformUIType
 from acp_sdk import Annotations, MessagePart, Metadata
 
+from crewai_acp_rag.admission import AdmissionController, AdmittedLLM
+from crewai_acp_rag.coalesce import SingleFlight, normalize_question
+from crewai_acp_rag.crew_pool import CrewPool, CrewTemplate
+from crewai_acp_rag.embeddings import embed_documents, embed_query_async
+from crewai_acp_rag.index import PolicyIndex
+from crewai_acp_rag.ingest import load_or_build_index
+from crewai_acp_rag.semantic_cache import SemanticAnswerCache
+from crewai_acp_rag.startup import RagServer, StartupState
+from crewai_acp_rag.streaming import RunStream
+from crewai_acp_rag.rerank import RERANKER_MODEL, Reranker
+from crewai_acp_rag.sections import SECTION_VECTORS
+from crewai_acp_rag.tools import HybridSearchTool, PolicySearchTool, SectionLookupTool
+from crewai_acp_rag.workers import serve_workers, worker_fd
+
+logger = logging.getLogger(__name__)
 
+# Stream answer tokens to ACP clients as Groq produces them (RAG_STREAMING=false
+# returns a single message once the crew has finished).
+streaming = getenv("RAG_STREAMING", "true").lower() in ("true", "1")
 
+# Groq calls wait for their share of the per-minute request and token quota
+# (defaults: the free tier of llama-3.3-70b-versatile) instead of failing with
+# 429s. Each of RAG_WORKERS processes gets an equal slice.
+_workers = max(1, int(getenv("RAG_WORKERS", 1)))
+admission = AdmissionController(
+    requests_per_minute=float(getenv("RAG_GROQ_RPM", 30)) / _workers,
+    tokens_per_minute=float(getenv("RAG_GROQ_TPM", 12000)) / _workers,
+    completion_tokens=int(getenv("RAG_GROQ_COMPLETION_TOKENS", 512)),
+)
 
-    # If you want to run a snippet of code before or after the crew starts,
-    # you can use the @before_kickoff and @after_kickoff decorators
-    # https://docs.crewai.com/concepts/crews#example-crew-class-with-decorators
+# Concurrent runs of the same question share one crew run.
+inflight = SingleFlight()
 
-groq_api_key = getenv("GROQ_API_KEY")
+# Built by load_components(), in the background unless RAG_STARTUP=eager.
+llm: LLM
+websearch_tool: SerperDevTool
+policy_index: PolicyIndex
+reranker: Optional[Reranker] = None
+vectorstore_tool: BaseTool
+policy_tools: List[BaseTool]
+crew_pool: CrewPool
+answer_cache: SemanticAnswerCache
 
-    # If the API key is not found, raise an exception
-if not groq_api_key:
-    raise ValueError("GROQ_API_KEY environment variable not set!")
-print(f"Groq API Key loaded: {groq_api_key[:5]}...") # Print first 5 chars for security
 
-    # Initialize the Groq LLM
-llm = ChatGroq(
-    api_key=groq_api_key,
-    model="groq/llama-3.3-70b-versatile"
-)
+def load_components() -> None:
+    """Load the LLM client, embedding model, policy index and crew pool, timing each phase."""
+    global llm, websearch_tool, policy_index, reranker, vectorstore_tool, policy_tools, crew_pool, answer_cache
 
-print(f"LLM initialized: {llm is not None}")
+    with startup.phase("llm"):
+        groq_api_key = getenv("GROQ_API_KEY")
+        # If the API key is not found, raise an exception
+        if not groq_api_key:
+            raise ValueError("GROQ_API_KEY environment variable not set!")
+        logger.info("Groq API key loaded")
 
-server=Server()
+        # Initialize the Groq LLM
+        llm = AdmittedLLM(
+            admission=admission,
+            api_key=groq_api_key,
+            model="groq/llama-3.3-70b-versatile",
+            stream=streaming,
+        )
+        logger.info(f"LLM initialized: {llm.model}")
 
-websearch_tool = SerperDevTool()
+    with startup.phase("web_search_tool"):
+        websearch_tool = SerperDevTool()
 
+    with startup.phase("embedding_model"):
+        # First forward pass initialises the model's kernels, so do it now.
+        embed_documents(["warm-up"])
+
+    with startup.phase("index"):
+        # Memory-maps the pre-built index; only re-embeds documents or pages that
+        # changed (see `build-index`, run at Docker build time).
+        policy_index = load_or_build_index()
+        logger.info(f"Policy index loaded: {len(policy_index)} chunks, {policy_index.vector_dtype} vectors, {policy_index.nbytes / 1e6:.1f} MB")
+
+    if getenv("RAG_RERANK", "false").lower() in ("true", "1"):
+        with startup.phase("reranker"):
+            # Search tools fetch a wider candidate set and keep the passages a
+            # cross-encoder rates best, unless it overruns its time budget.
+            reranker = Reranker(
+                model_name=getenv("RAG_RERANK_MODEL", RERANKER_MODEL),
+                candidates=int(getenv("RAG_RERANK_CANDIDATES", 20)),
+                top_n=int(getenv("RAG_RERANK_TOP_N", 3)),
+                budget_ms=float(getenv("RAG_RERANK_BUDGET_MS", 300)),
+            )
+            reranker.warm_up()
 
-vectorstore_tool = PDFSearchTool(pdf='rbhs_info.pdf',
-    config=dict(
-        llm=dict(
-            provider="groq", # or google, openai, anthropic, llama2, ...
-            config=dict(
-                model="llama-3.3-70b-versatile",
-                # temperature=0.5,
-                # top_p=1,
-                # stream=true,
+    with startup.phase("retriever"):
+        # Hybrid BM25 + dense retrieval by default; RAG_RETRIEVER=dense for embeddings only.
+        if getenv("RAG_RETRIEVER", "hybrid").lower() == "dense":
+            vectorstore_tool = PolicySearchTool(index=policy_index, reranker=reranker)
+        else:
+            vectorstore_tool = HybridSearchTool(index=policy_index, reranker=reranker)
+        policy_tools = [vectorstore_tool]
+        # Indexes built with the section chunker can also return whole sections
+        # (a complete benefit table, all exclusions) in one call.
+        if SECTION_VECTORS in policy_index.arrays:
+            policy_tools.append(SectionLookupTool(index=policy_index))
+
+    with startup.phase("crew_pool"):
+        # Role, backstory, tools and LLM are bound once; each request borrows a
+        # pre-built crew from the pool and only supplies its question.
+        rag_crew_template = CrewTemplate(
+            agent_config=dict(
+                role="Senior Insurance Coverage Assistant",
+                goal="Use the information retrieved from the vectorstore to answer the question",
+                backstory="""You are an expert insurance agent designed to assist with coverage queries.
+                You are an assistant for question-answering tasks.
+                Use the information present in the retrieved context to answer the question.
+                You have to provide a clear concise answer.""",
+                allow_delegation=False,
             ),
-        ),
-        embedder=dict(
-            provider="huggingface", # or openai, ollama, ...
-            config=dict(
-                model="BAAI/bge-small-en-v1.5",
-                #task_type="retrieval_document",
-                # title="Embeddings",
+            task_config=dict(
+                description="{question}",
+                expected_output="""Use the vectorstore_tool to retrieve information from the vectorstore.
+                Return a clear and concise text as response.
+                A comprehensive response as to the users question""",
             ),
-        ),
+            llm=llm,
+            tools=policy_tools,
+            verbose=getenv("RAG_CREW_VERBOSE", "false").lower() in ("true", "1"),
+            max_retry_limit=int(getenv("RAG_MAX_RETRY_LIMIT", 5)),
+        )
+
+        crew_pool = CrewPool(rag_crew_template, size=int(getenv("RAG_CREW_POOL_SIZE", 4)))
+        crew_pool.prewarm(1)
+
+    # Reworded repeats of a question ("rehab waiting period" / "waiting period for
+    # rehabilitation") are answered from here instead of another Groq round-trip.
+    # The cache lives in this process, which serves the index it loaded at startup,
+    # so its answers always come from that index.
+    answer_cache = SemanticAnswerCache(
+        threshold=float(getenv("RAG_CACHE_THRESHOLD", 0.97)),
+        max_entries=int(getenv("RAG_CACHE_SIZE", 512)),
+        ttl_seconds=float(getenv("RAG_CACHE_TTL", 3600)),
     )
-)
+
+
+# The server binds its port immediately and reports /livez and /readyz while
+# load_components() runs in the background. RAG_STARTUP=eager loads everything
+# before the server starts, failing fast on missing keys. A multi-worker
+# parent (RAG_WORKERS > 1) only supervises; its workers do the loading.
+def collect_metrics() -> Dict[str, Any]:
+    """Groq admission, coalescing, answer cache and reranker counters served at /metrics."""
+    metrics = dict(groq_admission=admission.stats(), coalescing=inflight.stats())
+    if startup.ready:
+        metrics["answer_cache"] = answer_cache.stats()
+    if reranker is not None:
+        metrics["reranker"] = reranker.stats()
+    return metrics
+
+
+startup = StartupState()
+server = RagServer(startup, load_components, metrics=collect_metrics)
+serves_requests = worker_fd() is not None or int(getenv("RAG_WORKERS", 1)) <= 1
+if getenv("RAG_STARTUP", "background").lower() == "eager" and serves_requests:
+    startup.run(load_components)
 
 
 @server.agent(
@@ -102,33 +209,66 @@ vectorstore_tool = PDFSearchTool(pdf='rbhs_info.pdf',
 async def rag_agent(input: list[Message]) -> AsyncGenerator[RunYield, RunYieldResume]:
     "This is an agent for questions around hospital policy coverage, it uses a RAG pattern to find answers based on policy documentation. Use it to help answer questions on coverage and waiting periods."
 
-    rag_agent = Agent(
-        role="Senior Insurance Coverage Assistant", 
-        goal="Use the information retrieved from the vectorstore to answer the question",
-        backstory="""You are an expert insurance agent designed to assist with coverage queries.
-        You are an assistant for question-answering tasks.
-        Use the information present in the retrieved context to answer the question.
-        You have to provide a clear concise answer.""",
-        verbose=True,
-        allow_delegation=False,
-        llm=llm,
-        tools=[vectorstore_tool], 
-        max_retry_limit=5
-    )
-        
-    task1 = Task(
-        description=input[0].parts[0].content,
-        expected_output = """Use the vectorstore_tool to retrieve information from the vectorstore.
-        Return a clear and concise text as response.
-        A comprehensive response as to the users question""",
-        agent=rag_agent
-    )
+    await startup.wait_ready()
+    question = input[0].parts[0].content
+    question_vector = await embed_query_async(question)
+
+    cached_answer = answer_cache.lookup(question_vector)
+    if cached_answer is not None:
+        logger.info(f"Answer cache hit: {answer_cache.stats()}")
+        yield Message(parts=[MessagePart(content=cached_answer)])
+        return
+
+    # The same question already running (e.g. sent by both orchestrators) is
+    # answered by that run rather than a second crew.
+    key = normalize_question(question)
+    shared_answer = await inflight.wait(key)
+    if shared_answer is not None:
+        logger.info(f"Coalesced with an in-flight run: {inflight.stats()}")
+        yield Message(parts=[MessagePart(content=shared_answer)])
+        return
+
+    async with inflight.lead(key) as flight, crew_pool.acquire() as crew:
+        kickoff = crew_pool.kickoff(crew, inputs={"question": question})
+        if not streaming:
+            answer = str(await kickoff)
+            flight.set_result(answer)
+            answer_cache.store(question, question_vector, answer)
+            yield Message(parts=[MessagePart(content=answer)])
+            return
+
+        stream = RunStream()
+        async for part in stream.run(kickoff):
+            yield part
+        answer = str(stream.result)
+        flight.set_result(answer)
+    answer_cache.store(question, question_vector, answer)
+    if not stream.streamed:
+        # Nothing matched the Final Answer marker (e.g. provider fell back to
+        # a non-streaming call), so send the whole answer at once.
+        yield MessagePart(content=answer, content_type="text/plain")
+
+
+def main() -> None:
+    """Serve the agent, in RAG_WORKERS worker processes if more than one."""
+    fd = worker_fd()
+    if fd is not None:
+        server.run(fd=fd)
+        return
+
+    host = os.getenv("HOST", "127.0.0.1")
+    port = int(os.getenv("PORT", 8001))
+    workers = int(getenv("RAG_WORKERS", 1))
+    if workers <= 1:
+        server.run(host=host, port=port)
+        return
 
-    crew = Crew(agents=[rag_agent], tasks=[task1], verbose=True)
-        
-    task_output = await crew.kickoff_async()
-    yield Message(parts=[MessagePart(content=str(task_output))])
+    # Build or refresh the index once, up front: the workers then only
+    # memory-map it, sharing one copy of the matrices, chunk store and BM25
+    # postings through the page cache.
+    load_or_build_index()
+    sys.exit(serve_workers([sys.executable, "-m", "crewai_acp_rag.agent"], workers, host, port))
 
 
 if __name__ == "__main__":
-    server.run(host=os.getenv("HOST", "127.0.0.1"), port=int(os.getenv("PORT", 8001)))
+    main()
@@ -13,6 +13,7 @@ async def acp_client() -> None:
             agent="rag_agent", input=question
                   
         )
-        print("Response:\n" + run.output[0].parts[0].content)
+        # rag_agent streams its answer as several parts; trajectory parts carry no content.
+        print("Response:\n" + "".join(part.content for part in run.output[0].parts if part.content))
 
 asyncio.run(acp_client())
\ No newline at end of file
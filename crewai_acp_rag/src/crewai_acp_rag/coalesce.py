@@ -0,0 +1,124 @@
+"""
+Single-flight coalescing of identical questions.
+
+The orchestrators often send the same question to ``rag_agent`` within
+seconds of each other. The semantic answer cache only helps once the first
+run has finished; until then every copy would start its own crew and spend
+its own Groq quota. ``SingleFlight`` lets the first run of a question lead
+and makes concurrent copies wait for, and share, its answer.
+
+Questions are matched after ``normalize_question``: case, spacing and
+trailing punctuation are ignored. If the leading run fails, its followers
+get the same error; if it is abandoned (its client went away), one of them
+takes over and runs the crew itself.
+"""
+
+import asyncio
+import re
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+
+_SPACE_RE = re.compile(r"\s+")
+
+
+def normalize_question(question: str) -> str:
+    """
+    Coalescing key for a question.
+
+    Args:
+        question: Question as asked
+
+    Returns:
+        str: Case-folded question with collapsed spacing and no trailing punctuation
+    """
+    return _SPACE_RE.sub(" ", question.casefold()).strip().rstrip("?!. ")
+
+
+class FlightAbandoned(Exception):
+    """The leading run stopped without an answer or an error of its own."""
+
+
+class SingleFlight:
+    """
+    Shares the result of one in-flight call among concurrent callers with the same key.
+
+    Must be used from a single event loop.
+    """
+
+    def __init__(self) -> None:
+        self._flights: Dict[str, asyncio.Future] = {}
+        self.leaders = 0
+        self.followers = 0
+
+    @property
+    def in_flight(self) -> int:
+        """Keys with a leading call still running."""
+        return len(self._flights)
+
+    async def wait(self, key: str) -> Optional[Any]:
+        """
+        Wait for the in-flight call for ``key``, if there is one.
+
+        Args:
+            key: Coalescing key
+
+        Returns:
+            Optional[Any]: The leader's result, or None if no call is in flight
+                (the caller should then ``lead``)
+
+        Raises:
+            Exception: Whatever the leading call raised
+        """
+        joined = False
+        while (flight := self._flights.get(key)) is not None:
+            if not joined:
+                self.followers += 1
+                joined = True
+            try:
+                # Shielded: a follower going away must not cancel the leader.
+                return await asyncio.shield(flight)
+            except FlightAbandoned:
+                # Another follower may already have taken over; check again.
+                continue
+        return None
+
+    @asynccontextmanager
+    async def lead(self, key: str) -> AsyncIterator[asyncio.Future]:
+        """
+        Run the call for ``key`` on behalf of everyone waiting on it.
+
+        The caller must ``set_result`` on the yielded future. An exception
+        raised in the block is handed to the followers, and leaving the block
+        any other way lets them take over.
+
+        Args:
+            key: Coalescing key
+
+        Yields:
+            asyncio.Future: Future the followers wait on
+        """
+        flight = asyncio.get_running_loop().create_future()
+        # Nobody may be waiting; don't warn about unretrieved exceptions.
+        flight.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._flights[key] = flight
+        self.leaders += 1
+        try:
+            yield flight
+        except Exception as e:
+            if not flight.done():
+                flight.set_exception(e)
+            raise
+        finally:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+            if not flight.done():
+                flight.set_exception(FlightAbandoned())
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Report coalescing counters.
+
+        Returns:
+            Dict[str, Any]: Leading and coalesced runs, and runs currently in flight
+        """
+        return dict(leaders=self.leaders, coalesced=self.followers, in_flight=self.in_flight)
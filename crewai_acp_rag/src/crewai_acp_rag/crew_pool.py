@@ -0,0 +1,183 @@
+"""
+Pooled crew templates for ACP agents.
+
+Building an ``Agent``, ``Task`` and ``Crew`` for every request re-validates
+the same role, backstory, tools and LLM binding each time. A ``CrewTemplate``
+captures that configuration once and a ``CrewPool`` keeps a bounded set of
+ready-built crews. Each request borrows a crew and hands it back; what runs
+is a copy (``Crew.copy()``, as crewai's ``kickoff_for_each`` does), so task
+outputs, agent state and the interpolated description of one request never
+reach the next, and the pooled crew stays as the template built it.
+
+A crew runs on a worker thread, which cancelling the request can't stop, so
+a run started through ``CrewPool.kickoff`` keeps its pool slot until the
+thread has finished: ``size`` bounds the crews actually calling the LLM,
+including those of clients that have disconnected.
+"""
+
+import asyncio
+import contextvars
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from crewai import Agent, Crew, Task
+
+logger = logging.getLogger(__name__)
+
+
+class CrewTemplate:
+    """
+    Configuration for a single-agent, single-task crew.
+
+    The task description should contain input placeholders such as
+    ``{question}`` that are filled in by ``CrewPool.kickoff(crew, inputs=...)``.
+    """
+
+    def __init__(
+        self,
+        agent_config: Dict[str, Any],
+        task_config: Dict[str, Any],
+        llm: Any,
+        tools: Optional[List[Any]] = None,
+        verbose: bool = False,
+        max_retry_limit: int = 2,
+    ):
+        """
+        Args:
+            agent_config: Keyword arguments for ``Agent`` (role, goal, backstory, ...)
+            task_config: Keyword arguments for ``Task`` (description, expected_output, ...)
+            llm: LLM bound to the agent
+            tools: Tools available to the agent
+            verbose: Enable CrewAI's verbose agent and crew logging
+            max_retry_limit: Retries the agent makes when a step fails
+        """
+        self.agent_config = agent_config
+        self.task_config = task_config
+        self.llm = llm
+        self.tools = tools or []
+        self.verbose = verbose
+        self.max_retry_limit = max_retry_limit
+
+    def build(self) -> Crew:
+        """
+        Build a new crew from the template.
+
+        Returns:
+            Crew: A crew ready for ``CrewPool.kickoff(crew, inputs=...)``
+        """
+        agent = Agent(
+            **self.agent_config,
+            llm=self.llm,
+            tools=self.tools,
+            verbose=self.verbose,
+            max_retry_limit=self.max_retry_limit,
+        )
+        task = Task(**self.task_config, agent=agent)
+        return Crew(agents=[agent], tasks=[task], verbose=self.verbose)
+
+
+class CrewPool:
+    """
+    A bounded pool of crews built from one template.
+
+    Crews are built lazily and reused afterwards. A crew is only ever lent to
+    one request at a time and at most ``size`` are lent or still running at
+    once, so requests beyond ``size`` wait for a crew to be returned.
+    """
+
+    def __init__(self, template: CrewTemplate, size: int = 4):
+        """
+        Args:
+            template: Template used to build crews
+            size: Maximum number of crews, and so of concurrent runs
+        """
+        if size < 1:
+            raise ValueError("size must be at least 1")
+        self.template = template
+        self.size = size
+        self._slots = asyncio.Semaphore(size)
+        self._idle: List[Crew] = []
+        # One thread per slot, so a run that got its slot never waits for a thread.
+        self._threads = ThreadPoolExecutor(max_workers=size, thread_name_prefix="crew-run")
+        self._runs: Dict[int, Future] = {}
+        self.detached = 0
+
+    @property
+    def idle(self) -> int:
+        """Number of built crews waiting to be borrowed."""
+        return len(self._idle)
+
+    def prewarm(self, count: Optional[int] = None) -> None:
+        """
+        Build crews ahead of the first requests.
+
+        Args:
+            count: Number of idle crews to have ready (default: the pool size)
+        """
+        target = min(self.size, count if count is not None else self.size)
+        while len(self._idle) < target:
+            self._idle.append(self.template.build())
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[Crew]:
+        """
+        Borrow a crew for the duration of one request.
+
+        The crew itself never runs (``kickoff`` runs a copy), so it goes back
+        to the pool however the request ends. If the request ends (e.g. is
+        cancelled) while its ``kickoff`` thread is still running, the slot is
+        released only when that thread finishes.
+
+        Yields:
+            Crew: A crew not in use by any other request
+        """
+        await self._slots.acquire()
+        crew = None
+        try:
+            crew = self._idle.pop() if self._idle else self.template.build()
+            yield crew
+        except (asyncio.CancelledError, GeneratorExit):
+            # The client went away (GeneratorExit: the ACP server closed the
+            # response generator); the run did not fail.
+            logger.info("Request cancelled while holding a crew")
+            raise
+        except Exception:
+            logger.warning("Crew run failed")
+            raise
+        finally:
+            run = self._runs.pop(id(crew), None)
+            if crew is not None:
+                self._idle.append(crew)
+            if run is not None and not run.done():
+                # The thread can't be stopped: its slot is freed when the thread returns.
+                self.detached += 1
+                logger.warning("Request ended while its crew is still running; holding its slot until the run finishes")
+                loop = asyncio.get_running_loop()
+                run.add_done_callback(lambda _: loop.call_soon_threadsafe(self._slots.release))
+            else:
+                self._slots.release()
+
+    async def kickoff(self, crew: Crew, inputs: Dict[str, Any]) -> Any:
+        """
+        Run a copy of a borrowed crew on a worker thread.
+
+        Use this instead of ``crew.kickoff_async`` so the pool knows when the
+        thread is done. Like ``kickoff_async``, the caller's context variables
+        are visible in the thread, and the copy is made there too.
+
+        Args:
+            crew: Crew lent by ``acquire``
+            inputs: Values for the task description's placeholders
+
+        Returns:
+            Any: The crew's output
+        """
+        run = self._threads.submit(contextvars.copy_context().run, _kickoff_copy, crew, inputs)
+        self._runs[id(crew)] = run
+        return await asyncio.wrap_future(run)
+
+
+def _kickoff_copy(crew: Crew, inputs: Dict[str, Any]) -> Any:
+    return crew.copy().kickoff(inputs=inputs)
@@ -0,0 +1,187 @@
+"""
+Embedding model access for the RAG agent.
+
+All document and query embeddings go through this module so that the index,
+the retrieval tools and any caches agree on the same model and normalisation.
+
+Query embeddings from concurrent requests are micro-batched: a single worker
+thread collects the queries that arrive within a short window and embeds
+them in one forward pass.
+"""
+
+import asyncio
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from functools import lru_cache
+from typing import Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+EMBEDDER_MODEL = "BAAI/bge-small-en-v1.5"
+
+# Recorded in the persistent index so a model change forces a rebuild.
+EMBEDDER_CONFIG = dict(
+    provider="huggingface",
+    config=dict(
+        model=EMBEDDER_MODEL,
+        normalize=True,
+    ),
+)
+
+
+@lru_cache(maxsize=1)
+def get_embedding_model() -> Any:
+    """
+    Load the sentence-transformers model once per process.
+
+    Returns:
+        SentenceTransformer: The shared embedding model
+    """
+    # Imported lazily: torch and sentence-transformers dominate import time.
+    from sentence_transformers import SentenceTransformer
+
+    logger.info(f"Loading embedding model {EMBEDDER_MODEL}...")
+    return SentenceTransformer(EMBEDDER_MODEL)
+
+
+def embed_documents(texts: Sequence[str], batch_size: int = 64) -> np.ndarray:
+    """
+    Embed a batch of passages.
+
+    Args:
+        texts: Passages to embed
+        batch_size: Number of passages per forward pass
+
+    Returns:
+        np.ndarray: float32 matrix of shape (len(texts), dim) with unit-length rows
+    """
+    model = get_embedding_model()
+    vectors = model.encode(
+        list(texts),
+        batch_size=batch_size,
+        normalize_embeddings=True,
+        convert_to_numpy=True,
+        show_progress_bar=False,
+    )
+    return np.asarray(vectors, dtype=np.float32)
+
+
+class QueryEmbeddingBatcher:
+    """
+    Coalesces concurrent single-query embedding requests into batches.
+
+    Callers from any thread submit a query and block on (or await) its
+    future. A daemon worker takes the first waiting query, keeps collecting
+    for up to ``window_ms`` or until ``max_batch_size`` queries are queued,
+    and embeds the batch in one call.
+    """
+
+    def __init__(self, window_ms: float = 2.0, max_batch_size: int = 64):
+        """
+        Args:
+            window_ms: How long the worker waits for more queries after the first
+            max_batch_size: Largest batch embedded in one forward pass
+        """
+        self.window_ms = window_ms
+        self.max_batch_size = max_batch_size
+        self.batches = 0
+        self.queries = 0
+        self._queue: "queue.Queue[Tuple[str, Future]]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def submit(self, text: str) -> Future:
+        """
+        Queue a query for embedding.
+
+        Args:
+            text: Query text
+
+        Returns:
+            Future: Resolves to the query's unit-length embedding
+        """
+        if self._worker is None:
+            with self._lock:
+                if self._worker is None:
+                    self._worker = threading.Thread(target=self._run, name="query-embedder", daemon=True)
+                    self._worker.start()
+        future: Future = Future()
+        self._queue.put((text, future))
+        return future
+
+    def embed(self, text: str) -> np.ndarray:
+        """Embed a query, blocking until its batch has been processed."""
+        return self.submit(text).result()
+
+    async def embed_async(self, text: str) -> np.ndarray:
+        """Embed a query without blocking the event loop."""
+        return await asyncio.wrap_future(self.submit(text))
+
+    @property
+    def mean_batch_size(self) -> float:
+        """Average number of queries embedded per forward pass."""
+        return self.queries / self.batches if self.batches else 0.0
+
+    def _collect(self) -> List[Tuple[str, Future]]:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.window_ms / 1000
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+            try:
+                vectors = embed_documents([text for text, _ in batch], batch_size=len(batch))
+            except Exception as e:
+                logger.error(f"Query embedding failed for a batch of {len(batch)}: {e}")
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            self.batches += 1
+            self.queries += len(batch)
+            for (_, future), vector in zip(batch, vectors):
+                future.set_result(vector)
+
+
+query_batcher = QueryEmbeddingBatcher(
+    window_ms=float(os.getenv("RAG_EMBED_BATCH_WINDOW_MS", 2.0)),
+    max_batch_size=int(os.getenv("RAG_EMBED_MAX_BATCH", 64)),
+)
+
+
+def embed_query(text: str) -> np.ndarray:
+    """
+    Embed a single search query, batched with any concurrent queries.
+
+    Args:
+        text: Query text
+
+    Returns:
+        np.ndarray: float32 vector with unit length
+    """
+    return query_batcher.embed(text)
+
+
+async def embed_query_async(text: str) -> np.ndarray:
+    """
+    Embed a single search query from async code, batched with concurrent queries.
+
+    Args:
+        text: Query text
+
+    Returns:
+        np.ndarray: float32 vector with unit length
+    """
+    return await query_batcher.embed_async(text)
@@ -0,0 +1,217 @@
+"""
+Hybrid BM25 + dense retrieval over the policy index.
+
+Policy questions lean on exact terms ("waiting period", dollar limits, item
+names) that dense embeddings alone often rank below looser paraphrases. The
+``BM25Index`` here is a compact in-process inverted index: one CSR layout of
+postings (term offsets, chunk ids and term frequencies in flat NumPy arrays)
+built from the chunk text. ``HybridRetriever`` scores a query against both
+the BM25 index and the dense embeddings, normalises each score vector to
+[0, 1] and blends them, so a single tool call returns passages that match on
+both wording and meaning.
+
+The postings are written into the persistent index at build time (see
+``BM25Index.to_arrays``) and memory-mapped by the server, so worker processes
+share them instead of each rebuilding its own.
+"""
+
+import re
+from collections import Counter
+from typing import Dict, List, Mapping, Sequence, Tuple
+
+import numpy as np
+
+from crewai_acp_rag.index import PolicyIndex
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:[.,][0-9]+)*")
+
+STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from how i if in is it my of on or "
+    "the this to what when which who will with you your".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into BM25 terms: unigrams plus adjacent-word bigrams.
+
+    Bigrams let multi-word terms such as "waiting period" score as a unit.
+    Numbers keep their separators so "$4,450" and "4,450" both yield "4,450".
+
+    Args:
+        text: Text to tokenize
+
+    Returns:
+        List[str]: Terms, with bigrams joined by an underscore
+    """
+    words = [w for w in _TOKEN_RE.findall(text.lower()) if w not in STOPWORDS]
+    return words + [f"{a}_{b}" for a, b in zip(words, words[1:])]
+
+
+class BM25Index:
+    """
+    Okapi BM25 over a fixed set of passages, stored as flat postings arrays.
+
+    Terms are kept as a sorted byte-string array and looked up by binary
+    search, so a loaded index holds no per-term Python objects.
+    """
+
+    ARRAY_NAMES = (
+        "bm25_terms",
+        "bm25_offsets",
+        "bm25_doc_ids",
+        "bm25_tfs",
+        "bm25_idf",
+        "bm25_length_norm",
+        "bm25_params",
+    )
+
+    def __init__(self, texts: Sequence[str], k1: float = 1.2, b: float = 0.75):
+        """
+        Args:
+            texts: Passages to index; position in the sequence is the chunk id
+            k1: Term-frequency saturation
+            b: Document-length normalisation
+        """
+        self.k1 = k1
+        self.b = b
+        self.num_docs = len(texts)
+
+        postings: Dict[str, List[Tuple[int, int]]] = {}
+        doc_len = np.zeros(self.num_docs, dtype=np.float32)
+        for doc_id, text in enumerate(texts):
+            counts = Counter(tokenize(text))
+            doc_len[doc_id] = sum(counts.values())
+            for term, tf in counts.items():
+                postings.setdefault(term, []).append((doc_id, tf))
+
+        vocabulary = sorted(postings)
+        width = max((len(term) for term in vocabulary), default=1)
+        self.terms = np.array([term.encode("ascii") for term in vocabulary], dtype=f"S{width}")
+        lengths = np.fromiter((len(postings[term]) for term in vocabulary), dtype=np.int64, count=len(vocabulary))
+        self.offsets = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=self.offsets[1:])
+        self.doc_ids = np.empty(self.offsets[-1], dtype=np.int32)
+        self.tfs = np.empty(self.offsets[-1], dtype=np.float32)
+        for term_id, term in enumerate(vocabulary):
+            entries = postings[term]
+            start = self.offsets[term_id]
+            self.doc_ids[start : start + len(entries)] = [doc_id for doc_id, _ in entries]
+            self.tfs[start : start + len(entries)] = [tf for _, tf in entries]
+
+        self.idf = np.log1p((self.num_docs - lengths + 0.5) / (lengths + 0.5)).astype(np.float32)
+        avgdl = float(doc_len.mean()) if self.num_docs else 0.0
+        self._length_norm = k1 * (1 - b + b * doc_len / avgdl) if avgdl else np.full(self.num_docs, k1, dtype=np.float32)
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """
+        Export the index as named arrays for storing with the policy index.
+
+        Returns:
+            Dict[str, np.ndarray]: Arrays keyed by the names in ``ARRAY_NAMES``
+        """
+        return dict(
+            bm25_terms=self.terms,
+            bm25_offsets=self.offsets,
+            bm25_doc_ids=self.doc_ids,
+            bm25_tfs=self.tfs,
+            bm25_idf=self.idf,
+            bm25_length_norm=np.asarray(self._length_norm, dtype=np.float32),
+            bm25_params=np.array([self.k1, self.b], dtype=np.float64),
+        )
+
+    @classmethod
+    def from_arrays(cls, arrays: Mapping[str, np.ndarray]) -> "BM25Index":
+        """
+        Rebuild an index from ``to_arrays`` output, e.g. memory-mapped from disk.
+
+        Args:
+            arrays: Arrays keyed by the names in ``ARRAY_NAMES``
+
+        Returns:
+            BM25Index: The index, sharing the given arrays
+        """
+        index = cls.__new__(cls)
+        index.k1, index.b = (float(x) for x in arrays["bm25_params"])
+        index.terms = arrays["bm25_terms"]
+        index.offsets = arrays["bm25_offsets"]
+        index.doc_ids = arrays["bm25_doc_ids"]
+        index.tfs = arrays["bm25_tfs"]
+        index.idf = arrays["bm25_idf"]
+        index._length_norm = arrays["bm25_length_norm"]
+        index.num_docs = len(index._length_norm)
+        return index
+
+    def _term_id(self, term: str) -> int:
+        key = term.encode("ascii")
+        i = int(np.searchsorted(self.terms, key))
+        return i if i < len(self.terms) and self.terms[i] == key else -1
+
+    def scores(self, query: str) -> np.ndarray:
+        """
+        Score every passage against a query.
+
+        Args:
+            query: Query text
+
+        Returns:
+            np.ndarray: BM25 score per chunk id
+        """
+        scores = np.zeros(self.num_docs, dtype=np.float32)
+        for term in set(tokenize(query)):
+            term_id = self._term_id(term)
+            if term_id < 0:
+                continue
+            start, end = self.offsets[term_id], self.offsets[term_id + 1]
+            ids = self.doc_ids[start:end]
+            tf = self.tfs[start:end]
+            # Chunk ids are unique within one postings list, so fancy-index add is safe.
+            scores[ids] += self.idf[term_id] * tf * (self.k1 + 1) / (tf + self._length_norm[ids])
+        return scores
+
+
+def _normalise(scores: np.ndarray) -> np.ndarray:
+    low, high = float(scores.min()), float(scores.max())
+    if high <= low:
+        return np.zeros_like(scores)
+    return (scores - low) / (high - low)
+
+
+class HybridRetriever:
+    """
+    Blends BM25 and dense similarity into one ranking.
+    """
+
+    def __init__(self, index: PolicyIndex, alpha: float = 0.5):
+        """
+        Args:
+            index: Policy index providing chunk text and embeddings
+            alpha: Weight of the dense score; ``1 - alpha`` goes to BM25
+        """
+        self.index = index
+        self.alpha = alpha
+        if all(name in index.arrays for name in BM25Index.ARRAY_NAMES):
+            self.bm25 = BM25Index.from_arrays(index.arrays)
+        else:
+            self.bm25 = BM25Index(list(index.chunks.texts()))
+
+    def search(self, query: str, query_vector: np.ndarray, top_k: int = 4) -> List[Tuple[int, float]]:
+        """
+        Rank chunks by the blended score.
+
+        Args:
+            query: Query text, for BM25
+            query_vector: Unit-length query embedding, for dense scoring
+            top_k: Number of results to return
+
+        Returns:
+            List[Tuple[int, float]]: (chunk id, blended score), best first
+        """
+        if not len(self.index):
+            return []
+        dense = self.index.scores(query_vector)
+        fused = self.alpha * _normalise(dense) + (1 - self.alpha) * _normalise(self.bm25.scores(query))
+        top_k = min(top_k, len(fused))
+        top = np.argpartition(-fused, top_k - 1)[:top_k]
+        top = top[np.argsort(-fused[top])]
+        return [(int(i), float(fused[i])) for i in top]
@@ -0,0 +1,557 @@
+"""
+Persistent embedding index for the RAG agent's policy documents.
+
+An index directory holds one subdirectory per build and a ``CURRENT`` file
+naming the live one. Each build is written under a hidden staging name,
+renamed into place and then published by atomically replacing ``CURRENT``,
+so a reader that resolves ``CURRENT`` once sees one complete build even
+while another is being written, and a server never has the files it has
+memory-mapped deleted from under it. (An index written before builds were
+versioned keeps its files at the top level and is read from there.) A
+build holds:
+
+    meta.json              format version, corpus fingerprint, per-document
+                           hashes, embedder and chunker config
+    chunks.npy             fixed-width chunk table: text offset and length,
+                           source id, section id, page number and page hash
+    chunk_text.bin         UTF-8 text of every chunk, concatenated
+    chunk_sources.json     source document names, indexed by source id
+    chunk_sections.json    section titles, indexed by section id
+    embeddings.npy         float32 matrix (n_chunks x dim) of unit-length embeddings
+    vectors_float16.npy    the same matrix in float16
+    vectors_int8.npy       the same matrix quantized to int8, one scale per row
+    scales_int8.npy        float32 row scales for the int8 matrix
+    <name>.npy             derived arrays listed under ``arrays`` in meta.json,
+                           such as the BM25 postings and section title vectors
+
+Everything except the JSON files is memory-mapped at startup, so a server
+holds no per-chunk Python objects and worker processes on one host share a
+single copy of the data through the page cache.
+Search scores the matrix chosen by ``vector_dtype``; ``embeddings.npy``
+stays the full-precision source for incremental rebuilds. The index is built
+and incrementally refreshed by ``crewai_acp_rag.ingest``, which only
+re-embeds documents and pages whose content hash changed.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from crewai_acp_rag.embeddings import EMBEDDER_CONFIG
+
+FORMAT_VERSION = 6
+
+# "sections" splits pages at their headings and keeps tables whole (see
+# crewai_acp_rag.sections); "fixed" cuts overlapping windows of chunk_size.
+CHUNKER_CONFIG = dict(
+    strategy=os.getenv("RAG_CHUNKER", "sections"),
+    chunk_size=1000,
+    chunk_overlap=200,
+    table_size=2000,
+)
+
+CURRENT_FILE = "CURRENT"
+META_FILE = "meta.json"
+CHUNKS_FILE = "chunks.npy"
+CHUNK_TEXT_FILE = "chunk_text.bin"
+CHUNK_SOURCES_FILE = "chunk_sources.json"
+CHUNK_SECTIONS_FILE = "chunk_sections.json"
+EMBEDDINGS_FILE = "embeddings.npy"
+FLOAT16_FILE = "vectors_float16.npy"
+INT8_FILE = "vectors_int8.npy"
+INT8_SCALES_FILE = "scales_int8.npy"
+# Seconds a replaced build is kept for readers that resolved it just before the swap.
+RETIRED_GRACE = 60.0
+
+BUILD_FILES = (META_FILE, CHUNKS_FILE, CHUNK_TEXT_FILE, CHUNK_SOURCES_FILE, CHUNK_SECTIONS_FILE)
+
+VECTOR_DTYPES = ("float32", "float16", "int8")
+
+CHUNK_DTYPE = np.dtype(
+    [
+        ("offset", "<i8"),
+        ("length", "<i4"),
+        ("source", "<i4"),
+        ("section", "<i4"),
+        ("page", "<i4"),
+        ("page_hash", "S64"),
+    ]
+)
+
+# Rows converted to float32 at a time when scoring a compact matrix; bounds
+# the temporary buffer to a few MB regardless of corpus size.
+SCORE_BLOCK_ROWS = 4096
+
+
+def file_sha256(path: str) -> str:
+    """
+    Compute the SHA-256 digest of a file's contents.
+
+    Args:
+        path: File to hash
+
+    Returns:
+        str: Hex digest
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def text_sha256(text: str) -> str:
+    """
+    Compute the SHA-256 digest of a string.
+
+    Args:
+        text: Text to hash
+
+    Returns:
+        str: Hex digest
+    """
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def index_fingerprint(document_hashes: Dict[str, str], chunker: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Combine the corpus contents with everything else that shapes the index.
+
+    Args:
+        document_hashes: SHA-256 of each source document, keyed by its name
+        chunker: Chunker configuration (default: ``CHUNKER_CONFIG``)
+
+    Returns:
+        str: Hex digest identifying one exact index build
+    """
+    payload = json.dumps(
+        dict(
+            format_version=FORMAT_VERSION,
+            documents=document_hashes,
+            embedder=EMBEDDER_CONFIG,
+            chunker=chunker if chunker is not None else CHUNKER_CONFIG,
+        ),
+        sort_keys=True,
+    )
+    return text_sha256(payload)
+
+
+def chunk_text(text: str, chunk_size: int, chunk_overlap: int) -> List[str]:
+    """
+    Split text into overlapping chunks, preferring to break on whitespace.
+
+    Args:
+        text: Text to split
+        chunk_size: Maximum characters per chunk
+        chunk_overlap: Characters shared between consecutive chunks
+
+    Returns:
+        List[str]: Non-empty chunks
+    """
+    text = " ".join(text.split())
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = min(start + chunk_size, len(text))
+        if end < len(text):
+            split_at = text.rfind(" ", start + chunk_overlap + 1, end)
+            if split_at != -1:
+                end = split_at
+        chunk = text[start:end].strip()
+        if chunk:
+            chunks.append(chunk)
+        if end >= len(text):
+            break
+        start = max(end - chunk_overlap, start + 1)
+    return chunks
+
+
+def quantize_int8(embeddings: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Quantize embeddings to int8 with a symmetric scale per row.
+
+    Args:
+        embeddings: float32 matrix, one row per chunk
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: int8 matrix and float32 scale of each row
+    """
+    scales = np.abs(embeddings).max(axis=1).astype(np.float32) / 127 if len(embeddings) else np.empty(0, np.float32)
+    scales[scales == 0] = 1.0
+    quantized = np.rint(embeddings / scales[:, None]).astype(np.int8)
+    return quantized, scales
+
+
+def _load_buffer(path: Path) -> np.ndarray:
+    # Zero-length files cannot be memory-mapped.
+    if not path.stat().st_size:
+        return np.empty(0, dtype=np.uint8)
+    return np.memmap(path, dtype=np.uint8, mode="r")
+
+
+class ChunkStore:
+    """
+    Chunk records stored column-wise.
+
+    Chunk text lives in one UTF-8 buffer addressed by offset and length, and
+    the remaining fields in a fixed-width NumPy table. Records are only
+    materialised as dicts when they are accessed.
+    """
+
+    def __init__(self, table: np.ndarray, text: np.ndarray, sources: List[str], sections: List[str]):
+        """
+        Args:
+            table: Structured array of ``CHUNK_DTYPE``, one row per chunk
+            text: uint8 buffer holding the UTF-8 text of all chunks
+            sources: Source document names, indexed by the table's ``source`` column
+            sections: Section titles, indexed by the table's ``section`` column
+        """
+        self.table = table
+        self.text_buffer = text
+        self.sources = sources
+        self.sections = sections
+
+    @classmethod
+    def from_records(cls, records: Sequence[Dict[str, Any]]) -> "ChunkStore":
+        """
+        Pack chunk records into a store.
+
+        Args:
+            records: Chunk records with ``text``, ``source``, ``page`` and ``page_hash`` keys,
+                and optionally ``section`` (the title of the section the chunk belongs to)
+
+        Returns:
+            ChunkStore: The packed records
+        """
+        source_ids: Dict[str, int] = {}
+        section_ids: Dict[str, int] = {}
+        encoded = [record["text"].encode("utf-8") for record in records]
+        table = np.zeros(len(records), dtype=CHUNK_DTYPE)
+        table["length"] = [len(text) for text in encoded]
+        if len(records):
+            np.cumsum(table["length"][:-1], out=table["offset"][1:])
+        table["source"] = [source_ids.setdefault(record["source"], len(source_ids)) for record in records]
+        table["section"] = [section_ids.setdefault(record.get("section", ""), len(section_ids)) for record in records]
+        table["page"] = [record["page"] for record in records]
+        table["page_hash"] = [record["page_hash"].encode("ascii") for record in records]
+        text = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        return cls(table, text, list(source_ids), list(section_ids))
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    def text(self, chunk_id: int) -> str:
+        """Text of one chunk."""
+        row = self.table[chunk_id]
+        start = int(row["offset"])
+        return self.text_buffer[start : start + int(row["length"])].tobytes().decode("utf-8")
+
+    def source(self, chunk_id: int) -> str:
+        """Name of the document a chunk came from."""
+        return self.sources[int(self.table[chunk_id]["source"])]
+
+    def section(self, chunk_id: int) -> str:
+        """Title of the section a chunk belongs to (empty if it precedes any heading)."""
+        return self.sections[int(self.table[chunk_id]["section"])]
+
+    def page(self, chunk_id: int) -> int:
+        """Page number of a chunk, starting at 1."""
+        return int(self.table[chunk_id]["page"])
+
+    def texts(self) -> Iterator[str]:
+        """Iterate over chunk texts in chunk id order."""
+        return (self.text(i) for i in range(len(self)))
+
+    def __getitem__(self, chunk_id: int) -> Dict[str, Any]:
+        row = self.table[chunk_id]
+        return dict(
+            text=self.text(chunk_id),
+            source=self.sources[int(row["source"])],
+            section=self.sections[int(row["section"])],
+            page=int(row["page"]),
+            page_hash=row["page_hash"].decode("ascii"),
+        )
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return (self[i] for i in range(len(self)))
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the table and text buffer."""
+        return int(self.table.nbytes + self.text_buffer.nbytes)
+
+
+class PolicyIndex:
+    """
+    Chunks and embeddings of the policy documents, ready for similarity search.
+    """
+
+    def __init__(
+        self,
+        chunks: ChunkStore,
+        embeddings: np.ndarray,
+        meta: Dict[str, Any],
+        vectors: Optional[np.ndarray] = None,
+        scales: Optional[np.ndarray] = None,
+        arrays: Optional[Dict[str, np.ndarray]] = None,
+    ):
+        """
+        Args:
+            chunks: Chunk records
+            embeddings: Full-precision matrix of unit-length chunk embeddings, one row per chunk
+            meta: Contents of ``meta.json``
+            vectors: Matrix to search, if different from ``embeddings`` (float16 or int8)
+            scales: Per-row scales of an int8 ``vectors`` matrix
+            arrays: Derived arrays stored with the index, by name
+        """
+        if len(chunks) != embeddings.shape[0]:
+            raise ValueError(f"Index has {len(chunks)} chunks but {embeddings.shape[0]} embeddings")
+        self.chunks = chunks
+        self.embeddings = embeddings
+        self.meta = meta
+        self.vectors = embeddings if vectors is None else vectors
+        self.scales = scales
+        self.arrays = arrays or {}
+
+    @property
+    def fingerprint(self) -> str:
+        """Fingerprint of the corpus and configuration this index was built from."""
+        return self.meta["fingerprint"]
+
+    @property
+    def vector_dtype(self) -> str:
+        """Precision of the matrix used for search."""
+        return self.vectors.dtype.name
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes of the search matrix, its scales and the chunk store."""
+        scales = self.scales.nbytes if self.scales is not None else 0
+        return int(self.vectors.nbytes + scales + self.chunks.nbytes)
+
+    def __len__(self) -> int:
+        return len(self.chunks)
+
+    def scores(self, query_vector: np.ndarray) -> np.ndarray:
+        """
+        Score every chunk against a query embedding.
+
+        Args:
+            query_vector: Unit-length query embedding
+
+        Returns:
+            np.ndarray: float32 cosine similarity per chunk id
+        """
+        query = np.asarray(query_vector, dtype=np.float32)
+        if self.vectors.dtype == np.float32:
+            return np.asarray(self.vectors @ query, dtype=np.float32)
+        scores = np.empty(len(self), dtype=np.float32)
+        for start in range(0, len(self), SCORE_BLOCK_ROWS):
+            block = self.vectors[start : start + SCORE_BLOCK_ROWS]
+            scores[start : start + len(block)] = block.astype(np.float32) @ query
+        if self.scales is not None:
+            scores *= self.scales
+        return scores
+
+    def search(self, query_vector: np.ndarray, top_k: int = 3) -> List[Tuple[int, float]]:
+        """
+        Find the chunks most similar to a query embedding.
+
+        Args:
+            query_vector: Unit-length query embedding
+            top_k: Number of results to return
+
+        Returns:
+            List[Tuple[int, float]]: (chunk id, cosine similarity), best first
+        """
+        if not len(self):
+            return []
+        scores = self.scores(query_vector)
+        top_k = min(top_k, len(scores))
+        top = np.argpartition(-scores, top_k - 1)[:top_k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(i), float(scores[i])) for i in top]
+
+    @classmethod
+    def load(cls, index_dir: str, vector_dtype: str = "float32") -> "PolicyIndex":
+        """
+        Open an index directory, memory-mapping its arrays.
+
+        Args:
+            index_dir: Directory written by ``write_index``
+            vector_dtype: Matrix to search: ``float32``, ``float16`` or ``int8``
+
+        Returns:
+            PolicyIndex: The loaded index
+        """
+        if vector_dtype not in VECTOR_DTYPES:
+            raise ValueError(f"Unknown vector dtype {vector_dtype!r}, expected one of {', '.join(VECTOR_DTYPES)}")
+        root = current_index_dir(index_dir)
+        meta = json.loads((root / META_FILE).read_text(encoding="utf-8"))
+        chunks = ChunkStore(
+            np.load(root / CHUNKS_FILE, mmap_mode="r"),
+            _load_buffer(root / CHUNK_TEXT_FILE),
+            json.loads((root / CHUNK_SOURCES_FILE).read_text(encoding="utf-8")),
+            json.loads((root / CHUNK_SECTIONS_FILE).read_text(encoding="utf-8")),
+        )
+        embeddings = np.load(root / EMBEDDINGS_FILE, mmap_mode="r")
+        vectors, scales = None, None
+        if vector_dtype == "float16":
+            vectors = np.load(root / FLOAT16_FILE, mmap_mode="r")
+        elif vector_dtype == "int8":
+            vectors = np.load(root / INT8_FILE, mmap_mode="r")
+            scales = np.load(root / INT8_SCALES_FILE, mmap_mode="r")
+        arrays = {name: np.load(root / f"{name}.npy", mmap_mode="r") for name in meta.get("arrays", [])}
+        return cls(chunks, embeddings, meta, vectors=vectors, scales=scales, arrays=arrays)
+
+
+def current_index_dir(index_dir: str) -> Path:
+    """
+    Resolve an index directory to the build it currently points at.
+
+    Args:
+        index_dir: Index directory
+
+    Returns:
+        Path: The live build's directory, or ``index_dir`` itself for an unversioned index
+    """
+    root = Path(index_dir)
+    try:
+        version = (root / CURRENT_FILE).read_text(encoding="utf-8").strip()
+    except OSError:
+        return root
+    return root / version if version else root
+
+
+def read_meta(index_dir: str) -> Optional[Dict[str, Any]]:
+    """
+    Read an index's metadata without loading the rest of it.
+
+    Args:
+        index_dir: Index directory
+
+    Returns:
+        Optional[Dict[str, Any]]: The metadata, or None if there is no readable index
+    """
+    try:
+        return json.loads((current_index_dir(index_dir) / META_FILE).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def _publish(root: Path, version: str) -> None:
+    pointer = root / f".{CURRENT_FILE}-{version}"
+    pointer.write_text(version, encoding="utf-8")
+    # Windows refuses to replace a file another process has open for a moment.
+    for attempt in range(20):
+        try:
+            os.replace(pointer, root / CURRENT_FILE)
+            return
+        except PermissionError:
+            if attempt == 19:
+                pointer.unlink(missing_ok=True)
+                raise
+            time.sleep(0.05)
+
+
+def _retire(root: Path, build: Path) -> None:
+    # A build's modification time records when it stopped being the live one.
+    marker = build / META_FILE if build == root else build
+    try:
+        os.utime(marker)
+    except OSError:
+        pass
+
+
+def _prune(root: Path, keep: Sequence[str]) -> None:
+    # Delete builds retired more than RETIRED_GRACE seconds ago, other than the live one and
+    # the one it replaced, so a reader that resolved CURRENT before a swap can finish opening
+    # its files. A build a process still has memory-mapped can't be deleted on Windows; it
+    # is left for the next write to try again.
+    cutoff = time.time() - RETIRED_GRACE
+    for path in root.glob("v-*"):
+        try:
+            retired = path.stat().st_mtime < cutoff
+        except OSError:
+            continue
+        if path.name not in keep and path.is_dir() and retired:
+            shutil.rmtree(path, ignore_errors=True)
+    # Staging directories of builds whose writer died before renaming them. A writer still at
+    # work keeps touching the file it is writing, so its newest modification time is recent.
+    for path in root.glob(".v-*"):
+        try:
+            written = max((entry.stat().st_mtime for entry in path.iterdir()), default=path.stat().st_mtime)
+        except OSError:
+            continue
+        if written < cutoff:
+            shutil.rmtree(path, ignore_errors=True)
+    legacy_meta = root / META_FILE
+    if "" not in keep and (not legacy_meta.exists() or legacy_meta.stat().st_mtime < cutoff):
+        # Files of an index written before builds were versioned.
+        for path in root.iterdir():
+            if path.is_file() and (path.name in BUILD_FILES or path.suffix == ".npy"):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+
+
+def write_index(
+    index_dir: str,
+    chunks: List[Dict[str, Any]],
+    embeddings: np.ndarray,
+    meta: Dict[str, Any],
+    arrays: Optional[Dict[str, np.ndarray]] = None,
+) -> None:
+    """
+    Write a new build of an index, including its float16 and int8 search matrices.
+
+    The build is written to a staging directory, renamed to its version name
+    and published by replacing ``CURRENT``, so readers see either the previous
+    build or this one, complete. The build it replaced is kept for readers
+    that resolved ``CURRENT`` just before; older ones are deleted once they
+    have been retired for ``RETIRED_GRACE`` seconds, as are staging
+    directories left by a writer that died that long ago.
+
+    Args:
+        index_dir: Index directory
+        chunks: Chunk records
+        embeddings: Embedding matrix, one row per chunk
+        meta: Index metadata
+        arrays: Derived arrays to store alongside, by name
+    """
+    arrays = arrays or {}
+    meta = dict(meta, arrays=sorted(arrays))
+    root = Path(index_dir)
+    root.mkdir(parents=True, exist_ok=True)
+    previous = current_index_dir(index_dir)
+    staging = Path(tempfile.mkdtemp(prefix=".v-", dir=root))
+    try:
+        store = ChunkStore.from_records(chunks)
+        np.save(staging / CHUNKS_FILE, store.table)
+        store.text_buffer.tofile(staging / CHUNK_TEXT_FILE)
+        (staging / CHUNK_SOURCES_FILE).write_text(json.dumps(store.sources, ensure_ascii=False), encoding="utf-8")
+        (staging / CHUNK_SECTIONS_FILE).write_text(json.dumps(store.sections, ensure_ascii=False), encoding="utf-8")
+        np.save(staging / EMBEDDINGS_FILE, embeddings)
+        np.save(staging / FLOAT16_FILE, embeddings.astype(np.float16))
+        quantized, scales = quantize_int8(embeddings)
+        np.save(staging / INT8_FILE, quantized)
+        np.save(staging / INT8_SCALES_FILE, scales)
+        for name, array in arrays.items():
+            np.save(staging / f"{name}.npy", array)
+        (staging / META_FILE).write_text(json.dumps(meta, indent=2), encoding="utf-8")
+        version = staging.name[1:]
+        os.rename(staging, root / version)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    _publish(root, version)
+    _retire(root, previous)
+    _prune(root, keep=(version, "" if previous == root else previous.name))
@@ -0,0 +1,346 @@
+"""
+Corpus ingestion pipeline for the RAG agent.
+
+Takes a directory of policy documents (or a single document) and produces the
+persistent index described in ``crewai_acp_rag.index``:
+
+1. Hash every document. Documents whose hash matches the previous index keep
+   their chunks and embeddings without being parsed again.
+2. Parse the pages of new or changed documents in a process pool.
+3. Hash every parsed page. Pages whose text is unchanged reuse their previous
+   chunks and embeddings.
+4. Chunk the remaining pages along their sections (see
+   ``crewai_acp_rag.sections``) and embed them in large batches.
+
+Adding one document to a large corpus therefore costs roughly one document's
+worth of parsing and embedding instead of a full rebuild.
+"""
+
+import argparse
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from crewai_acp_rag.embeddings import EMBEDDER_CONFIG, embed_documents
+from crewai_acp_rag.hybrid import BM25Index
+from crewai_acp_rag.index import (
+    CHUNKER_CONFIG,
+    FORMAT_VERSION,
+    ChunkStore,
+    PolicyIndex,
+    file_sha256,
+    index_fingerprint,
+    read_meta,
+    text_sha256,
+    write_index,
+)
+from crewai_acp_rag.sections import SECTION_VECTORS, chunk_page, open_section
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SOURCE = os.getenv("RAG_CORPUS_DIR") or os.getenv("RAG_PDF_PATH", "rbhs_info.pdf")
+DEFAULT_INDEX_DIR = os.getenv("RAG_INDEX_DIR", ".rag_index")
+DEFAULT_VECTOR_DTYPE = os.getenv("RAG_VECTOR_DTYPE", "float32")
+
+SUPPORTED_SUFFIXES = (".pdf", ".txt", ".md")
+
+# Pages handed to one worker at a time; keeps big PDFs spread across cores.
+PAGES_PER_TASK = 16
+
+# Texts sent to the embedder per call; the model batches internally.
+EMBED_BLOCK_SIZE = 1024
+
+
+@dataclass
+class IngestStats:
+    """Counts of what an ingestion run reused and what it recomputed."""
+
+    documents_reused: int = 0
+    documents_parsed: int = 0
+    pages_reused: int = 0
+    pages_embedded: int = 0
+    chunks_embedded: int = 0
+    removed: List[str] = field(default_factory=list)
+
+
+def discover_documents(source: str) -> Dict[str, str]:
+    """
+    List the documents that make up a corpus.
+
+    Args:
+        source: A directory of documents or a single document
+
+    Returns:
+        Dict[str, str]: Document path keyed by its name relative to the corpus
+    """
+    root = Path(source)
+    if root.is_file():
+        return {root.name: str(root)}
+    if not root.is_dir():
+        raise FileNotFoundError(f"Corpus source {source} does not exist")
+    return {
+        path.relative_to(root).as_posix(): str(path)
+        for path in sorted(root.rglob("*"))
+        if path.is_file() and path.suffix.lower() in SUPPORTED_SUFFIXES
+    }
+
+
+def _count_pages(path: str) -> int:
+    if not path.lower().endswith(".pdf"):
+        return 1
+    from pypdf import PdfReader
+
+    return len(PdfReader(path).pages)
+
+
+def _extract_pages(path: str, start: int, stop: int) -> List[str]:
+    if not path.lower().endswith(".pdf"):
+        return [Path(path).read_text(encoding="utf-8", errors="replace")]
+    from pypdf import PdfReader
+
+    reader = PdfReader(path)
+    return [reader.pages[i].extract_text() or "" for i in range(start, stop)]
+
+
+def parse_documents(paths: Dict[str, str], workers: int) -> Dict[str, List[str]]:
+    """
+    Extract page texts from documents, spreading page ranges over processes.
+
+    Args:
+        paths: Document path keyed by name
+        workers: Worker processes (1 parses inline)
+
+    Returns:
+        Dict[str, List[str]]: Page texts of each document, in page order
+    """
+    if not paths:
+        return {}
+    names = list(paths)
+    if workers <= 1:
+        return {name: _extract_pages(paths[name], 0, _count_pages(paths[name])) for name in names}
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        page_counts = dict(zip(names, pool.map(_count_pages, [paths[name] for name in names])))
+        futures: List[Tuple[str, Any]] = []
+        for name in names:
+            for start in range(0, page_counts[name], PAGES_PER_TASK):
+                stop = min(start + PAGES_PER_TASK, page_counts[name])
+                futures.append((name, pool.submit(_extract_pages, paths[name], start, stop)))
+
+        pages: Dict[str, List[str]] = {name: [] for name in names}
+        for name, future in futures:
+            pages[name].extend(future.result())
+    return pages
+
+
+def _load_previous(index_dir: str, chunker: Dict[str, Any]) -> Optional[PolicyIndex]:
+    meta = read_meta(index_dir)
+    if meta is None:
+        return None
+    compatible = (
+        meta.get("format_version") == FORMAT_VERSION
+        and meta.get("embedder") == EMBEDDER_CONFIG
+        and meta.get("chunker") == chunker
+    )
+    if not compatible:
+        logger.info(f"Index in {index_dir} was built with a different configuration, rebuilding from scratch")
+        return None
+    return PolicyIndex.load(index_dir)
+
+
+def ingest_corpus(
+    source: str,
+    index_dir: str,
+    workers: Optional[int] = None,
+    batch_size: int = 128,
+    vector_dtype: str = "float32",
+    chunker: Optional[Dict[str, Any]] = None,
+    rebuild: bool = False,
+) -> Tuple[PolicyIndex, IngestStats]:
+    """
+    Build or incrementally refresh the index for a corpus.
+
+    Args:
+        source: A directory of documents or a single document
+        index_dir: Index directory to read the previous build from and write to
+        workers: Parser processes (default: CPU count)
+        batch_size: Passages per embedding forward pass
+        vector_dtype: Precision of the returned index's search matrix
+        chunker: Chunker configuration (default: ``CHUNKER_CONFIG``)
+        rebuild: Ignore the previous build and parse and embed everything again
+
+    Returns:
+        Tuple[PolicyIndex, IngestStats]: The up-to-date index and what it cost
+    """
+    workers = workers or os.cpu_count() or 1
+    chunker = chunker or CHUNKER_CONFIG
+    stats = IngestStats()
+    paths = discover_documents(source)
+    document_hashes = {name: file_sha256(path) for name, path in paths.items()}
+
+    previous = None if rebuild else _load_previous(index_dir, chunker)
+    previous_documents: Dict[str, Any] = previous.meta["documents"] if previous is not None else {}
+    rows_by_source: Dict[str, List[int]] = {}
+    rows_by_page_hash: Dict[str, List[int]] = {}
+    if previous is not None:
+        page_owner: Dict[str, Tuple[str, int]] = {}
+        for row, chunk in enumerate(previous.chunks):
+            rows_by_source.setdefault(chunk["source"], []).append(row)
+            # Identical pages in several documents: reuse only one copy's chunks.
+            page = (chunk["source"], chunk["page"])
+            if page_owner.setdefault(chunk["page_hash"], page) == page:
+                rows_by_page_hash.setdefault(chunk["page_hash"], []).append(row)
+    stats.removed = sorted(set(previous_documents) - set(paths))
+
+    to_parse = {
+        name: path
+        for name, path in paths.items()
+        if previous_documents.get(name, {}).get("sha256") != document_hashes[name]
+    }
+    stats.documents_reused = len(paths) - len(to_parse)
+    stats.documents_parsed = len(to_parse)
+    parsed = parse_documents(to_parse, workers)
+
+    # Each output chunk either points at a previous embedding row or at a
+    # position in the list of texts still to embed.
+    chunks: List[Dict[str, Any]] = []
+    reuse_rows: List[int] = []
+    new_texts: List[str] = []
+    documents_meta: Dict[str, Any] = {}
+    for name in paths:
+        if name not in to_parse:
+            for row in rows_by_source.get(name, []):
+                chunks.append(dict(previous.chunks[row]))
+                reuse_rows.append(row)
+            documents_meta[name] = previous_documents[name]
+            continue
+
+        pages = parsed[name]
+        documents_meta[name] = dict(sha256=document_hashes[name], pages=len(pages))
+        carried = ""
+        for page_number, page_text in enumerate(pages, start=1):
+            # A section carried over from the previous page titles this page's first chunks,
+            # so the same text under another open section is a different page.
+            page_hash = text_sha256(f"{carried}\n{page_text}" if carried else page_text)
+            title = carried
+            if chunker["strategy"] == "sections":
+                carried = open_section(page_text, title)
+            if page_hash in rows_by_page_hash:
+                stats.pages_reused += 1
+                for row in rows_by_page_hash[page_hash]:
+                    chunks.append(dict(previous.chunks[row], source=name, page=page_number))
+                    reuse_rows.append(row)
+                continue
+
+            stats.pages_embedded += 1
+            for section, text in chunk_page(page_text, title=title, **chunker):
+                chunks.append(dict(text=text, source=name, section=section, page=page_number, page_hash=page_hash))
+                reuse_rows.append(-1 - len(new_texts))
+                new_texts.append(text)
+
+    stats.chunks_embedded = len(new_texts)
+    new_embeddings = [
+        embed_documents(new_texts[i : i + EMBED_BLOCK_SIZE], batch_size=batch_size)
+        for i in range(0, len(new_texts), EMBED_BLOCK_SIZE)
+    ]
+    if new_embeddings:
+        dim = new_embeddings[0].shape[1]
+    else:
+        dim = previous.embeddings.shape[1] if previous is not None else 0
+    embeddings = np.empty((len(chunks), dim), dtype=np.float32)
+    fresh = np.concatenate(new_embeddings) if new_embeddings else np.empty((0, dim), dtype=np.float32)
+    for out_row, ref in enumerate(reuse_rows):
+        embeddings[out_row] = previous.embeddings[ref] if ref >= 0 else fresh[-1 - ref]
+
+    meta = dict(
+        format_version=FORMAT_VERSION,
+        fingerprint=index_fingerprint(document_hashes, chunker),
+        documents=documents_meta,
+        embedder=EMBEDDER_CONFIG,
+        chunker=chunker,
+        num_chunks=len(chunks),
+        dim=int(dim),
+    )
+    arrays = BM25Index([chunk["text"] for chunk in chunks]).to_arrays()
+    if chunker["strategy"] == "sections":
+        # Titles are few and short; embedding them all again is cheaper than tracking reuse.
+        titles = ChunkStore.from_records(chunks).sections
+        arrays[SECTION_VECTORS] = (
+            embed_documents(titles, batch_size=batch_size) if titles else np.empty((0, dim), dtype=np.float32)
+        )
+    write_index(index_dir, chunks, embeddings, meta, arrays=arrays)
+    logger.info(
+        f"Ingested {len(paths)} documents into {index_dir}: "
+        f"{stats.documents_reused} unchanged, {stats.documents_parsed} parsed, "
+        f"{stats.pages_reused} pages reused, {stats.pages_embedded} pages / {stats.chunks_embedded} chunks embedded, "
+        f"{len(stats.removed)} removed"
+    )
+    return PolicyIndex.load(index_dir, vector_dtype=vector_dtype), stats
+
+
+def load_or_build_index(
+    source: str = DEFAULT_SOURCE,
+    index_dir: str = DEFAULT_INDEX_DIR,
+    workers: Optional[int] = None,
+    vector_dtype: str = DEFAULT_VECTOR_DTYPE,
+    chunker: Optional[Dict[str, Any]] = None,
+) -> PolicyIndex:
+    """
+    Load the index from disk, refreshing it only if the corpus or config changed.
+
+    Args:
+        source: A directory of documents or a single document
+        index_dir: Index directory
+        workers: Parser processes used if a refresh is needed
+        vector_dtype: Precision of the search matrix: ``float32``, ``float16`` or ``int8``
+        chunker: Chunker configuration (default: ``CHUNKER_CONFIG``)
+
+    Returns:
+        PolicyIndex: An index matching the current corpus and embedder config
+    """
+    paths = discover_documents(source)
+    expected = index_fingerprint({name: file_sha256(path) for name, path in paths.items()}, chunker)
+    meta = read_meta(index_dir)
+    if meta is not None and meta.get("fingerprint") == expected:
+        logger.info(f"Loading index from {index_dir}")
+        return PolicyIndex.load(index_dir, vector_dtype=vector_dtype)
+    if meta is not None:
+        logger.info(f"Index in {index_dir} is stale, refreshing")
+    index, _ = ingest_corpus(source, index_dir, workers=workers, vector_dtype=vector_dtype, chunker=chunker)
+    return index
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Command-line entry point for building or refreshing the index."""
+    parser = argparse.ArgumentParser(description="Build or refresh the RAG agent's persistent embedding index.")
+    parser.add_argument(
+        "source",
+        nargs="?",
+        default=DEFAULT_SOURCE,
+        help="Directory of documents or a single document (default: %(default)s)",
+    )
+    parser.add_argument("--index-dir", default=DEFAULT_INDEX_DIR, help="Index directory (default: %(default)s)")
+    parser.add_argument("--workers", type=int, default=None, help="Parser processes (default: CPU count)")
+    parser.add_argument("--batch-size", type=int, default=128, help="Passages per embedding forward pass")
+    parser.add_argument("--force", action="store_true", help="Ignore the previous index and rebuild everything")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    index, stats = ingest_corpus(
+        args.source, args.index_dir, workers=args.workers, batch_size=args.batch_size, rebuild=args.force
+    )
+    print(f"Index ready: {len(index)} chunks, fingerprint {index.fingerprint[:12]}")
+    print(
+        f"Documents: {stats.documents_reused} unchanged, {stats.documents_parsed} parsed; "
+        f"pages: {stats.pages_reused} reused, {stats.pages_embedded} embedded; "
+        f"chunks embedded: {stats.chunks_embedded}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+Cross-encoder reranking of retrieved passages.
+
+First-stage retrieval (dense or hybrid) ranks chunks by how close they are
+to the query, not by whether they answer it, so the agent reads several
+passages it doesn't need. A ``Reranker`` scores a wider set of candidates
+against the query with a cross-encoder, in one batch on CPU, and keeps only
+the best few.
+
+Reranking is bounded by a per-request time budget. Scoring runs on a
+dedicated thread; if it hasn't finished by the deadline (or fails) the tool
+falls back to the first-stage order. Under load, a rerank that overran
+keeps the thread busy and the next requests fall back too (their queued
+reranks are cancelled), which sheds reranking instead of queueing behind it.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+RERANKER_MODEL = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+
+
+@lru_cache(maxsize=4)
+def get_reranker_model(model_name: str = RERANKER_MODEL) -> Any:
+    """
+    Load a sentence-transformers cross-encoder once per process.
+
+    Args:
+        model_name: Hugging Face model id
+
+    Returns:
+        CrossEncoder: The shared reranking model
+    """
+    from sentence_transformers import CrossEncoder
+
+    logger.info(f"Loading reranker model {model_name}...")
+    return CrossEncoder(model_name, max_length=512)
+
+
+class Reranker:
+    """
+    Reorders first-stage hits by cross-encoder relevance within a time budget.
+    """
+
+    def __init__(
+        self,
+        model_name: str = RERANKER_MODEL,
+        candidates: int = 20,
+        top_n: int = 3,
+        budget_ms: float = 300.0,
+        window: int = 1024,
+    ):
+        """
+        Args:
+            model_name: Cross-encoder to score (query, passage) pairs with
+            candidates: First-stage hits to rerank
+            top_n: Passages kept after reranking
+            budget_ms: Longest a request waits for scores before using the first-stage order
+            window: Number of recent rerank latencies kept for the percentiles
+        """
+        self.model_name = model_name
+        self.candidates = candidates
+        self.top_n = top_n
+        self.budget_ms = budget_ms
+
+        self.reranked = 0
+        self.timeouts = 0
+        self.errors = 0
+        self._latencies: deque = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="reranker")
+
+    def warm_up(self) -> None:
+        """Load the model and run one forward pass so the first request stays within budget."""
+        self.score("warm-up", ["warm-up"])
+
+    def score(self, query: str, passages: Sequence[str]) -> np.ndarray:
+        """
+        Score passages against a query in one batch, without a time limit.
+
+        Args:
+            query: Search query
+            passages: Candidate passage texts
+
+        Returns:
+            np.ndarray: float32 relevance score per passage (higher is better)
+        """
+        model = get_reranker_model(self.model_name)
+        scores = model.predict(
+            [(query, passage) for passage in passages],
+            batch_size=max(len(passages), 1),
+            show_progress_bar=False,
+            convert_to_numpy=True,
+        )
+        return np.asarray(scores, dtype=np.float32)
+
+    def rerank(
+        self,
+        query: str,
+        hits: Sequence[Tuple[int, float]],
+        passages: Sequence[str],
+    ) -> Optional[List[Tuple[int, float]]]:
+        """
+        Reorder hits by relevance and keep the best ``top_n``.
+
+        Args:
+            query: Search query
+            hits: First-stage (chunk id, score) pairs, best first
+            passages: Text of each hit
+
+        Returns:
+            Optional[List[Tuple[int, float]]]: (chunk id, relevance) pairs, best first,
+                or None if the budget ran out or scoring failed
+        """
+        if not hits:
+            return []
+        start = time.perf_counter()
+        future = self._executor.submit(self.score, query, passages)
+        try:
+            scores = future.result(timeout=self.budget_ms / 1000)
+        except FutureTimeoutError:
+            # Drop it if it is still queued behind an earlier overrun.
+            future.cancel()
+            with self._lock:
+                self.timeouts += 1
+            logger.info(f"Rerank of {len(hits)} passages exceeded {self.budget_ms:.0f} ms, using retrieval order")
+            return None
+        except Exception as e:
+            with self._lock:
+                self.errors += 1
+            logger.warning(f"Rerank failed, using retrieval order: {e}")
+            return None
+
+        order = np.argsort(-scores, kind="stable")[: self.top_n]
+        with self._lock:
+            self.reranked += 1
+            self._latencies.append(time.perf_counter() - start)
+        return [(hits[i][0], float(scores[i])) for i in order]
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Report rerank counters.
+
+        Returns:
+            Dict[str, Any]: Reranked requests, fallbacks and rerank latency in milliseconds
+        """
+        with self._lock:
+            latencies = sorted(self._latencies)
+        return dict(
+            reranked=self.reranked,
+            timeouts=self.timeouts,
+            errors=self.errors,
+            latency_ms=dict(
+                mean=round(sum(latencies) / len(latencies) * 1000, 1) if latencies else 0.0,
+                p95=round(latencies[max(int(len(latencies) * 0.95) - 1, 0)] * 1000, 1) if latencies else 0.0,
+            ),
+        )
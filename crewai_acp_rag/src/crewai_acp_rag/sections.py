@@ -0,0 +1,279 @@
+"""
+Structure-aware chunking and the section index.
+
+Fixed-size windows cut the policy's benefit tables and waiting-period
+clauses in half, so the agent has to search several times and read more
+context to answer. ``chunk_sections`` instead splits a page at its headings
+(short upper-case titles such as "EXCLUSIONS" or "2.1 WAITING PERIODS", or
+Markdown ``#`` headings) and emits each section as one chunk, prefixed with
+its title:
+
+* a section that fits in ``chunk_size`` characters stays whole;
+* a table (most lines carry a figure, e.g. "Rehabilitation 2 months") stays
+  whole up to ``table_size``;
+* anything larger is split between lines, and every piece repeats the title.
+
+An upper-case line carrying a figure or amount ("GOLD 12 MONTHS $500") is a
+table row, not a heading. A section runs on across a page break: the title
+open at the end of one page is passed to the next (see ``open_section``).
+
+Each chunk records its section title. ``SectionIndex`` groups chunks by
+title and matches a topic ("waiting periods", "exclusions") against the
+title embeddings stored with the index, so a tool can return a whole section
+in one call.
+"""
+
+import re
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from crewai_acp_rag.index import PolicyIndex, chunk_text
+
+# Derived array holding one unit-length embedding per ``ChunkStore.sections`` entry.
+SECTION_VECTORS = "section_vectors"
+
+_MARKDOWN_HEADING_RE = re.compile(r"^#{1,6}\s+(.*)$")
+# "3. ", "2.1 " or "2.1. " in front of a heading.
+_NUMBERING_RE = re.compile(r"^(?:\d+\.|\d+(?:\.\d+)+\.?)\s+")
+_FIGURE_RE = re.compile(r"\d")
+_AMOUNT_RE = re.compile(r"[\d$€£%]")
+
+# Longest line read as an upper-case heading.
+MAX_HEADING_LENGTH = 60
+
+# Share of lines carrying a figure above which a section is treated as a table.
+TABLE_LINE_RATIO = 0.5
+
+
+def heading_text(line: str) -> Optional[str]:
+    """
+    The heading on a line, if the line is one.
+
+    Args:
+        line: One line of page text, whitespace-normalized
+
+    Returns:
+        Optional[str]: The heading text, or None for a body line
+    """
+    match = _MARKDOWN_HEADING_RE.match(line)
+    if match:
+        return match.group(1).strip() or None
+    if len(line) > MAX_HEADING_LENGTH:
+        return None
+    title = _NUMBERING_RE.sub("", line, count=1)
+    letters = [c for c in title if c.isalpha()]
+    # Past its numbering a heading is words only; figures and amounts make it a table row.
+    if len(letters) >= 3 and title.upper() == title and not _AMOUNT_RE.search(title):
+        return line
+    return None
+
+
+def _scan(text: str, title: str) -> Tuple[List[Tuple[str, List[str]]], str]:
+    sections: List[Tuple[str, List[str]]] = []
+    body: List[str] = []
+    heading: List[str] = []
+    for raw in text.splitlines():
+        line = " ".join(raw.split())
+        if not line:
+            continue
+        text_of_heading = heading_text(line)
+        if text_of_heading is not None:
+            heading.append(text_of_heading)
+            continue
+        if heading:
+            if body:
+                sections.append((title, body))
+            title, body, heading = " ".join(heading), [], []
+        body.append(line)
+    if body:
+        sections.append((title, body))
+    # A heading at the foot of the page opens the section the next page continues.
+    return sections, " ".join(heading) if heading else title
+
+
+def split_sections(text: str, title: str = "") -> List[Tuple[str, List[str]]]:
+    """
+    Split page text into titled sections.
+
+    Consecutive heading lines form one title (PDF extraction often breaks a
+    heading over several lines). Text before the first heading belongs to
+    ``title``, the section left open by the previous page.
+
+    Args:
+        text: Page text
+        title: Title of the section open where the page starts ("" for none)
+
+    Returns:
+        List[Tuple[str, List[str]]]: (title, body lines) of each section that has a body
+    """
+    return _scan(text, title)[0]
+
+
+def open_section(text: str, title: str = "") -> str:
+    """
+    Title of the section still open at the end of a page.
+
+    Args:
+        text: Page text
+        title: Title of the section open where the page starts
+
+    Returns:
+        str: The title to pass to the next page's ``chunk_page``
+    """
+    return _scan(text, title)[1]
+
+
+def is_table(lines: List[str]) -> bool:
+    """Whether most lines of a section carry a figure, as benefit and waiting-period tables do."""
+    return sum(1 for line in lines if _FIGURE_RE.search(line)) >= TABLE_LINE_RATIO * len(lines)
+
+
+def _pieces(title: str, lines: List[str], limit: int, chunk_overlap: int) -> Iterator[str]:
+    prefix = f"{title}\n" if title else ""
+    budget = max(limit - len(prefix), 1)
+    # Aim for pieces of equal size rather than full pieces and a small remainder.
+    total = sum(len(line) + 1 for line in lines)
+    target = total / -(-total // budget)
+    piece: List[str] = []
+    size = 0
+    for line in lines:
+        if len(line) > budget:
+            # A single line longer than a chunk (e.g. an unwrapped paragraph).
+            if piece:
+                yield prefix + "\n".join(piece)
+                piece, size = [], 0
+            for part in chunk_text(line, budget, min(chunk_overlap, budget // 2)):
+                yield prefix + part
+            continue
+        if piece and (size + 1 + len(line) > budget or size >= target):
+            yield prefix + "\n".join(piece)
+            piece, size = [], 0
+        piece.append(line)
+        size += len(line) + (1 if size else 0)
+    if piece:
+        yield prefix + "\n".join(piece)
+
+
+def chunk_sections(
+    text: str,
+    chunk_size: int,
+    chunk_overlap: int,
+    table_size: int,
+    title: str = "",
+) -> List[Tuple[str, str]]:
+    """
+    Chunk page text along its sections.
+
+    Args:
+        text: Page text
+        chunk_size: Maximum characters per chunk of prose
+        chunk_overlap: Overlap used only when a single line must be split
+        table_size: Maximum characters per chunk of a table
+        title: Title of the section open where the page starts
+
+    Returns:
+        List[Tuple[str, str]]: (section title, chunk text) pairs
+    """
+    chunks = []
+    for section_title, lines in split_sections(text, title):
+        limit = table_size if is_table(lines) else chunk_size
+        chunks.extend((section_title, piece) for piece in _pieces(section_title, lines, limit, chunk_overlap))
+    return chunks
+
+
+def chunk_page(
+    text: str,
+    strategy: str,
+    chunk_size: int,
+    chunk_overlap: int,
+    table_size: int,
+    title: str = "",
+) -> List[Tuple[str, str]]:
+    """
+    Chunk one page with the configured strategy.
+
+    Args:
+        text: Page text
+        strategy: ``sections`` or ``fixed``
+        chunk_size: Maximum characters per chunk
+        chunk_overlap: Characters shared between consecutive fixed-size chunks
+        table_size: Maximum characters per table chunk (``sections`` only)
+        title: Section left open by the previous page (``sections`` only, see ``open_section``)
+
+    Returns:
+        List[Tuple[str, str]]: (section title, chunk text) pairs; titles are empty for ``fixed``
+    """
+    if strategy == "sections":
+        return chunk_sections(text, chunk_size, chunk_overlap, table_size, title)
+    if strategy == "fixed":
+        return [("", chunk) for chunk in chunk_text(text, chunk_size, chunk_overlap)]
+    raise ValueError(f"Unknown chunking strategy {strategy!r}, expected 'sections' or 'fixed'")
+
+
+class SectionIndex:
+    """
+    Chunks grouped by section title, searchable by topic.
+    """
+
+    def __init__(self, index: PolicyIndex):
+        """
+        Args:
+            index: Index built with the ``sections`` chunker (its ``section_vectors`` array is required)
+        """
+        if SECTION_VECTORS not in index.arrays:
+            raise ValueError("Index has no section vectors; rebuild it with RAG_CHUNKER=sections")
+        self.index = index
+        self.titles = index.chunks.sections
+        self.vectors = index.arrays[SECTION_VECTORS]
+        # Chunk ids sorted by section, in document order within each section.
+        section_ids = np.asarray(index.chunks.table["section"])
+        self._order = np.argsort(section_ids, kind="stable")
+        self._bounds = np.searchsorted(section_ids[self._order], np.arange(len(self.titles) + 1))
+        self._titled = np.array([bool(title) for title in self.titles], dtype=bool)
+
+    def __len__(self) -> int:
+        return int(self._titled.sum())
+
+    def chunk_ids(self, section_id: int) -> np.ndarray:
+        """Chunk ids of one section, in document order."""
+        return self._order[self._bounds[section_id] : self._bounds[section_id + 1]]
+
+    def lookup(self, query_vector: np.ndarray, top_k: int = 1) -> List[Tuple[int, float]]:
+        """
+        Find the sections whose titles best match a topic.
+
+        Args:
+            query_vector: Unit-length embedding of the topic
+            top_k: Number of sections to return
+
+        Returns:
+            List[Tuple[int, float]]: (section id, cosine similarity), best first
+        """
+        if not len(self):
+            return []
+        scores = np.where(self._titled, self.vectors @ np.asarray(query_vector, dtype=np.float32), -np.inf)
+        top = np.argsort(-scores)[: min(top_k, len(self))]
+        return [(int(i), float(scores[i])) for i in top]
+
+    def render(self, section_id: int, max_chars: int = 4000) -> str:
+        """
+        Text of a whole section, labelled with source and page.
+
+        Args:
+            section_id: Section to render
+            max_chars: Stop adding chunks once the output would exceed this
+
+        Returns:
+            str: The section's chunks, in document order
+        """
+        chunks = self.index.chunks
+        passages: List[str] = []
+        size = 0
+        for chunk_id in self.chunk_ids(section_id):
+            passage = f"[{chunks.source(chunk_id)} p.{chunks.page(chunk_id)}] {chunks.text(chunk_id)}"
+            if passages and size + len(passage) > max_chars:
+                break
+            passages.append(passage)
+            size += len(passage)
+        return f"Section: {self.titles[section_id]}\n" + "\n\n".join(passages)
@@ -0,0 +1,144 @@
+"""
+Semantic answer cache for the RAG agent.
+
+Questions are matched on their embedding rather than their exact text, so
+"waiting period for rehab" can reuse the answer to "rehabilitation waiting
+period". Cached question embeddings live in one contiguous matrix and a
+lookup is a single matrix-vector product. Entries expire after a TTL and
+the least recently used entry is evicted when the cache is full. Nothing
+else removes them: a process answers from the index it loaded at startup,
+so the cache starts empty with the index a restart loads.
+
+The threshold must sit above the similarity of questions that only share a
+shape: with bge-small-en-v1.5, "waiting period for cataract surgery" and
+"waiting period for rehabilitation" score high although their answers
+differ. benchmarks/bench_answer_cache.py measures it on paraphrases and
+such near misses.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+
+@dataclass
+class _Entry:
+    question: str
+    answer: str
+
+
+class SemanticAnswerCache:
+    """
+    LRU/TTL cache of answers keyed on unit-length question embeddings.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.97,
+        max_entries: int = 512,
+        ttl_seconds: float = 3600.0,
+    ):
+        """
+        Args:
+            threshold: Minimum cosine similarity for a cached question to match
+            max_entries: Maximum number of cached answers (0 disables the cache)
+            ttl_seconds: Seconds an answer stays valid after it was stored
+        """
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()
+        self._vectors: Optional[np.ndarray] = None
+        self._stored_at = np.zeros(max_entries, dtype=np.float64)
+        self._valid = np.zeros(max_entries, dtype=bool)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, vector: np.ndarray) -> Optional[str]:
+        """
+        Find the answer to the most similar cached question.
+
+        Args:
+            vector: Unit-length embedding of the incoming question
+
+        Returns:
+            Optional[str]: The cached answer, or None on a miss
+        """
+        with self._lock:
+            self._expire()
+            if self._vectors is None or not self._entries:
+                self.misses += 1
+                return None
+
+            scores = np.where(self._valid, self._vectors @ vector, -np.inf)
+            slot = int(np.argmax(scores))
+            if scores[slot] < self.threshold:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(slot)
+            self.hits += 1
+            return self._entries[slot].answer
+
+    def store(self, question: str, vector: np.ndarray, answer: str) -> None:
+        """
+        Cache an answer, evicting the least recently used entry if full.
+
+        Args:
+            question: The question as asked
+            vector: Unit-length embedding of the question
+            answer: The answer to return for similar questions
+        """
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            if self._vectors is None:
+                self._vectors = np.zeros((self.max_entries, vector.shape[0]), dtype=np.float32)
+
+            self._expire()
+            if len(self._entries) >= self.max_entries:
+                slot, _ = self._entries.popitem(last=False)
+                self.evictions += 1
+            else:
+                slot = int(np.argmin(self._valid))
+
+            self._vectors[slot] = vector
+            self._stored_at[slot] = time.monotonic()
+            self._valid[slot] = True
+            self._entries[slot] = _Entry(question, answer)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Report cache counters.
+
+        Returns:
+            Dict[str, Any]: Hits, misses, hit ratio, size and removal counts
+        """
+        lookups = self.hits + self.misses
+        return dict(
+            hits=self.hits,
+            misses=self.misses,
+            hit_ratio=self.hits / lookups if lookups else 0.0,
+            size=len(self._entries),
+            evictions=self.evictions,
+            expirations=self.expirations,
+        )
+
+    def _expire(self) -> None:
+        expired = self._valid & (time.monotonic() - self._stored_at > self.ttl_seconds)
+        for slot in np.flatnonzero(expired):
+            del self._entries[int(slot)]
+            self.expirations += 1
+        self._valid &= ~expired
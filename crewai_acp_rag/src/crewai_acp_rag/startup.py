@@ -0,0 +1,161 @@
+"""
+Background warm-up and health endpoints for the RAG server.
+
+Loading the LLM client, the embedding model, the policy index and the crew
+pool takes seconds to minutes. ``RagServer`` binds its port straight away and
+runs that work in a background thread, while exposing:
+
+    GET /livez   200 as long as the process is serving requests
+    GET /readyz  200 once warm-up has finished, 503 while loading or after a failure
+    GET /metrics serving counters supplied by the agent (queueing, coalescing, caching)
+
+The health endpoints return the ``StartupState`` report: status, error (if
+any) and the time spent in each warm-up phase. Runs that arrive before the agent is ready wait
+for warm-up to finish instead of failing.
+"""
+
+import asyncio
+import logging
+import time
+from collections.abc import AsyncGenerator
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from acp_sdk.server import Server
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+
+logger = logging.getLogger(__name__)
+
+
+class StartupState:
+    """
+    Tracks warm-up progress and how long each phase took.
+    """
+
+    def __init__(self) -> None:
+        self.phases: Dict[str, float] = {}
+        self.error: Optional[str] = None
+        self._created_at = time.perf_counter()
+        self._finished_at: Optional[float] = None
+        self._task: Optional[asyncio.Future] = None
+
+    @property
+    def status(self) -> str:
+        """``loading``, ``ready`` or ``failed``."""
+        if self.error is not None:
+            return "failed"
+        return "ready" if self._finished_at is not None else "loading"
+
+    @property
+    def ready(self) -> bool:
+        return self.status == "ready"
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """
+        Time one warm-up phase.
+
+        Args:
+            name: Phase name used in the report
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = time.perf_counter() - start
+            logger.info(f"Startup phase {name} took {self.phases[name]:.2f}s")
+
+    def run(self, loader: Callable[[], None]) -> None:
+        """
+        Run the warm-up in the calling thread.
+
+        Args:
+            loader: Function performing the warm-up phases
+
+        Raises:
+            Exception: Whatever the loader raised, after recording it
+        """
+        try:
+            loader()
+        except Exception as e:
+            self.error = f"{type(e).__name__}: {e}"
+            logger.exception("RAG agent warm-up failed")
+            raise
+        self._finished_at = time.perf_counter()
+        logger.info(f"RAG agent ready after {self._finished_at - self._created_at:.2f}s")
+
+    def start_background(self, loader: Callable[[], None]) -> None:
+        """
+        Run the warm-up in a worker thread; must be called from the event loop.
+
+        Args:
+            loader: Function performing the warm-up phases
+        """
+        if self._task is None and self.status == "loading":
+            self._task = asyncio.ensure_future(asyncio.to_thread(self.run, loader))
+            # Failures are reported through status/error; don't log them twice.
+            self._task.add_done_callback(lambda task: task.cancelled() or task.exception())
+
+    async def wait_ready(self) -> None:
+        """
+        Wait for a background warm-up to finish.
+
+        Raises:
+            RuntimeError: If the warm-up failed
+        """
+        if self._task is not None and not self._task.done():
+            await asyncio.wait({self._task})
+        if self.error is not None:
+            raise RuntimeError(f"RAG agent failed to start: {self.error}")
+
+    def report(self) -> Dict[str, Any]:
+        """Status, error and per-phase timings in milliseconds."""
+        finished = self._finished_at if self._finished_at is not None else time.perf_counter()
+        return dict(
+            status=self.status,
+            error=self.error,
+            phases_ms={name: round(seconds * 1000, 1) for name, seconds in self.phases.items()},
+            elapsed_ms=round((finished - self._created_at) * 1000, 1),
+        )
+
+
+class RagServer(Server):
+    """
+    ACP server that warms the RAG agent up in the background and reports liveness and readiness.
+    """
+
+    def __init__(
+        self,
+        startup: StartupState,
+        loader: Callable[[], None],
+        metrics: Optional[Callable[[], Dict[str, Any]]] = None,
+    ) -> None:
+        """
+        Args:
+            startup: State shared with the agent, which waits on it
+            loader: Warm-up run once the server has started, unless ``startup`` is already ready
+            metrics: Returns the counters served at /metrics (default: the startup report only)
+        """
+        super().__init__()
+        self.startup = startup
+        self.loader = loader
+        self.metrics_source = metrics
+
+    async def livez(self) -> JSONResponse:
+        return JSONResponse(dict(self.startup.report(), alive=True))
+
+    async def readyz(self) -> JSONResponse:
+        return JSONResponse(self.startup.report(), status_code=200 if self.startup.ready else 503)
+
+    async def metrics(self) -> JSONResponse:
+        metrics = self.metrics_source() if self.metrics_source is not None else {}
+        return JSONResponse(dict(startup=self.startup.report(), **metrics))
+
+    @asynccontextmanager
+    async def lifespan(self, app: FastAPI) -> AsyncGenerator[None, None]:
+        app.add_api_route("/livez", self.livez, methods=["GET"])
+        app.add_api_route("/readyz", self.readyz, methods=["GET"])
+        app.add_api_route("/metrics", self.metrics, methods=["GET"])
+        self.startup.start_background(self.loader)
+        yield
@@ -0,0 +1,185 @@
+"""
+Token-level streaming of crew runs over ACP.
+
+CrewAI reports LLM tokens and tool usage on its global event bus, from the
+worker thread that runs the crew. ``RunStream`` binds itself to a context
+variable before starting the crew; ``CrewPool.kickoff`` copies the context
+into its worker thread, so the bus handlers below can find the stream that
+belongs to the run emitting each event and forward it to the ACP generator
+as ``MessagePart``s:
+
+* answer tokens as plain-text parts, starting at the first token after the
+  ReAct ``Final Answer:`` marker, and
+* retrieval progress as trajectory parts when a tool starts and finishes.
+"""
+
+import asyncio
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Awaitable, List, Optional
+
+from acp_sdk.models import MessagePart, TrajectoryMetadata
+from crewai.utilities.events import (
+    LLMCallStartedEvent,
+    LLMStreamChunkEvent,
+    ToolUsageFinishedEvent,
+    ToolUsageStartedEvent,
+    crewai_event_bus,
+)
+
+FINAL_ANSWER_MARKER = "Final Answer:"
+
+_current_stream: ContextVar[Optional["RunStream"]] = ContextVar("rag_run_stream", default=None)
+
+
+class FinalAnswerFilter:
+    """
+    Passes through only the text after ``Final Answer:`` in one LLM response.
+
+    Thought/Action steps of the ReAct loop are held back; the marker may be
+    split across chunks, so text is buffered until it is found.
+    """
+
+    def __init__(self) -> None:
+        self._buffer = ""
+        self._answering = False
+
+    def reset(self) -> None:
+        """Start filtering a new LLM response."""
+        self._buffer = ""
+        self._answering = False
+
+    def feed(self, chunk: str) -> str:
+        """
+        Consume one streamed chunk.
+
+        Args:
+            chunk: Text produced by the model
+
+        Returns:
+            str: Answer text to forward (may be empty)
+        """
+        if self._answering:
+            return chunk
+        self._buffer += chunk
+        marker_at = self._buffer.find(FINAL_ANSWER_MARKER)
+        if marker_at == -1:
+            return ""
+        self._answering = True
+        answer = self._buffer[marker_at + len(FINAL_ANSWER_MARKER) :].lstrip()
+        self._buffer = ""
+        return answer
+
+
+class RunStream:
+    """
+    Per-run bridge from crew events to an async iterator of ``MessagePart``s.
+    """
+
+    def __init__(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._filter = FinalAnswerFilter()
+        self.streamed: List[str] = []
+        self.result: Any = None
+
+    @property
+    def streamed_text(self) -> str:
+        """Answer text forwarded so far."""
+        return "".join(self.streamed)
+
+    def push(self, part: MessagePart) -> None:
+        """Queue a part for the ACP generator; safe to call from any thread."""
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, part)
+
+    def on_llm_call_started(self) -> None:
+        self._filter.reset()
+
+    def on_chunk(self, chunk: str) -> None:
+        text = self._filter.feed(chunk)
+        if text:
+            self.streamed.append(text)
+            self.push(MessagePart(content=text, content_type="text/plain"))
+
+    async def run(self, kickoff: Awaitable[Any]) -> AsyncIterator[MessagePart]:
+        """
+        Run a crew kickoff, yielding parts as its events arrive.
+
+        The kickoff's return value is stored in ``result`` once it finishes.
+
+        Args:
+            kickoff: Un-awaited ``crew_pool.kickoff(...)`` coroutine
+
+        Yields:
+            MessagePart: Answer tokens and retrieval progress
+        """
+        token = _current_stream.set(self)
+        try:
+            task = asyncio.ensure_future(kickoff)
+        finally:
+            _current_stream.reset(token)
+
+        try:
+            while True:
+                getter = asyncio.ensure_future(self._queue.get())
+                done, _ = await asyncio.wait({getter, task}, return_when=asyncio.FIRST_COMPLETED)
+                if getter not in done:
+                    getter.cancel()
+                    break
+                yield getter.result()
+            # Events are queued before the worker thread hands back its result.
+            while not self._queue.empty():
+                yield self._queue.get_nowait()
+            self.result = task.result()
+        finally:
+            if not task.done():
+                task.cancel()
+
+
+def _tool_input(tool_args: Any) -> dict:
+    return tool_args if isinstance(tool_args, dict) else {"input": str(tool_args)}
+
+
+@crewai_event_bus.on(LLMCallStartedEvent)
+def _on_llm_call_started(source: Any, event: LLMCallStartedEvent) -> None:
+    stream = _current_stream.get()
+    if stream is not None:
+        stream.on_llm_call_started()
+
+
+@crewai_event_bus.on(LLMStreamChunkEvent)
+def _on_llm_stream_chunk(source: Any, event: LLMStreamChunkEvent) -> None:
+    stream = _current_stream.get()
+    if stream is not None and event.tool_call is None:
+        stream.on_chunk(event.chunk)
+
+
+@crewai_event_bus.on(ToolUsageStartedEvent)
+def _on_tool_usage_started(source: Any, event: ToolUsageStartedEvent) -> None:
+    stream = _current_stream.get()
+    if stream is not None:
+        stream.push(
+            MessagePart(
+                metadata=TrajectoryMetadata(
+                    message=f"Searching: {event.tool_name}",
+                    tool_name=event.tool_name,
+                    tool_input=_tool_input(event.tool_args),
+                )
+            )
+        )
+
+
+@crewai_event_bus.on(ToolUsageFinishedEvent)
+def _on_tool_usage_finished(source: Any, event: ToolUsageFinishedEvent) -> None:
+    stream = _current_stream.get()
+    if stream is not None:
+        elapsed = (event.finished_at - event.started_at).total_seconds()
+        stream.push(
+            MessagePart(
+                metadata=TrajectoryMetadata(
+                    message=f"Retrieved context in {elapsed:.2f}s",
+                    tool_name=event.tool_name,
+                    tool_input=_tool_input(event.tool_args),
+                    tool_output={"characters": len(str(event.output)), "from_cache": event.from_cache},
+                )
+            )
+        )
@@ -0,0 +1,155 @@
+"""
+CrewAI tools backed by the persistent policy index.
+"""
+
+from typing import Any, List, Optional, Tuple, Type
+
+from crewai.tools import BaseTool
+from pydantic import BaseModel, Field, PrivateAttr
+
+from crewai_acp_rag.embeddings import embed_query
+from crewai_acp_rag.hybrid import HybridRetriever
+from crewai_acp_rag.index import PolicyIndex
+from crewai_acp_rag.rerank import Reranker
+from crewai_acp_rag.sections import SectionIndex
+
+
+def format_passages(index: PolicyIndex, hits: List[Tuple[int, float]]) -> str:
+    """
+    Render search hits as the tool output the agent reads.
+
+    Args:
+        index: Index the hits refer to
+        hits: (chunk id, score) pairs, best first
+
+    Returns:
+        str: Passages labelled with their source document and page
+    """
+    chunks = index.chunks
+    passages = [f"[{chunks.source(i)} p.{chunks.page(i)}] {chunks.text(i)}" for i, _ in hits]
+    return "Relevant Content:\n" + "\n\n".join(passages)
+
+
+def candidate_count(top_k: int, reranker: Optional[Reranker]) -> int:
+    """First-stage hits to retrieve: ``top_k``, or the reranker's candidate pool."""
+    return max(top_k, reranker.candidates) if reranker is not None else top_k
+
+
+def rerank_hits(
+    index: PolicyIndex,
+    reranker: Optional[Reranker],
+    query: str,
+    hits: List[Tuple[int, float]],
+    top_k: int,
+) -> List[Tuple[int, float]]:
+    """
+    Trim first-stage hits with the reranker, if there is one.
+
+    Args:
+        index: Index the hits refer to
+        reranker: Reranker to apply (None keeps the retrieval order)
+        query: Search query
+        hits: (chunk id, score) pairs from first-stage retrieval, best first
+        top_k: Hits to keep when not reranking or when the rerank falls back
+
+    Returns:
+        List[Tuple[int, float]]: The hits to show the agent, best first
+    """
+    if reranker is None:
+        return hits[:top_k]
+    reranked = reranker.rerank(query, hits, [index.chunks.text(i) for i, _ in hits])
+    return reranked if reranked is not None else hits[:top_k]
+
+
+class PolicySearchToolSchema(BaseModel):
+    """Input for PolicySearchTool."""
+
+    query: str = Field(..., description="Mandatory query you want to use to search the policy document's content")
+
+
+class PolicySearchTool(BaseTool):
+    """
+    Semantic search over the policy documents using the pre-built index.
+
+    Drop-in replacement for ``PDFSearchTool`` that reads its embeddings from
+    the memory-mapped index instead of re-embedding the PDFs on startup.
+    """
+
+    name: str = "Search the policy document's content"
+    description: str = "A tool that can be used to semantic search a query from the hospital policy document's content."
+    args_schema: Type[BaseModel] = PolicySearchToolSchema
+    index: Any = Field(exclude=True)
+    top_k: int = 3
+    reranker: Any = Field(default=None, exclude=True)
+
+    def _run(self, query: str) -> str:
+        index: PolicyIndex = self.index
+        hits = index.search(embed_query(query), top_k=candidate_count(self.top_k, self.reranker))
+        return format_passages(index, rerank_hits(index, self.reranker, query, hits, self.top_k))
+
+
+class HybridSearchTool(BaseTool):
+    """
+    Keyword + semantic search over the policy documents.
+
+    Blends BM25 over the chunk text with dense similarity so exact policy
+    terms and paraphrased questions both surface in a single call.
+    """
+
+    name: str = "Search the policy document's content"
+    description: str = (
+        "A tool that can be used to search the hospital policy document's content. "
+        "It matches both exact terms (benefit names, waiting periods, dollar limits) and the meaning of the query."
+    )
+    args_schema: Type[BaseModel] = PolicySearchToolSchema
+    index: Any = Field(exclude=True)
+    top_k: int = 4
+    alpha: float = 0.5
+    reranker: Any = Field(default=None, exclude=True)
+    _retriever: HybridRetriever = PrivateAttr()
+
+    def model_post_init(self, __context: Any) -> None:
+        super().model_post_init(__context)
+        self._retriever = HybridRetriever(self.index, alpha=self.alpha)
+
+    def _run(self, query: str) -> str:
+        hits = self._retriever.search(query, embed_query(query), top_k=candidate_count(self.top_k, self.reranker))
+        return format_passages(self.index, rerank_hits(self.index, self.reranker, query, hits, self.top_k))
+
+
+class SectionLookupToolSchema(BaseModel):
+    """Input for SectionLookupTool."""
+
+    section: str = Field(..., description="Topic of the policy section to read, e.g. 'waiting periods' or 'exclusions'")
+
+
+class SectionLookupTool(BaseTool):
+    """
+    Whole-section reads from the policy documents' section index.
+
+    Returns every chunk of the section whose title best matches the topic,
+    so a table or clause arrives complete in one call instead of over
+    several searches.
+    """
+
+    name: str = "Read a policy section"
+    description: str = (
+        "A tool that returns a whole section of the hospital policy document, including its tables, "
+        "by topic (e.g. 'waiting periods', 'exclusions', 'dental'). Use it when the question is about one topic."
+    )
+    args_schema: Type[BaseModel] = SectionLookupToolSchema
+    index: Any = Field(exclude=True)
+    min_score: float = 0.5
+    max_chars: int = 4000
+    _sections: SectionIndex = PrivateAttr()
+
+    def model_post_init(self, __context: Any) -> None:
+        super().model_post_init(__context)
+        self._sections = SectionIndex(self.index)
+
+    def _run(self, section: str) -> str:
+        hits = self._sections.lookup(embed_query(section), top_k=1)
+        if not hits or hits[0][1] < self.min_score:
+            titles = sorted({title for title in self._sections.titles if title})
+            return f"No section matches '{section}'. Sections: " + "; ".join(titles)
+        return self._sections.render(hits[0][0], max_chars=self.max_chars)
@@ -0,0 +1,74 @@
+"""
+Multi-process serving for the RAG server.
+
+The parent process binds the listening socket once and starts worker
+processes that inherit it; each worker serves the socket with its own
+uvicorn loop and the kernel spreads incoming connections between them. The
+workers are plain subprocesses (not uvicorn's supervisor), so slow imports
+and model loading in a worker can't trip a health-check restart loop.
+
+The policy index must exist before the workers start; they then memory-map
+the same files and share one copy of the data through the page cache.
+"""
+
+import logging
+import os
+import signal
+import socket
+import subprocess
+import sys
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Environment variable carrying the inherited listening socket to a worker.
+WORKER_FD_ENV = "RAG_WORKER_FD"
+
+
+def worker_fd() -> Optional[int]:
+    """The listening socket handed down by ``serve_workers``, if this process is a worker."""
+    fd = os.getenv(WORKER_FD_ENV)
+    return int(fd) if fd else None
+
+
+def serve_workers(command: List[str], workers: int, host: str, port: int) -> int:
+    """
+    Bind ``host:port`` and run ``workers`` copies of ``command`` serving it.
+
+    Returns when any worker exits (or on SIGTERM/SIGINT), after stopping the
+    rest, so a container supervisor sees the failure and can restart the set.
+
+    Args:
+        command: Worker command line; it must serve the socket in ``WORKER_FD_ENV``
+        workers: Number of worker processes
+        host: Interface to bind
+        port: Port to bind
+
+    Returns:
+        int: Exit code of the first worker to exit (0 on a signal)
+    """
+    sock = socket.create_server((host, port), backlog=2048)
+    sock.set_inheritable(True)
+    env = dict(os.environ)
+    env[WORKER_FD_ENV] = str(sock.fileno())
+    # Each worker runs its own embedding model; split the cores between them.
+    env.setdefault("OMP_NUM_THREADS", str(max(1, (os.cpu_count() or 1) // workers)))
+
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    processes = [subprocess.Popen(command, env=env, pass_fds=[sock.fileno()]) for _ in range(workers)]
+    logger.info(f"Serving on {host}:{port} with {workers} workers: {[p.pid for p in processes]}")
+    exit_code = 0
+    try:
+        pid, status = os.wait()
+        exit_code = os.waitstatus_to_exitcode(status)
+        logger.warning(f"Worker {pid} exited with code {exit_code}, stopping the others")
+    except (KeyboardInterrupt, SystemExit):
+        pass
+    finally:
+        for process in processes:
+            if process.poll() is None:
+                process.terminate()
+        for process in processes:
+            process.wait()
+        sock.close()
+    return exit_code
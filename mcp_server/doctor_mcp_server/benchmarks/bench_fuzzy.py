@@ -0,0 +1,88 @@
+"""
+Benchmark: resolving misspelt locations in one lookup.
+
+Takes the distinct locations of a synthetic directory (see
+bench_location_index.py), misspells one word of each with a random
+deletion, substitution, insertion or transposition, and reports how often
+DoctorIndex.search maps the typo back to the intended location words (and
+how often it still finds nothing), with lookup latency. Exact matching, as
+before, finds nothing for any of them, so every typo cost the agent at
+least one more tool call.
+
+Usage:
+    python benchmarks/bench_fuzzy.py [--doctors 500000] [--typos 2000]
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from doctor_index import DoctorIndex, location_tokens  # noqa: E402
+
+
+def misspell(word: str, rng: random.Random) -> str:
+    i = rng.randrange(1, len(word))
+    kind = rng.choice(("delete", "substitute", "insert", "transpose"))
+    if kind == "delete":
+        return word[:i] + word[i + 1 :]
+    if kind == "substitute":
+        return word[:i] + rng.choice(string.ascii_lowercase) + word[i + 1 :]
+    if kind == "insert":
+        return word[:i] + rng.choice(string.ascii_lowercase) + word[i:]
+    return word[: i - 1] + word[i] + word[i - 1] + word[i + 1 :]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--doctors", type=int, default=500_000)
+    parser.add_argument("--output", default="/tmp/doctor_list_synthetic.json")
+    parser.add_argument("--typos", type=int, default=2000)
+    args = parser.parse_args()
+
+    from bench_location_index import generate
+
+    generate(args.output, args.doctors)
+    with open(args.output, encoding="utf-8") as f:
+        index = DoctorIndex(list(json.load(f).values()))
+
+    rng = random.Random(1)
+    resolved = unresolved = wrong = exact = 0
+    samples = []
+    for _ in range(args.typos):
+        location = rng.choice(index.locations)
+        words = location.split()
+        # Misspell one word of at least 3 letters; numbers stay as typed.
+        candidates = [i for i, word in enumerate(words) if len(word) >= 3 and word.isalpha()]
+        target = rng.choice(candidates)
+        words[target] = misspell(words[target], rng)
+        query = " ".join(words)
+
+        exact += bool(index.find(query))
+        start = time.perf_counter()
+        doctor_ids, corrected = index.search(query)
+        samples.append(time.perf_counter() - start)
+        if not doctor_ids:
+            unresolved += 1
+        elif set(location_tokens(location)) <= set(location_tokens(corrected or query)):
+            resolved += 1
+        else:
+            wrong += 1
+
+    samples.sort()
+    print(f"{args.typos} misspelt locations over {len(index.locations)} locations")
+    print(f"exact match found something: {exact / args.typos:6.1%}")
+    print(f"search resolved to intended: {resolved / args.typos:6.1%}")
+    print(f"search resolved elsewhere:   {wrong / args.typos:6.1%}")
+    print(f"search found nothing:        {unresolved / args.typos:6.1%}")
+    print(f"search latency p50 {statistics.median(samples) * 1000:.2f} ms  p99 {samples[int(len(samples) * 0.99)] * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
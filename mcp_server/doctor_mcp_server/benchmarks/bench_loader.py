@@ -0,0 +1,102 @@
+"""
+Benchmark: memory and time to load a large doctor directory.
+
+Writes a synthetic doctor_list_sg.json (--doctors entries, 1M by default,
+using the generator from bench_location_index.py), then loads it in a fresh
+process per loader:
+
+* "json.load": the previous loader, parsing the whole file and keeping the
+  record dicts;
+* "streaming": doctor_records.load_doctors, streaming records into
+  ``__slots__`` Doctors with shared strings.
+
+Peak is the process's maximum resident set size during the load and
+steady-state its resident set after the load and a garbage collection, both
+above the interpreter's footprint before loading.
+
+Usage:
+    python benchmarks/bench_loader.py [--doctors 1000000] [--output /tmp/doctor_list_1m.json]
+"""
+
+import argparse
+import gc
+import json
+import os
+import subprocess
+import sys
+import time
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVER_DIR)
+
+LOADERS = ("json.load", "streaming")
+
+
+def rss_mb() -> float:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+def peak_rss_mb() -> float:
+    # VmHWM starts afresh at exec, unlike ru_maxrss, which a child inherits from the parent that forked it.
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    raise RuntimeError("VmHWM not found in /proc/self/status")
+
+
+def measure(loader: str, path: str) -> None:
+    """Load the file with one loader and print a JSON line of measurements."""
+    from doctor_records import load_doctors
+
+    gc.collect()
+    baseline = rss_mb()
+    start = time.perf_counter()
+    if loader == "json.load":
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        doctors = [doc_data for doc_id, doc_data in data.items()]
+        del data
+    else:
+        doctors = load_doctors(path)
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    print(json.dumps(dict(
+        doctors=len(doctors),
+        seconds=elapsed,
+        peak_mb=peak_rss_mb() - baseline,
+        steady_mb=rss_mb() - baseline,
+    )))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--doctors", type=int, default=1_000_000)
+    parser.add_argument("--output", default="/tmp/doctor_list_1m.json")
+    parser.add_argument("--measure", choices=LOADERS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        measure(args.measure, args.output)
+        return
+
+    from bench_location_index import generate
+
+    generate(args.output, args.doctors)
+    print(f"File size {os.path.getsize(args.output) / 2**20:.0f} MB")
+    print(f"{'loader':<10} {'load s':>7} {'peak MB':>8} {'steady MB':>10} {'bytes/doctor':>13}")
+    for loader in LOADERS:
+        output = subprocess.run(
+            [sys.executable, __file__, "--measure", loader, "--output", args.output],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(
+            f"{loader:<10} {result['seconds']:7.1f} {result['peak_mb']:8.0f} {result['steady_mb']:10.0f} "
+            f"{result['steady_mb'] * 2**20 / result['doctors']:13.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark: location lookups over a synthetic national doctor directory.
+
+Generates a doctor_list_sg.json-shaped file with --doctors entries spread
+over a few thousand locations, then times get_doctors_by_location for
+several queries two ways:
+
+* "scan": the previous implementation, which lowercases and substring-checks
+  every doctor's location and builds the response with repeated ``+=``;
+* "index": DoctorIndex lookups with join-based rendering.
+
+Usage:
+    python benchmarks/bench_location_index.py [--doctors 500000] [--output /tmp/doctor_list_synthetic.json]
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from doctor_index import DoctorIndex, format_doctor  # noqa: E402
+
+AREAS = [
+    "Ang Mo Kio", "Bedok", "Bishan", "Bukit Batok", "Bukit Merah", "Bukit Panjang", "Bukit Timah", "Changi",
+    "Choa Chu Kang", "Clementi", "Geylang", "Hougang", "Jurong East", "Jurong West", "Kallang", "Marine Parade",
+    "Novena", "Orchard", "Pasir Ris", "Punggol", "Queenstown", "Sembawang", "Sengkang", "Serangoon", "Tampines",
+    "Toa Payoh", "Woodlands", "Yishun", "Tanjong Pagar", "Outram",
+]
+SUFFIXES = ["", "Central", "North", "South", "East", "West", "Park", "Heights", "Gardens", "Vale", "Rise", "Crescent"]
+SPECIALTIES = ["General Practitioner", "Pediatrician", "Dermatologist", "Cardiologist", "Orthopedist", "Psychiatrist"]
+QUERIES = ["Orchard", "Jurong East", "tampines north", "Jur", "Woodlands Heights 12", "Nowhere"]
+
+
+def generate(path: str, doctors: int, seed: int = 0) -> None:
+    rng = random.Random(seed)
+    locations = [f"{area} {suffix} {n}".replace("  ", " ") for area in AREAS for suffix in SUFFIXES for n in range(1, 16)]
+    data = {}
+    for i in range(doctors):
+        location = rng.choice(locations)
+        data[f"DOCSG{i:07d}"] = dict(
+            name=f"Dr. Doctor {i}",
+            specialty=rng.choice(SPECIALTIES),
+            address=dict(street=f"{i % 999} {location} Road", city="Singapore", zip_code=f"{rng.randrange(10**6):06d}"),
+            phone=f"+65 6{rng.randrange(10**7):07d}",
+            email=f"doctor{i}@example.com",
+            clinic=f"{location} Clinic",
+            location=location,
+        )
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    print(f"Wrote {doctors} doctors over {len(locations)} locations to {path}")
+
+
+def scan(doctors: List[Dict[str, Any]], location: str) -> str:
+    filtered = [d for d in doctors if location.lower() in d.get("location", "").lower()]
+    if not filtered:
+        return f"No doctors found in {location}.\n"
+    response = f"Doctors in {location}:\n"
+    for doc in filtered:
+        response += f"- {doc.get('name', 'N/A')} ({doc.get('specialty', 'N/A')}) at {doc.get('clinic', 'N/A')} ({doc.get('location', 'N/A')})\n"
+    return response
+
+
+def indexed(index: DoctorIndex, location: str) -> str:
+    doctor_ids = index.find(location)
+    if not doctor_ids:
+        return f"No doctors found in {location}.\n"
+    lines = [f"Doctors in {location}:\n"]
+    lines.extend(format_doctor(index.doctors[i]) for i in doctor_ids)
+    return "".join(lines)
+
+
+def timed(fn: Callable[[], str], repeats: int) -> tuple:
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--doctors", type=int, default=500_000)
+    parser.add_argument("--output", default="/tmp/doctor_list_synthetic.json")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    generate(args.output, args.doctors)
+    with open(args.output, encoding="utf-8") as f:
+        doctors = list(json.load(f).values())
+
+    start = time.perf_counter()
+    index = DoctorIndex(doctors)
+    print(f"Index built in {time.perf_counter() - start:.2f}s: {len(index.locations)} locations, {len(index.vocabulary)} words")
+
+    print(f"{'query':<22} {'scan ms':>9} {'index ms':>9} {'speed-up':>9} {'results':>8}")
+    for query in QUERIES:
+        scan_ms, _ = timed(lambda: scan(doctors, query), args.repeats)
+        index_ms, response = timed(lambda: indexed(index, query), args.repeats)
+        results = response.count("\n- ")
+        print(f"{query:<22} {scan_ms:9.1f} {index_ms:9.2f} {scan_ms / index_ms:8.0f}x {results:8d}")
+
+
+if __name__ == "__main__":
+    main()
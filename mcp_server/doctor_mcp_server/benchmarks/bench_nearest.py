@@ -0,0 +1,101 @@
+"""
+Benchmark: k-nearest doctor queries at growing directory sizes.
+
+Builds a synthetic postal-code lookup (--codes six-digit codes scattered
+around the sector centroids in postal_centroids_sg.csv) and directories of
+--sizes doctors at random codes, then times DoctorGeoIndex.nearest against a
+linear scan over every doctor for random query points, checking that both
+return the same distances.
+
+Usage:
+    python benchmarks/bench_nearest.py [--sizes 10000 100000 1000000] [--codes 120000] [--k 5]
+"""
+
+import argparse
+import math
+import os
+import random
+import statistics
+import sys
+import time
+from typing import Dict, List, Tuple
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVER_DIR)
+
+from doctor_geo import KM_PER_DEGREE, DoctorGeoIndex, PostalLocator, load_postal_centroids  # noqa: E402
+
+
+def synthetic_centroids(count: int, rng: random.Random) -> Dict[str, Tuple[float, float]]:
+    sectors = {code: point for code, point in load_postal_centroids(os.path.join(SERVER_DIR, "postal_centroids_sg.csv")).items() if len(code) == 2}
+    centroids = dict(sectors)
+    codes = sorted(sectors)
+    while len(centroids) < count + len(sectors):
+        sector = rng.choice(codes)
+        lat, lon = sectors[sector]
+        code = f"{sector}{rng.randrange(10000):04d}"
+        # Buildings within a couple of kilometres of the sector centre.
+        centroids[code] = (round(lat + rng.gauss(0, 0.015), 6), round(lon + rng.gauss(0, 0.015), 6))
+    return centroids
+
+
+def scan(locator: PostalLocator, doctors: List[dict], lat: float, lon: float, k: int, lon_scale: float) -> List[float]:
+    """The k smallest distances, computing the distance to every doctor."""
+    distances = []
+    for doctor in doctors:
+        point = locator.locate(doctor["address"]["zip_code"])
+        if point is not None:
+            distances.append(math.hypot((point[1] - lon) * lon_scale, (point[0] - lat) * KM_PER_DEGREE))
+    distances.sort()
+    return distances[:k]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--codes", type=int, default=120_000)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--scan-queries", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    centroids = synthetic_centroids(args.codes, rng)
+    locator = PostalLocator(centroids)
+    six_digit = [code for code in centroids if len(code) == 6]
+    print(f"{len(six_digit)} postal codes")
+    print(f"{'doctors':>9} {'build s':>8} {'points':>7} {'cell km':>8} {'index p50 ms':>13} {'index p99 ms':>13} {'scan ms':>9}")
+
+    for size in args.sizes:
+        doctors = [dict(address=dict(zip_code=rng.choice(six_digit))) for _ in range(size)]
+        start = time.perf_counter()
+        index = DoctorGeoIndex(doctors, locator)
+        build = time.perf_counter() - start
+
+        queries = [(rng.uniform(1.25, 1.45), rng.uniform(103.65, 104.0)) for _ in range(args.queries)]
+        samples = []
+        for lat, lon in queries:
+            start = time.perf_counter()
+            index.nearest(lat, lon, args.k)
+            samples.append(time.perf_counter() - start)
+        samples.sort()
+
+        scan_samples = []
+        lon_scale = KM_PER_DEGREE * math.cos(math.radians(index.origin_lat))
+        for lat, lon in queries[: args.scan_queries]:
+            start = time.perf_counter()
+            expected = scan(locator, doctors, lat, lon, args.k, lon_scale)
+            scan_samples.append(time.perf_counter() - start)
+            got = [distance for _, distance in index.nearest(lat, lon, args.k)]
+            assert all(math.isclose(a, b, abs_tol=1e-6) for a, b in zip(expected, got)), (expected, got)
+
+        print(
+            f"{size:9d} {build:8.2f} {len(index.points):7d} {index.cell_km:8.3f} "
+            f"{statistics.median(samples) * 1000:13.3f} {samples[int(len(samples) * 0.99)] * 1000:13.3f} "
+            f"{statistics.median(scan_samples) * 1000:9.1f}"
+        )
+        del doctors, index
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Benchmark: per-request latency of the doctor tools by transport.
+
+Serves a synthetic directory (--doctors entries, written with the generator
+from bench_location_index.py) and times get_doctors_by_location calls:
+
+* stdio spawn: a new stdio server process per request, as an MCP consumer
+  without a long-lived server does (startup and directory load included);
+* stdio session: one stdio server process, all requests in its session;
+* http client per request: a running ``--transport http`` server, with a new
+  MCP client (connect and initialize) per request;
+* http session: the running server, all requests over one MCP client;
+* REST: the running server's POST /call/doctor_info_tool.
+
+Usage:
+    python benchmarks/bench_transport.py [--doctors 100000] [--requests 200] [--spawns 10] [--workers 1]
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from typing import Awaitable, Callable, List
+
+import httpx
+from fastmcp import Client
+from fastmcp.client.transports import StdioTransport, StreamableHttpTransport
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVER = os.path.join(SERVER_DIR, "doctor_info_server.py")
+ARGUMENTS = {"location": "Woodlands Heights 12"}
+
+
+def http_client(headers=None, timeout=None, auth=None, base_url: str = "") -> httpx.AsyncClient:
+    # httpx writes a request's headers and body separately; without TCP_NODELAY the body
+    # waits for the server's delayed ACK (~40 ms) on every reused connection.
+    transport = httpx.AsyncHTTPTransport(socket_options=[(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)])
+    return httpx.AsyncClient(
+        headers=headers, timeout=timeout or httpx.Timeout(30.0), auth=auth,
+        base_url=base_url, transport=transport, follow_redirects=True,
+    )
+
+
+def http_transport(url: str) -> StreamableHttpTransport:
+    return StreamableHttpTransport(url, httpx_client_factory=http_client)
+
+
+def stdio_transport(env: dict) -> StdioTransport:
+    return StdioTransport(command=sys.executable, args=[SERVER], env=env, cwd=SERVER_DIR)
+
+
+async def timed(call: Callable[[], Awaitable[object]], count: int) -> List[float]:
+    samples = []
+    for _ in range(count):
+        start = time.perf_counter()
+        await call()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def report(name: str, samples: List[float]) -> None:
+    samples = sorted(samples)
+    print(
+        f"{name:<26} {len(samples):5d} {statistics.median(samples) * 1000:10.2f} "
+        f"{samples[int(len(samples) * 0.95)] * 1000:10.2f} {len(samples) / sum(samples):10.1f}"
+    )
+
+
+async def run(args: argparse.Namespace, env: dict) -> None:
+    print(f"{'transport':<26} {'calls':>5} {'p50 ms':>10} {'p95 ms':>10} {'calls/s':>10}")
+
+    async def spawn_and_call() -> None:
+        async with Client(stdio_transport(env)) as client:
+            await client.call_tool("get_doctors_by_location", ARGUMENTS)
+
+    report("stdio spawn", await timed(spawn_and_call, args.spawns))
+
+    async with Client(stdio_transport(env)) as client:
+        report("stdio session", await timed(lambda: client.call_tool("get_doctors_by_location", ARGUMENTS), args.requests))
+
+    url = f"http://127.0.0.1:{args.port}"
+    server = subprocess.Popen(
+        [sys.executable, SERVER, "--transport", "http", "--host", "127.0.0.1", "--port", str(args.port), "--workers", str(args.workers)],
+        env=dict(env, PYTHONUNBUFFERED="1"), cwd=SERVER_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.monotonic() + 120
+        while True:
+            try:
+                httpx.get(f"{url}/metrics").raise_for_status()
+                break
+            except httpx.HTTPError:
+                if time.monotonic() > deadline or server.poll() is not None:
+                    raise RuntimeError("HTTP server did not start")
+                await asyncio.sleep(0.2)
+
+        async def connect_and_call() -> None:
+            async with Client(http_transport(f"{url}/mcp")) as client:
+                await client.call_tool("get_doctors_by_location", ARGUMENTS)
+
+        report("http client per request", await timed(connect_and_call, args.requests // 4))
+
+        async with Client(http_transport(f"{url}/mcp")) as client:
+            report("http session", await timed(lambda: client.call_tool("get_doctors_by_location", ARGUMENTS), args.requests))
+
+        async with http_client(base_url=url) as rest:
+            report("REST", await timed(lambda: rest.post("/call/doctor_info_tool", json=ARGUMENTS), args.requests))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--doctors", type=int, default=100_000)
+    parser.add_argument("--output", default="/tmp/doctor_list_transport.json")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--spawns", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    from bench_location_index import generate
+
+    generate(args.output, args.doctors)
+    env = dict(os.environ, DOCTORS_JSON_FILE=args.output, DOCTORS_RELOAD_INTERVAL="0")
+    asyncio.run(run(args, env))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+Hot-reloadable doctor directory.
+
+A ``DoctorDirectory`` is an immutable snapshot: the doctor records and every
+index built over them. ``DirectoryReloader`` holds the current snapshot and
+polls the JSON file from a daemon thread; when the file's modification time
+or size changes it streams the new file into compact records
+(``doctor_records``) and indexes them in that thread, then replaces the
+snapshot with a single reference assignment.
+
+A snapshot's ``version`` is a hash of the file content it was parsed from,
+so every process serving the same file (e.g. forked HTTP workers, each
+reloading on its own) gives the same data the same version, and a process
+that caught an intermediate write has a different one.
+
+Queries take ``reloader.current`` once and use only that snapshot, so a
+query running during a reload sees the old directory or the new one, never
+a mix. If the new file can't be read (missing, or caught half-written) the
+old snapshot stays in place and the file is tried again when it next changes.
+"""
+
+import hashlib
+import os
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from doctor_records import Doctor, load_doctors
+
+
+class DoctorDirectory:
+    """
+    One loaded version of the directory and the indexes built over it.
+    """
+
+    def __init__(self, doctors: List[Doctor], indexes: Dict[str, Any], version: str = ""):
+        """
+        Args:
+            doctors: Doctor records; ids are positions in this list
+            indexes: Indexes over ``doctors`` by name (e.g. "location", "geo")
+            version: Hash of the file content the records were loaded from ("" before any load)
+        """
+        self.doctors = doctors
+        self.indexes = indexes
+        self.version = version
+        self.loaded_at = time.time()
+
+    def __len__(self) -> int:
+        return len(self.doctors)
+
+
+class DirectoryReloader:
+    """
+    Keeps the current ``DoctorDirectory`` and reloads it when its file changes.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        build_indexes: Callable[[List[Doctor]], Dict[str, Any]],
+        interval: float = 2.0,
+    ):
+        """
+        Args:
+            path: Doctor JSON file to watch
+            build_indexes: Builds the indexes of a snapshot from its doctor records
+            interval: Seconds between checks of the file; 0 disables watching
+        """
+        self.path = path
+        self.build_indexes = build_indexes
+        self.interval = interval
+
+        self.loads = 0
+        self.failures = 0
+        self.last_error: Optional[str] = None
+        self.last_duration_ms = 0.0
+        self._seen: Optional[Tuple[int, int]] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.current = DoctorDirectory([], build_indexes([]))
+
+    def _file_state(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def load(self) -> bool:
+        """
+        Read and index the file now, and swap it in if that succeeds.
+
+        Returns:
+            bool: Whether a new snapshot was installed
+        """
+        with self._lock:
+            state = self._file_state()
+            start = time.perf_counter()
+            try:
+                digest = hashlib.sha256()
+                doctors = load_doctors(self.path, digest=digest)
+                directory = DoctorDirectory(doctors, self.build_indexes(doctors), version=digest.hexdigest()[:16])
+            except Exception as e:
+                # A missing or half-written file, or records an index can't take.
+                self._seen = state
+                self.failures += 1
+                self.last_error = f"{type(e).__name__}: {e}"
+                print(f"Error loading doctor information from {self.path}, keeping {len(self.current)} doctors: {e}", file=sys.stderr)
+                return False
+            self.current = directory
+            self._seen = state
+            self.loads += 1
+            self.last_error = None
+            self.last_duration_ms = (time.perf_counter() - start) * 1000
+            print(f"Loaded {len(doctors)} doctors from {self.path} in {self.last_duration_ms:.0f} ms.", file=sys.stderr)
+            return True
+
+    def check(self) -> bool:
+        """
+        Reload if the file changed since it was last read.
+
+        Returns:
+            bool: Whether a new snapshot was installed
+        """
+        state = self._file_state()
+        if state is None or state == self._seen:
+            return False
+        return self.load()
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def start(self) -> None:
+        """Start watching the file from a daemon thread (no-op if interval is 0 or already started)."""
+        if self.interval <= 0 or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, name="doctor-directory-reloader", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop watching the file."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Report the loaded directory and reload counters.
+
+        Returns:
+            Dict[str, Any]: Records and version of the current snapshot, when it was loaded,
+                successful loads, failures, the last error and how long the last load took
+        """
+        directory = self.current
+        return dict(
+            path=self.path,
+            doctors=len(directory),
+            version=directory.version,
+            loaded_at=directory.loaded_at,
+            loads=self.loads,
+            failures=self.failures,
+            last_error=self.last_error,
+            last_load_ms=round(self.last_duration_ms, 1),
+        )
@@ -0,0 +1,245 @@
+"""
+Nearest-doctor search over postal-code centroids.
+
+Each doctor is placed at the centroid of their ``address.zip_code``, read
+from a local lookup file (``postal_centroids_sg.csv``):
+
+    postal_code,latitude,longitude
+    238877,1.3036,103.8318
+    23,1.3030,103.8330
+
+A six-digit code is looked up exactly; a code missing from the file falls
+back to its two-digit postal sector, so a file of sector centroids alone
+still places every doctor, only less precisely.
+
+Doctors sharing a centroid are grouped into one point, and the points are
+bucketed into a uniform grid of square cells (in kilometres, on an
+equirectangular projection, which is accurate to well under 1% across
+Singapore). A query visits the rings of cells around it, nearest first,
+and stops once the ``k`` closest doctors found so far are nearer than any
+unvisited cell, so it reads a handful of cells whatever the directory size.
+
+Coordinates must be finite numbers within latitude and longitude range
+(``is_valid_point``): a NaN centroid would poison the projection and the
+grid, so such a doctor is left unlocated, and ``nearest`` rejects such a
+query point with ``ValueError``.
+"""
+
+import csv
+import math
+import numbers
+import re
+from array import array
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+# Points per grid cell the cell size is chosen for.
+POINTS_PER_CELL = 4
+
+_DIGITS_RE = re.compile(r"\d+")
+
+
+def normalize_postal_code(postal_code: str) -> str:
+    """
+    Keep only the digits of a postal code ("S 238877" -> "238877").
+
+    Args:
+        postal_code: Postal code as written in an address or query
+
+    Returns:
+        str: The digits of the code
+    """
+    return "".join(_DIGITS_RE.findall(str(postal_code)))
+
+
+def is_valid_point(latitude: Any, longitude: Any) -> bool:
+    """
+    Whether a latitude and longitude are finite numbers in range.
+
+    Args:
+        latitude: Latitude, expected within [-90, 90]
+        longitude: Longitude, expected within [-180, 180]
+
+    Returns:
+        bool: True if both are real numbers (not bools or strings), finite and in range
+    """
+    for value, limit in ((latitude, 90.0), (longitude, 180.0)):
+        if isinstance(value, bool) or not isinstance(value, numbers.Real):
+            return False
+        if not math.isfinite(value) or abs(value) > limit:
+            return False
+    return True
+
+
+def load_postal_centroids(path: str) -> Dict[str, Tuple[float, float]]:
+    """
+    Load postal-code centroids from a CSV file.
+
+    Args:
+        path: CSV with ``postal_code``, ``latitude`` and ``longitude`` columns
+
+    Returns:
+        Dict[str, Tuple[float, float]]: Postal code or sector -> (latitude, longitude)
+    """
+    centroids: Dict[str, Tuple[float, float]] = {}
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f):
+            code = normalize_postal_code(row["postal_code"])
+            if code:
+                centroids[code] = (float(row["latitude"]), float(row["longitude"]))
+    return centroids
+
+
+class PostalLocator:
+    """
+    Resolves postal codes to centroids, falling back to the postal sector.
+    """
+
+    def __init__(self, centroids: Dict[str, Tuple[float, float]]):
+        """
+        Args:
+            centroids: Postal code or two-digit sector -> (latitude, longitude)
+        """
+        self.centroids = centroids
+
+    def locate(self, postal_code: str) -> Optional[Tuple[float, float]]:
+        """
+        Find the centroid of a postal code.
+
+        Args:
+            postal_code: Postal code, e.g. "238877"
+
+        Returns:
+            Optional[Tuple[float, float]]: (latitude, longitude), or None if neither
+                the code nor its sector is in the lookup file
+        """
+        code = normalize_postal_code(postal_code)
+        if not code:
+            return None
+        centroid = self.centroids.get(code)
+        if centroid is None and len(code) > 2:
+            centroid = self.centroids.get(code[:2])
+        return centroid
+
+
+class DoctorGeoIndex:
+    """
+    Doctors grouped by centroid, with a grid over the centroids for k-nearest queries.
+    """
+
+    def __init__(self, doctors: Sequence[Dict[str, Any]], locator: PostalLocator):
+        """
+        Args:
+            doctors: Doctor records; ids are positions in this sequence
+            locator: Resolves each doctor's ``address.zip_code`` to a centroid
+        """
+        self.doctors = doctors
+        self.unlocated = 0
+        self.points: List[Tuple[float, float]] = []
+        self.point_doctors: List[array] = []
+        point_ids: Dict[Tuple[float, float], int] = {}
+        for doctor_id, doctor in enumerate(doctors):
+            centroid = locator.locate((doctor.get("address") or {}).get("zip_code", ""))
+            if centroid is None or not is_valid_point(*centroid):
+                self.unlocated += 1
+                continue
+            point_id = point_ids.get(centroid)
+            if point_id is None:
+                point_id = point_ids[centroid] = len(self.points)
+                self.points.append(centroid)
+                self.point_doctors.append(array("I"))
+            self.point_doctors[point_id].append(doctor_id)
+
+        # Project around the mean latitude so distances are plain kilometres.
+        self.origin_lat = sum(lat for lat, _ in self.points) / len(self.points) if self.points else 0.0
+        self._lon_scale = KM_PER_DEGREE * math.cos(math.radians(self.origin_lat))
+        self._xs = array("d", (lon * self._lon_scale for _, lon in self.points))
+        self._ys = array("d", (lat * KM_PER_DEGREE for lat, _ in self.points))
+
+        self.cell_km = self._cell_size()
+        self._cells: Dict[Tuple[int, int], array] = {}
+        for point_id in range(len(self.points)):
+            key = (int(self._xs[point_id] // self.cell_km), int(self._ys[point_id] // self.cell_km))
+            self._cells.setdefault(key, array("I")).append(point_id)
+        if self._cells:
+            columns = [cx for cx, _ in self._cells]
+            rows = [cy for _, cy in self._cells]
+            self._bounds = (min(columns), max(columns), min(rows), max(rows))
+
+    def __len__(self) -> int:
+        return len(self.doctors) - self.unlocated
+
+    def _cell_size(self) -> float:
+        if len(self.points) < 2:
+            return 1.0
+        width = max(self._xs) - min(self._xs)
+        height = max(self._ys) - min(self._ys)
+        area = max(width * height, width, height, 1e-6)
+        # At least 10 m, so duplicate-ish centroids don't make a degenerate grid.
+        return max(math.sqrt(area * POINTS_PER_CELL / len(self.points)), 0.01)
+
+    def _ring(self, cx: int, cy: int, r: int) -> List[Tuple[int, int]]:
+        if r == 0:
+            return [(cx, cy)]
+        min_x, max_x, min_y, max_y = self._bounds
+        cells = []
+        for x in range(max(cx - r, min_x), min(cx + r, max_x) + 1):
+            if min_y <= cy - r <= max_y:
+                cells.append((x, cy - r))
+            if min_y <= cy + r <= max_y:
+                cells.append((x, cy + r))
+        for y in range(max(cy - r + 1, min_y), min(cy + r - 1, max_y) + 1):
+            if min_x <= cx - r <= max_x:
+                cells.append((cx - r, y))
+            if min_x <= cx + r <= max_x:
+                cells.append((cx + r, y))
+        return cells
+
+    def nearest(self, latitude: float, longitude: float, k: int = 5) -> List[Tuple[int, float]]:
+        """
+        Find the doctors closest to a point.
+
+        Args:
+            latitude: Latitude of the query point
+            longitude: Longitude of the query point
+            k: Number of doctors to return
+
+        Returns:
+            List[Tuple[int, float]]: (doctor id, distance in km), nearest first; doctors
+                at the same centroid are in directory order
+
+        Raises:
+            ValueError: If the point is not a valid latitude and longitude
+        """
+        if not is_valid_point(latitude, longitude):
+            raise ValueError(f"Invalid point ({latitude!r}, {longitude!r}): latitude and longitude must be finite numbers in range")
+        if not self._cells or k <= 0:
+            return []
+        x = longitude * self._lon_scale
+        y = latitude * KM_PER_DEGREE
+        cx, cy = int(x // self.cell_km), int(y // self.cell_km)
+        min_x, max_x, min_y, max_y = self._bounds
+        # Rings nearer than first_ring miss the grid (the query lies outside it).
+        first_ring = max(min_x - cx, cx - max_x, min_y - cy, cy - max_y, 0)
+        last_ring = max(cx - min_x, max_x - cx, cy - min_y, max_y - cy)
+
+        found: List[Tuple[float, int]] = []
+        for r in range(first_ring, last_ring + 1):
+            for cell in self._ring(cx, cy, r):
+                for point_id in self._cells.get(cell, ()):
+                    found.append((math.hypot(self._xs[point_id] - x, self._ys[point_id] - y), point_id))
+            # Every point in ring r + 1 or beyond is at least r cells away.
+            reach = r * self.cell_km
+            if sum(len(self.point_doctors[p]) for d, p in found if d <= reach) >= k:
+                break
+
+        found.sort()
+        results: List[Tuple[int, float]] = []
+        for distance, point_id in found:
+            for doctor_id in self.point_doctors[point_id]:
+                results.append((doctor_id, distance))
+                if len(results) == k:
+                    return results
+        return results
@@ -0,0 +1,137 @@
+"""
+Long-lived HTTP serving for the doctor server.
+
+One process serves both the FastAPI routes and the MCP tools (streamable
+HTTP at ``/mcp``), so MCP clients connect to a running server instead of
+each spawning a stdio process that reloads the directory.
+
+With several workers the parent loads the directory, binds the socket and
+then forks: each worker inherits the loaded records and indexes
+copy-on-write, so N workers start with one copy of the data instead of N,
+and the kernel spreads connections between them. Objects are frozen out of
+the garbage collector before forking, so collections in a worker don't
+write to (and so copy) the shared pages. A worker that reloads a changed
+file builds its own copy of the new directory.
+"""
+
+import gc
+import os
+import signal
+import socket
+import sys
+import traceback
+from typing import Any, Callable, List, Optional
+
+import uvicorn
+
+
+def bind(host: str, port: int) -> socket.socket:
+    """
+    Open the listening socket the workers share.
+
+    Args:
+        host: Interface to bind
+        port: Port to bind
+
+    Returns:
+        socket.socket: Listening TCP socket
+    """
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    # Name the protocol: asyncio only sets TCP_NODELAY on connections accepted from a socket
+    # whose proto is IPPROTO_TCP (socket.create_server leaves it 0), and without it every
+    # reused keep-alive connection stalls ~40 ms on delayed ACKs.
+    sock = socket.socket(family, socket.SOCK_STREAM, socket.IPPROTO_TCP)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    return sock
+
+
+def _serve(app: Any, sock: socket.socket, log_level: str) -> None:
+    uvicorn.Server(uvicorn.Config(app, log_level=log_level)).run(sockets=[sock])
+
+
+def serve_http(
+    app: Any,
+    host: str,
+    port: int,
+    workers: int = 1,
+    before_fork: Optional[Callable[[], None]] = None,
+    after_fork: Optional[Callable[[], None]] = None,
+    log_level: str = "info",
+) -> int:
+    """
+    Serve an ASGI app on ``host:port`` from one or more processes.
+
+    Returns when any worker exits (or on SIGTERM/SIGINT), after stopping the
+    rest, so a supervisor sees the failure and can restart the set.
+
+    Args:
+        app: ASGI application, already holding the loaded directory
+        host: Interface to bind
+        port: Port to bind
+        workers: Worker processes; above 1 needs ``os.fork`` (not on Windows)
+        before_fork: Called in the parent before forking (e.g. to stop background threads)
+        after_fork: Called in each worker after forking (e.g. to restart them)
+        log_level: uvicorn log level
+
+    Returns:
+        int: Exit code of the first worker to exit (0 on a signal)
+    """
+    sock = bind(host, port)
+    if workers > 1 and not hasattr(os, "fork"):
+        print("Multiple workers need os.fork, which this platform lacks; serving from one process.", file=sys.stderr)
+        workers = 1
+    if workers <= 1:
+        _serve(app, sock, log_level)
+        return 0
+
+    if before_fork is not None:
+        before_fork()
+    # Keep the loaded directory out of the collector's reach so workers share its pages.
+    gc.collect()
+    gc.freeze()
+
+    pids: List[int] = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            exit_code = 1
+            try:
+                if after_fork is not None:
+                    after_fork()
+                _serve(app, sock, log_level)
+                exit_code = 0
+            except SystemExit as e:
+                exit_code = e.code if isinstance(e.code, int) else 1
+            except KeyboardInterrupt:
+                exit_code = 0
+            except BaseException:
+                traceback.print_exc()
+            finally:
+                # Never return into the parent's code path.
+                os._exit(exit_code)
+        pids.append(pid)
+    print(f"Serving on {host}:{port} with {workers} workers: {pids}", file=sys.stderr)
+
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    exit_code = 0
+    try:
+        pid, status = os.wait()
+        exit_code = os.waitstatus_to_exitcode(status)
+        print(f"Worker {pid} exited with code {exit_code}, stopping the others", file=sys.stderr)
+    except (KeyboardInterrupt, SystemExit):
+        pass
+    finally:
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        for pid in pids:
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
+        sock.close()
+    return exit_code
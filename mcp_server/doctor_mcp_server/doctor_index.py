@@ -0,0 +1,307 @@
+"""
+Inverted location index for the doctor directory.
+
+Built once when the directory is loaded, so a lookup costs time in the size
+of its result rather than the size of the directory:
+
+    token -> ids of the distinct locations containing it
+    location id -> ids of the doctors at that location, in file order
+
+A query matches a location when each of its words is a word of the location,
+the last one possibly only its beginning, ignoring case and punctuation:
+"jurong east", "East Jurong" and "Jur" all find "Jurong East".
+
+When nothing matches, ``search`` corrects the query instead of giving up.
+Every location is also indexed by the trigrams of its words (padded as
+"  jurong " -> "  j", " ju", "jur", ..., "ng "), and the query's trigrams
+rank the locations by how much of the query each one contains. The words of
+the best location, if it is close enough, replace the misspelt query words
+("Jurong Est" -> "Jurong East", "Orchad" -> "Orchard"), so a typo costs no
+extra lookup.
+"""
+
+import heapq
+import re
+from array import array
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+_TOKEN_RE = re.compile(r"[^\W_]+")
+
+# Trigrams that open a word count double: typos rarely change the first letters,
+# so "Est" is read as "East" rather than "West".
+WORD_START_WEIGHT = 2
+
+# Least share of the query's trigram weight the best location must contain for a correction.
+MIN_SIMILARITY = 0.5
+
+# A query word is replaced by a word of the best location when their trigram similarity
+# reaches this ("Est" -> "East" scores 0.3, "Orchard" -> "Gardens" 0.06), or when they are one
+# edit apart, which catches the swapped and missing letters trigrams score low ("Tao" -> "Toa").
+# Other query words are dropped.
+MIN_WORD_SIMILARITY = 0.25
+
+
+def location_tokens(text: str) -> List[str]:
+    """
+    Split a location into normalized words.
+
+    Args:
+        text: Location name or query
+
+    Returns:
+        List[str]: Case-folded words, punctuation removed
+    """
+    return _TOKEN_RE.findall(text.casefold())
+
+
+def word_trigrams(token: str) -> List[str]:
+    """
+    Trigrams of one word, padded so its first letters form trigrams of their own.
+
+    Args:
+        token: Normalized word, e.g. "east"
+
+    Returns:
+        List[str]: ["  e", " ea", "eas", "ast", "st "]
+    """
+    padded = f"  {token} "
+    return [padded[i : i + 3] for i in range(len(padded) - 2)]
+
+
+def trigram_weights(tokens: Iterable[str]) -> Dict[str, int]:
+    """
+    Weighted trigram set of a list of words.
+
+    Args:
+        tokens: Normalized words
+
+    Returns:
+        Dict[str, int]: Trigram -> weight (``WORD_START_WEIGHT`` for the two that open a word, else 1)
+    """
+    weights: Dict[str, int] = {}
+    for token in tokens:
+        for i, gram in enumerate(word_trigrams(token)):
+            weights[gram] = max(weights.get(gram, 0), WORD_START_WEIGHT if i < 2 else 1)
+    return weights
+
+
+def _word_similarity(a: str, b: str) -> float:
+    a_weights, b_weights = trigram_weights([a]), trigram_weights([b])
+    shared = sum(weight for gram, weight in a_weights.items() if gram in b_weights)
+    return shared / (sum(a_weights.values()) + sum(b_weights.values()) - shared)
+
+
+def _edit_distance(a: str, b: str) -> int:
+    # Levenshtein distance counting a swap of adjacent letters as one edit.
+    previous, current = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        before, previous, current = previous, current, [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], before[j - 2] + 1)
+    return current[-1]
+
+
+class DoctorIndex:
+    """
+    Doctors grouped by location, with a word index over the location names.
+    """
+
+    def __init__(self, doctors: Sequence[Dict[str, Any]]):
+        """
+        Args:
+            doctors: Doctor records; ids are positions in this sequence
+        """
+        self.doctors = doctors
+        self.locations: List[str] = []
+        self.location_doctors: List[array] = []
+        location_ids: Dict[str, int] = {}
+        for doctor_id, doctor in enumerate(doctors):
+            location = doctor.get("location", "")
+            location_id = location_ids.get(location)
+            if location_id is None:
+                location_id = location_ids[location] = len(self.locations)
+                self.locations.append(location)
+                self.location_doctors.append(array("I"))
+            self.location_doctors[location_id].append(doctor_id)
+
+        self.token_locations: Dict[str, array] = {}
+        for location_id, location in enumerate(self.locations):
+            for token in set(location_tokens(location)):
+                self.token_locations.setdefault(token, array("I")).append(location_id)
+        # Sorted vocabulary for prefix matches on the last query word.
+        self.vocabulary = sorted(self.token_locations)
+
+        # Trigram -> locations containing it, and each location's total trigram weight.
+        self.trigram_locations: Dict[str, array] = {}
+        self._trigram_totals = array("I")
+        for location_id, location in enumerate(self.locations):
+            weights = trigram_weights(location_tokens(location))
+            self._trigram_totals.append(sum(weights.values()))
+            for gram in weights:
+                self.trigram_locations.setdefault(gram, array("I")).append(location_id)
+
+    def __len__(self) -> int:
+        return len(self.doctors)
+
+    def _prefix_locations(self, prefix: str) -> Set[int]:
+        matches: Set[int] = set()
+        for i in range(bisect_left(self.vocabulary, prefix), len(self.vocabulary)):
+            token = self.vocabulary[i]
+            if not token.startswith(prefix):
+                break
+            matches.update(self.token_locations[token])
+        return matches
+
+    def match_locations(self, query: str) -> List[int]:
+        """
+        Find the locations a query refers to.
+
+        Args:
+            query: Location name or part of one
+
+        Returns:
+            List[int]: Matching location ids, in order of first appearance in the directory
+        """
+        tokens = location_tokens(query)
+        if not tokens:
+            return []
+        *words, prefix = tokens
+        postings = [self.token_locations.get(word) for word in words]
+        if any(posting is None for posting in postings):
+            return []
+        if not postings:
+            return sorted(self._prefix_locations(prefix))
+
+        # Intersect the whole words, smallest posting first, then check the
+        # last word against the few locations left.
+        postings.sort(key=len)
+        matches = set(postings[0])
+        for posting in postings[1:]:
+            matches.intersection_update(posting)
+        return sorted(
+            location_id
+            for location_id in matches
+            if any(token.startswith(prefix) for token in location_tokens(self.locations[location_id]))
+        )
+
+    def find(self, query: str) -> List[int]:
+        """
+        Find the doctors at the locations a query refers to.
+
+        Args:
+            query: Location name or part of one
+
+        Returns:
+            List[int]: Doctor ids, in directory order
+        """
+        location_ids = self.match_locations(query)
+        if len(location_ids) == 1:
+            return list(self.location_doctors[location_ids[0]])
+        doctor_ids: List[int] = []
+        for location_id in location_ids:
+            doctor_ids.extend(self.location_doctors[location_id])
+        doctor_ids.sort()
+        return doctor_ids
+
+    def similar_locations(self, query: str, limit: int = 5) -> List[Tuple[int, float]]:
+        """
+        Rank locations by trigram similarity to a query, however it is spelt.
+
+        Args:
+            query: Location name, possibly misspelt
+            limit: Number of locations to return
+
+        Returns:
+            List[Tuple[int, float]]: (location id, share of the query's trigram weight the
+                location contains), best first; ties go to the location with the fewest
+                trigrams of its own
+        """
+        weights = trigram_weights(location_tokens(query))
+        total = sum(weights.values())
+        if not total:
+            return []
+        shared: Dict[int, int] = {}
+        for gram, weight in weights.items():
+            for location_id in self.trigram_locations.get(gram, ()):
+                shared[location_id] = shared.get(location_id, 0) + weight
+        best = heapq.nsmallest(
+            limit,
+            shared.items(),
+            key=lambda item: (-item[1], self._trigram_totals[item[0]], item[0]),
+        )
+        return [(location_id, weight / total) for location_id, weight in best]
+
+    def correct(self, query: str) -> Optional[str]:
+        """
+        Rewrite a query that matches nothing into the closest one that does.
+
+        Each query word is replaced by the closest word of the best-ranked
+        location; words with no close word there are dropped.
+
+        Args:
+            query: Location name, possibly misspelt
+
+        Returns:
+            Optional[str]: The corrected query, spelt as in the directory, or None if no
+                location is similar enough
+        """
+        best = self.similar_locations(query, limit=1)
+        if not best or best[0][1] < MIN_SIMILARITY:
+            return None
+        location = self.locations[best[0][0]]
+        words = {word.casefold(): word for word in _TOKEN_RE.findall(location)}
+        corrected = []
+        for token in location_tokens(query):
+            distance, similarity, word = min(
+                (_edit_distance(token, candidate), -_word_similarity(token, candidate), candidate)
+                for candidate in words
+            )
+            if (distance <= 1 or -similarity >= MIN_WORD_SIMILARITY) and words[word] not in corrected:
+                corrected.append(words[word])
+        return " ".join(corrected) if corrected else location
+
+    def search(self, query: str) -> Tuple[List[int], Optional[str]]:
+        """
+        Find doctors as ``find`` does, correcting the query if it matches nothing.
+
+        Args:
+            query: Location name or part of one, possibly misspelt
+
+        Returns:
+            Tuple[List[int], Optional[str]]: Doctor ids in directory order, and the corrected
+                query they were found with (None when the query matched as typed)
+        """
+        doctor_ids = self.find(query)
+        if doctor_ids:
+            return doctor_ids, None
+        corrected = self.correct(query)
+        if corrected is None:
+            return [], None
+        doctor_ids = self.find(corrected)
+        if not doctor_ids:
+            # The corrected words don't co-occur; fall back to the best location itself.
+            corrected = self.locations[self.similar_locations(query, limit=1)[0][0]]
+            doctor_ids = self.find(corrected)
+        return doctor_ids, corrected
+
+
+def format_doctor(doctor: Dict[str, Any], distance_km: Optional[float] = None) -> str:
+    """
+    Render one doctor as a line of the tool's response.
+
+    Args:
+        doctor: Doctor record
+        distance_km: Distance from the query point, appended when given
+
+    Returns:
+        str: "- name (specialty) at clinic (location)" with a trailing newline
+    """
+    distance = f", {distance_km:.1f} km" if distance_km is not None else ""
+    return (
+        f"- {doctor.get('name', 'N/A')} ({doctor.get('specialty', 'N/A')}) "
+        f"at {doctor.get('clinic', 'N/A')} ({doctor.get('location', 'N/A')}){distance}\n"
+    )
@@ -1,39 +1,74 @@
+import argparse
 import os
-import json # Added json import
+import sys
 from fastmcp import FastMCP # Import FastMCP
 from fastapi import FastAPI
 import uvicorn
 from pydantic import BaseModel
+from typing import List, Optional
 
-# Define the path to the local JSON file
-DOCTORS_JSON_FILE = "..\\mcp_server\\doctor_mcp_server\\doctor_list_sg.json"
-#DOCTORS_JSON_FILE = "doctor_list_sg.json"
+from doctor_directory import DirectoryReloader
+from doctor_http import serve_http
+from doctor_geo import DoctorGeoIndex, PostalLocator, is_valid_point, load_postal_centroids
+from doctor_index import DoctorIndex, format_doctor
+from doctor_query import find_doctors
 
-# Global variable to store doctor data
-DOCTORS_DATA = []
+# Define the path to the local JSON file (next to this script unless overridden,
+# so the server works whichever directory it is started from)
+DOCTORS_JSON_FILE = os.getenv(
+    "DOCTORS_JSON_FILE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "doctor_list_sg.json"),
+)
 
-def _load_doctors_from_json():
+# Postal code (or two-digit postal sector) -> latitude/longitude centroid, for nearest-doctor queries
+POSTAL_CENTROIDS_FILE = os.getenv(
+    "POSTAL_CENTROIDS_FILE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "postal_centroids_sg.csv"),
+)
+
+# Most doctors a nearest-doctor query returns
+MAX_NEAREST_DOCTORS = 50
+
+# Seconds between checks of DOCTORS_JSON_FILE for changes; 0 turns hot reload off
+DOCTORS_RELOAD_INTERVAL = float(os.getenv("DOCTORS_RELOAD_INTERVAL", "2"))
+
+def _load_postal_locator():
     """
-    Loads doctor information from a local JSON file.
+    Loads postal-code centroids from a local CSV file.
     """
-    print(f"Loading doctor information from {DOCTORS_JSON_FILE}...")
     try:
-        with open(DOCTORS_JSON_FILE, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            # The JSON is a dictionary with DOCSG001, DOCSG002 keys.
-            # We need to convert it to a list of doctor dictionaries.
-            doctors = [doc_data for doc_id, doc_data in data.items()]
-            print(f"Loaded {len(doctors)} doctors from {DOCTORS_JSON_FILE}.\n")
-            return doctors
+        centroids = load_postal_centroids(POSTAL_CENTROIDS_FILE)
+        print(f"Loaded {len(centroids)} postal centroids from {POSTAL_CENTROIDS_FILE}.", file=sys.stderr)
     except FileNotFoundError:
-        print(f"Error: {DOCTORS_JSON_FILE} not found. Please ensure the file exists in the same directory as the script.\n")
-        return []
-    except json.JSONDecodeError as e:
-        print(f"Error decoding JSON from {DOCTORS_JSON_FILE}: {e}\n")
-        return []
+        print(f"Error: {POSTAL_CENTROIDS_FILE} not found. Nearest-doctor queries will find nothing.", file=sys.stderr)
+        centroids = {}
+    except (KeyError, ValueError) as e:
+        print(f"Error reading postal centroids from {POSTAL_CENTROIDS_FILE}: {e}", file=sys.stderr)
+        centroids = {}
+    return PostalLocator(centroids)
+
+POSTAL_LOCATOR = _load_postal_locator()
+
+def _build_indexes(doctors):
+    """
+    Builds the lookup indexes over one version of the doctor list.
+    """
+    geo = DoctorGeoIndex(doctors, POSTAL_LOCATOR)
+    if geo.unlocated:
+        print(f"{geo.unlocated} doctors have a postal code missing from {POSTAL_CENTROIDS_FILE}, or an invalid centroid there, and can't be found by distance.", file=sys.stderr)
+    return dict(
+        # Location words -> locations -> doctors, so lookups don't scan the directory
+        location=DoctorIndex(doctors),
+        # Doctors placed at their postal-code centroids, on a grid for k-nearest queries
+        geo=geo,
+    )
 
-# Load doctor data when the script starts
-DOCTORS_DATA = _load_doctors_from_json()
+# The doctor list and its indexes, reloaded in the background when the JSON file changes.
+# Each query reads DOCTORS.current once, so a reload never shows it half-updated data.
+DOCTORS = DirectoryReloader(DOCTORS_JSON_FILE, _build_indexes, interval=DOCTORS_RELOAD_INTERVAL)
+print(f"Loading doctor information from {DOCTORS_JSON_FILE}...", file=sys.stderr)
+DOCTORS.load()
+DOCTORS.start()
 
 # Initialize FastMCP server (for tool definition, not for running the server directly)
 mcp = FastMCP(name="DoctorInfoServer")
@@ -43,22 +78,22 @@ def _get_doctors_by_location_impl(location: str) -> str:
     Returns a list of doctors based on the provided location.
     This is the actual implementation.
     """
-    if not DOCTORS_DATA:
+    directory = DOCTORS.current
+    if not directory.doctors:
         return "No doctor data available. Please ensure 'doctor_list_sg.json' is correctly loaded.\n"
 
-    filtered_doctors = []
-    for doctor in DOCTORS_DATA:
-        # Assuming 'location' field exists in each doctor's dictionary
-        if location.lower() in doctor.get("location", "").lower():
-            filtered_doctors.append(doctor)
-    
-    if not filtered_doctors:
+    # Matches every word of the location; the last word may be partial ("Jur").
+    # A misspelt location ("Orchad") is corrected to the closest one in the directory.
+    doctor_ids, corrected = directory.indexes["location"].search(location)
+    if not doctor_ids:
         return f"No doctors found in {location}.\n"
-    
-    response_str = f"Doctors in {location}:\n"
-    for doc in filtered_doctors:
-        response_str += f"- {doc.get('name', 'N/A')} ({doc.get('specialty', 'N/A')}) at {doc.get('clinic', 'N/A')} ({doc.get('location', 'N/A')})\n"
-    return response_str
+
+    if corrected:
+        lines = [f"No doctors found in {location}; showing doctors in {corrected}:\n"]
+    else:
+        lines = [f"Doctors in {location}:\n"]
+    lines.extend(format_doctor(directory.doctors[doctor_id]) for doctor_id in doctor_ids)
+    return "".join(lines)
 
 @mcp.tool()
 def get_doctors_by_location(location: str) -> str:
@@ -67,12 +102,101 @@ def get_doctors_by_location(location: str) -> str:
     """
     return _get_doctors_by_location_impl(location)
 
+def _get_nearest_doctors_impl(postal_code: str = "", latitude: Optional[float] = None, longitude: Optional[float] = None, k: int = 5) -> str:
+    """
+    Implementation of the nearest-doctor lookup.
+    """
+    directory = DOCTORS.current
+    if not directory.doctors:
+        return "No doctor data available. Please ensure 'doctor_list_sg.json' is correctly loaded.\n"
+
+    if latitude is not None and longitude is not None:
+        if not is_valid_point(latitude, longitude):
+            return "Latitude and longitude must be finite numbers, with latitude between -90 and 90 and longitude between -180 and 180.\n"
+        point = (latitude, longitude)
+        origin = f"({latitude:.4f}, {longitude:.4f})"
+    elif postal_code:
+        point = POSTAL_LOCATOR.locate(postal_code)
+        origin = f"postal code {postal_code}"
+        if point is None:
+            return f"Postal code {postal_code} is not in the postal code lookup.\n"
+    else:
+        return "Please provide a postal code, or both latitude and longitude.\n"
+
+    k = max(1, min(k, MAX_NEAREST_DOCTORS))
+    nearest = directory.indexes["geo"].nearest(point[0], point[1], k)
+    if not nearest:
+        return f"No doctors found near {origin}.\n"
+
+    lines = [f"Nearest doctors to {origin}:\n"]
+    lines.extend(format_doctor(directory.doctors[doctor_id], distance_km) for doctor_id, distance_km in nearest)
+    return "".join(lines)
+
+@mcp.tool()
+def get_nearest_doctors(postal_code: str = "", latitude: Optional[float] = None, longitude: Optional[float] = None, k: int = 5) -> str:
+    """
+    Finds the k doctors nearest to a Singapore postal code, or to a latitude/longitude.
+    """
+    return _get_nearest_doctors_impl(postal_code, latitude, longitude, k)
+
+def _find_doctors_impl(locations: List[str], specialties: Optional[List[str]] = None, limit: int = 20, cursor: Optional[str] = None) -> dict:
+    """
+    Implementation of the batched lookup; errors come back as {"error": ...}.
+    """
+    try:
+        return find_doctors(DOCTORS.current, locations, specialties, limit, cursor)
+    except ValueError as e:
+        return {"error": str(e)}
+
+@mcp.tool()
+def find_doctors_in_locations(locations: List[str], specialties: Optional[List[str]] = None, limit: int = 20, cursor: Optional[str] = None) -> dict:
+    """
+    Finds doctors in several locations in one call, optionally only the given specialties.
+    Returns JSON with each location's total and one page of doctors; pass next_cursor
+    back with the same locations and specialties to get the next page.
+    """
+    return _find_doctors_impl(locations, specialties, limit, cursor)
+
+def _directory_stats() -> dict:
+    """
+    Reports the loaded doctor list and how its reloads went.
+    """
+    stats = DOCTORS.stats()
+    indexes = DOCTORS.current.indexes
+    stats["locations"] = len(indexes["location"].locations)
+    stats["unlocated"] = indexes["geo"].unlocated
+    return stats
+
+@mcp.resource("doctors://stats")
+def directory_stats() -> dict:
+    """
+    Doctor count, index sizes and reload status of the doctor directory.
+    """
+    return _directory_stats()
+
 # Define Pydantic model for input
 class LocationInput(BaseModel):
     location: str
 
-# Initialize FastAPI app
-app = FastAPI()
+class NearestInput(BaseModel):
+    postal_code: str = ""
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    k: int = 5
+
+class FindDoctorsInput(BaseModel):
+    locations: List[str]
+    specialties: Optional[List[str]] = None
+    limit: int = 20
+    cursor: Optional[str] = None
+
+# MCP tools over streamable HTTP at /mcp, served by the same app as the REST endpoints.
+# Stateless, so any worker can answer any request without sharing session state, and
+# answered with plain JSON rather than an SSE stream, since no tool streams progress.
+mcp_http_app = mcp.http_app(path="/mcp", stateless_http=True, json_response=True)
+
+# Initialize FastAPI app (its lifespan runs the MCP session manager)
+app = FastAPI(lifespan=mcp_http_app.lifespan)
 
 # Expose the FastMCP tool via a FastAPI endpoint
 @app.post("/call/doctor_info_tool")
@@ -83,9 +207,45 @@ async def call_doctor_info_tool(input: LocationInput):
     # Call the underlying implementation directly
     return _get_doctors_by_location_impl(input.location)
 
+@app.post("/call/nearest_doctor_tool")
+async def call_nearest_doctor_tool(input: NearestInput):
+    """
+    Endpoint to call the nearest_doctor_tool.
+    """
+    return _get_nearest_doctors_impl(input.postal_code, input.latitude, input.longitude, input.k)
+
+@app.post("/call/find_doctors_tool")
+async def call_find_doctors_tool(input: FindDoctorsInput):
+    """
+    Endpoint to call the find_doctors_tool.
+    """
+    return _find_doctors_impl(input.locations, input.specialties, input.limit, input.cursor)
+
+@app.get("/metrics")
+async def metrics():
+    """
+    Doctor count, index sizes and reload status of the doctor directory.
+    """
+    return _directory_stats()
+
+# Everything the routes above don't handle (i.e. /mcp) goes to the MCP app
+app.mount("/", mcp_http_app)
+
 
 if __name__ == "__main__":
-    print("Starting Doctor MCP Server (via FastAPI and Uvicorn). Access the API at http://localhost:8002/docs")
-    print("To use the tool, send a POST request to http://localhost:8002/call/doctor_info_tool with a JSON body like: {'location': 'Orchard'}")
-    #uvicorn.run(app, host="0.0.0.0", port=8002)
+    parser = argparse.ArgumentParser(description="Doctor information MCP server")
+    parser.add_argument("--transport", choices=["stdio", "http"], default=os.getenv("DOCTOR_SERVER_TRANSPORT", "stdio"),
+                        help="stdio: serve one MCP client over stdin/stdout; http: serve MCP at /mcp and the REST endpoints")
+    parser.add_argument("--host", default=os.getenv("DOCTOR_SERVER_HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("DOCTOR_SERVER_PORT", "8002")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("DOCTOR_SERVER_WORKERS", "1")))
+    args = parser.parse_args()
+
+    if args.transport == "http":
+        print(f"Starting Doctor MCP Server (via FastAPI and Uvicorn). Access the API at http://localhost:{args.port}/docs", file=sys.stderr)
+        print(f"MCP clients connect to http://localhost:{args.port}/mcp; REST clients POST to http://localhost:{args.port}/call/doctor_info_tool with a JSON body like: {{'location': 'Orchard'}}", file=sys.stderr)
+        sys.exit(serve_http(app, args.host, args.port, args.workers, before_fork=DOCTORS.stop, after_fork=DOCTORS.start))
+
+    # stdout carries the MCP protocol in stdio mode, so messages go to stderr
+    print("Starting Doctor MCP Server over stdio.", file=sys.stderr)
     mcp.run(transport="stdio")
\ No newline at end of file
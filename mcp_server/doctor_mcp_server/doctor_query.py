@@ -0,0 +1,157 @@
+"""
+Batched, structured doctor lookups.
+
+``find_doctors`` answers several location queries (optionally filtered by
+specialty) against one directory snapshot in a single call, and returns
+JSON-ready dicts instead of preformatted text. Each location's matches are
+paged; the response carries one opaque ``next_cursor`` that resumes every
+location that has more, until all are exhausted.
+
+A cursor records the directory version it was issued against and a digest
+of the query. It is rejected after a reload or with a different query, since
+its offsets would then point at other doctors.
+"""
+
+import base64
+import binascii
+import hashlib
+import json
+from typing import Any, Dict, List, Optional, Sequence
+
+from doctor_directory import DoctorDirectory
+
+# Most locations one call may ask for.
+MAX_LOCATIONS = 50
+
+# Most doctors returned per location per page.
+MAX_PAGE_SIZE = 100
+
+
+def _query_digest(locations: Sequence[str], specialties: Sequence[str]) -> str:
+    query = json.dumps([list(locations), sorted(specialties)])
+    return hashlib.sha1(query.encode("utf-8")).hexdigest()[:12]
+
+
+def encode_cursor(version: str, digest: str, offsets: List[int]) -> str:
+    """
+    Build an opaque cursor.
+
+    Args:
+        version: Directory version (content hash) the offsets refer to
+        digest: Digest of the query the cursor continues
+        offsets: Next offset of each location; -1 for a location with nothing left
+
+    Returns:
+        str: URL-safe cursor
+    """
+    payload = json.dumps(dict(v=version, q=digest, o=offsets), separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """
+    Read a cursor built by ``encode_cursor``.
+
+    Args:
+        cursor: Cursor from a previous response
+
+    Returns:
+        Dict[str, Any]: ``v`` (version), ``q`` (query digest) and ``o`` (offsets)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        offsets = payload.get("o") if isinstance(payload, dict) else None
+        if not (isinstance(offsets, list) and all(isinstance(offset, int) for offset in offsets)):
+            raise ValueError
+        return payload
+    except (ValueError, binascii.Error):
+        raise ValueError("Invalid cursor") from None
+
+
+def find_doctors(
+    directory: DoctorDirectory,
+    locations: Sequence[str],
+    specialties: Optional[Sequence[str]] = None,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Look up doctors for several locations at once.
+
+    Args:
+        directory: Directory snapshot to answer from
+        locations: Location queries, matched (and corrected) as by ``get_doctors_by_location``
+        specialties: Keep only doctors with one of these specialties (case-insensitive)
+        limit: Doctors per location per page (at most ``MAX_PAGE_SIZE``)
+        cursor: ``next_cursor`` of the previous page of the same query
+
+    Returns:
+        Dict[str, Any]: ``results`` (per location: ``location``, the ``corrected`` spelling
+            it was matched as or None, ``total`` matches and this page's ``doctors``),
+            ``next_cursor`` (None on the last page) and the directory ``version``
+
+    Raises:
+        ValueError: If there are too many locations, or the cursor is invalid, expired
+            by a reload, or belongs to another query
+
+    Each doctor's ``id`` is its directory key, even if the record has an ``id`` of its own:
+
+    >>> from doctor_index import DoctorIndex
+    >>> from doctor_records import Doctor
+    >>> doctors = [Doctor("DOCSG001", {"id": 7, "name": "Dr. Tan", "location": "Bedok"})]
+    >>> directory = DoctorDirectory(doctors, {"location": DoctorIndex(doctors)})
+    >>> find_doctors(directory, ["Bedok"])["results"][0]["doctors"]
+    [{'name': 'Dr. Tan', 'location': 'Bedok', 'id': 'DOCSG001'}]
+    """
+    locations = list(locations)
+    specialties = [specialty for specialty in specialties or [] if specialty]
+    if not locations:
+        raise ValueError("Provide at least one location")
+    if len(locations) > MAX_LOCATIONS:
+        raise ValueError(f"At most {MAX_LOCATIONS} locations per call, got {len(locations)}")
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    digest = _query_digest(locations, specialties)
+
+    offsets = [0] * len(locations)
+    if cursor:
+        state = decode_cursor(cursor)
+        if state.get("q") != digest or len(state["o"]) != len(locations):
+            raise ValueError("Cursor belongs to a different query; repeat the query that returned it")
+        if state.get("v") != directory.version:
+            raise ValueError("The doctor directory was updated since this cursor was issued; start again without a cursor")
+        offsets = state["o"]
+
+    wanted = {specialty.casefold() for specialty in specialties}
+    index = directory.indexes["location"]
+    results = []
+    next_offsets = []
+    for location, offset in zip(locations, offsets):
+        doctor_ids, corrected = index.search(location)
+        if wanted:
+            doctor_ids = [
+                doctor_id
+                for doctor_id in doctor_ids
+                if (directory.doctors[doctor_id].get("specialty") or "").casefold() in wanted
+            ]
+        page = doctor_ids[offset : offset + limit] if offset >= 0 else []
+        results.append(
+            dict(
+                location=location,
+                corrected=corrected,
+                total=len(doctor_ids),
+                # The directory key wins over an "id" field the record itself carries
+                doctors=[{**directory.doctors[i].to_dict(), "id": directory.doctors[i].doctor_id} for i in page],
+            )
+        )
+        end = offset + len(page)
+        next_offsets.append(end if 0 <= offset and end < len(doctor_ids) else -1)
+
+    has_more = any(offset >= 0 for offset in next_offsets)
+    return dict(
+        results=results,
+        next_cursor=encode_cursor(directory.version, digest, next_offsets) if has_more else None,
+        version=directory.version,
+    )
@@ -0,0 +1,251 @@
+"""
+Streaming, compact loading of the doctor directory.
+
+``json.load`` parses the whole ``{"DOCSG001": {...}, ...}`` file into one
+tree of dicts before the first doctor can be used, and keeps two dicts and
+a dozen separate strings per doctor. For a national directory that is
+gigabytes of peak memory. Instead:
+
+* ``iter_json_object`` reads the file in fixed-size chunks and yields one
+  (doctor id, record) pair at a time, so only one record's parse tree exists
+  at once;
+* each record becomes a ``Doctor`` with ``__slots__`` (no per-instance dict,
+  address fields inlined), and the strings many doctors share (specialty,
+  clinic, location, city, postal code) are stored once per directory.
+
+``Doctor`` answers ``get`` like the dict it replaces, so the indexes and
+response formatting work on either.
+"""
+
+import json
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# Characters read from the file at a time.
+CHUNK_SIZE = 1 << 20
+
+# Longest single record accepted; a syntax error otherwise reads the rest of the file first.
+MAX_RECORD_SIZE = 1 << 24
+
+_WHITESPACE = " \t\n\r"
+_ADDRESS_FIELDS = ("street", "city", "zip_code")
+_ADDRESS_KEYS = frozenset(_ADDRESS_FIELDS)
+_RECORD_KEYS = frozenset(("name", "specialty", "clinic", "location", "phone", "email", "address"))
+_MISSING = object()
+
+
+def _keep(value: Any, default: Any) -> Any:
+    return value
+
+
+def _shared(share: Callable[[str, str], str], value: Any) -> Any:
+    # Only strings are pooled; anything else (None, numbers) is stored as-is.
+    return share(value, value) if value.__class__ is str else value
+
+
+class _ChunkReader:
+    """A sliding window over a text file, refilled as values are decoded."""
+
+    def __init__(self, f, chunk_size: int, digest: Any = None):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.digest = digest
+        self.decoder = json.JSONDecoder()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def more(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        self.eof = not chunk
+        if self.digest is not None:
+            self.digest.update(chunk.encode("utf-8"))
+        self.buf = self.buf[self.pos :] + chunk
+        self.pos = 0
+        return bool(chunk)
+
+    def skip_whitespace(self) -> None:
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf) or not self.more():
+                return
+
+    def next_char(self) -> str:
+        self.skip_whitespace()
+        if self.pos >= len(self.buf):
+            raise ValueError("unexpected end of JSON input")
+        char = self.buf[self.pos]
+        self.pos += 1
+        return char
+
+    def value(self) -> Any:
+        self.skip_whitespace()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                # Most likely the value runs past the end of the window.
+                if len(self.buf) - self.pos > MAX_RECORD_SIZE or not self.more():
+                    raise
+                continue
+            # A number ending exactly at the window edge may continue in the next chunk.
+            if end == len(self.buf) and self.more():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_json_object(path: str, chunk_size: int = CHUNK_SIZE, digest: Any = None) -> Iterator[Tuple[str, Any]]:
+    """
+    Stream the members of a JSON file whose top level is an object.
+
+    Args:
+        path: JSON file, e.g. ``{"DOCSG001": {...}, "DOCSG002": {...}}``
+        chunk_size: Characters read from the file at a time
+        digest: ``hashlib`` object updated with the file's content as it is read
+
+    Yields:
+        Tuple[str, Any]: (key, decoded value) of each member, in file order
+
+    Raises:
+        OSError: If the file can't be opened
+        ValueError: If it isn't a single JSON object
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        reader = _ChunkReader(f, chunk_size, digest)
+        if reader.next_char() != "{":
+            raise ValueError("expected a JSON object keyed by doctor id")
+        reader.skip_whitespace()
+        if reader.buf[reader.pos : reader.pos + 1] == "}":
+            reader.pos += 1
+        else:
+            while True:
+                key = reader.value()
+                if not isinstance(key, str):
+                    raise ValueError(f"expected a string key, got {key!r}")
+                if reader.next_char() != ":":
+                    raise ValueError(f"expected ':' after key {key!r}")
+                yield key, reader.value()
+                separator = reader.next_char()
+                if separator == "}":
+                    break
+                if separator != ",":
+                    raise ValueError(f"expected ',' or '}}' after the value of {key!r}")
+        reader.skip_whitespace()
+        if reader.pos < len(reader.buf):
+            raise ValueError("unexpected data after the JSON object")
+
+
+class Doctor:
+    """
+    One doctor, without a per-instance dict; read it like the JSON record.
+    """
+
+    __slots__ = ("doctor_id", "name", "specialty", "clinic", "location", "street", "city", "zip_code", "phone", "email", "extra")
+
+    _TOP_FIELDS = ("name", "specialty", "clinic", "location", "phone", "email")
+
+    def __init__(self, doctor_id: str, record: Dict[str, Any], shared: Optional[Dict[str, str]] = None):
+        """
+        Args:
+            doctor_id: Key of the record in the directory (e.g. "DOCSG001")
+            record: Decoded JSON record
+            shared: Pool of strings already stored, so the values many doctors repeat
+                (specialty, clinic, location, city, postal code) share one copy
+        """
+        self.doctor_id = doctor_id
+        get = record.get
+        address = get("address")
+        address_fields = address if isinstance(address, dict) else {}
+        share = shared.setdefault if shared is not None else _keep
+        self.name = get("name")
+        self.specialty = _shared(share, get("specialty"))
+        self.clinic = _shared(share, get("clinic"))
+        self.location = _shared(share, get("location"))
+        self.street = address_fields.get("street")
+        self.city = _shared(share, address_fields.get("city"))
+        self.zip_code = _shared(share, address_fields.get("zip_code"))
+        self.phone = get("phone")
+        self.email = get("email")
+
+        # Anything else in the record is kept as-is.
+        extra = None
+        if not record.keys() <= _RECORD_KEYS:
+            extra = {key: value for key, value in record.items() if key not in _RECORD_KEYS}
+        if isinstance(address, dict):
+            if not address.keys() <= _ADDRESS_KEYS:
+                extra = extra or {}
+                extra["address"] = {key: value for key, value in address.items() if key not in _ADDRESS_KEYS}
+        elif address is not None:
+            extra = extra or {}
+            extra["address"] = address
+        self.extra = extra
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        Read a field by its JSON name, as ``dict.get`` does on the original record.
+
+        Args:
+            key: Field name ("name", "location", "address", ...)
+            default: Value for a field the record doesn't have
+
+        Returns:
+            Any: The field's value; ``address`` is rebuilt as a dict
+        """
+        if key == "address":
+            address = {field: getattr(self, field) for field in _ADDRESS_FIELDS if getattr(self, field) is not None}
+            extra = (self.extra or {}).get("address")
+            if isinstance(extra, dict):
+                address.update(extra)
+            elif extra is not None:
+                return extra
+            return address or default
+        if key in self._TOP_FIELDS:
+            value = getattr(self, key)
+            return default if value is None else value
+        return (self.extra or {}).get(key, default)
+
+    def __getitem__(self, key: str) -> Any:
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The record as a JSON-ready dict."""
+        record = {field: getattr(self, field) for field in self._TOP_FIELDS if getattr(self, field) is not None}
+        address = self.get("address")
+        if address is not None:
+            record["address"] = address
+        record.update((key, value) for key, value in (self.extra or {}).items() if key != "address")
+        return record
+
+    def __repr__(self) -> str:
+        return f"Doctor({self.doctor_id!r}, {self.name!r}, {self.location!r})"
+
+
+def load_doctors(path: str, chunk_size: int = CHUNK_SIZE, digest: Any = None) -> List[Doctor]:
+    """
+    Stream a doctor directory into compact records.
+
+    Args:
+        path: JSON object keyed by doctor id (DOCSG001, DOCSG002, ...)
+        chunk_size: Characters read from the file at a time
+        digest: ``hashlib`` object updated with the exact content the records were parsed from
+
+    Returns:
+        List[Doctor]: Doctors in file order
+
+    Raises:
+        OSError: If the file can't be opened
+        ValueError: If it isn't a JSON object of doctor records
+    """
+    shared: Dict[str, str] = {}
+    doctors = []
+    for doctor_id, record in iter_json_object(path, chunk_size, digest):
+        if not isinstance(record, dict):
+            raise ValueError(f"expected an object for doctor {doctor_id!r}, got {type(record).__name__}")
+        doctors.append(Doctor(doctor_id, record, shared))
+    return doctors
@@ -0,0 +1,197 @@
+"""
+Benchmark: trafilatura extraction inline on threads vs. the extraction pool.
+
+Extracts every page of a corpus of saved health pages, --threads at a time,
+from an asyncio server-like loop, and reports pages/s, MB/s and how late a
+10 ms timer on that loop fired (the stall other requests would see):
+
+* inline: ``trafilatura.extract`` on a thread pool, as ``HealthContentExtractor``
+  did; each extraction holds the GIL;
+* pool: ``ExtractionPool.extract`` on the same threads, the page bytes sent
+  to --workers worker processes.
+
+The corpus is a directory of ``.html`` files as downloaded. Save one first
+with --save-corpus, which downloads the health pages listed in ``PAGES``
+(or --urls, one per line). Without a corpus, generated pages of --page-kb
+KB in the shape of a health article (navigation, scripts, sidebars) are
+used instead, and the report says so.
+
+Usage:
+    python benchmarks/bench_extract.py --save-corpus DIR [--urls FILE]
+    python benchmarks/bench_extract.py [--corpus DIR] [--threads 8] [--workers N] [--rounds 3]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional
+
+import trafilatura
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_DIR, "src"))
+
+from smolagent_acp_web.extraction_pool import ExtractionPool  # noqa: E402
+
+PAGES = [
+    "https://medlineplus.gov/diabetes.html",
+    "https://medlineplus.gov/highbloodpressure.html",
+    "https://medlineplus.gov/asthma.html",
+    "https://medlineplus.gov/migraine.html",
+    "https://medlineplus.gov/flu.html",
+    "https://www.nhs.uk/conditions/type-2-diabetes/",
+    "https://www.nhs.uk/conditions/high-blood-pressure-hypertension/",
+    "https://www.nhs.uk/conditions/asthma/",
+    "https://www.nhs.uk/conditions/migraine/",
+    "https://www.nhs.uk/conditions/flu/",
+    "https://www.cdc.gov/diabetes/about/index.html",
+    "https://www.cdc.gov/high-blood-pressure/about/index.html",
+    "https://www.cdc.gov/asthma/about/index.html",
+    "https://www.cdc.gov/flu/signs-symptoms/index.html",
+    "https://www.who.int/news-room/fact-sheets/detail/diabetes",
+    "https://www.who.int/news-room/fact-sheets/detail/hypertension",
+    "https://www.who.int/news-room/fact-sheets/detail/asthma",
+    "https://my.clevelandclinic.org/health/diseases/7104-diabetes",
+    "https://my.clevelandclinic.org/health/diseases/4314-hypertension-high-blood-pressure",
+    "https://www.mayoclinic.org/diseases-conditions/type-2-diabetes/symptoms-causes/syc-20351193",
+    "https://www.mayoclinic.org/diseases-conditions/high-blood-pressure/symptoms-causes/syc-20373410",
+    "https://www.mayoclinic.org/diseases-conditions/asthma/symptoms-causes/syc-20369653",
+    "https://en.wikipedia.org/wiki/Type_2_diabetes",
+    "https://en.wikipedia.org/wiki/Hypertension",
+]
+
+SECTION = (
+    "<h2>{title}</h2><p>Type 2 diabetes is a condition in which the body does not use insulin properly, "
+    "so sugar builds up in the blood. Common symptoms include increased thirst, frequent urination, "
+    "blurred vision and fatigue. <a href='/glossary/insulin'>Insulin</a> resistance develops over years.</p>"
+    "<ul><li>Eat a balanced diet</li><li>Exercise for 150 minutes a week</li><li>Take metformin as prescribed</li></ul>"
+    "<table><tr><th>Test</th><th>Normal</th></tr><tr><td>HbA1c</td><td>below 42 mmol/mol</td></tr></table>\n"
+)
+
+
+def generated_page(number: int, kb: int) -> bytes:
+    menu = "".join(f"<li><a href='/conditions/{i}'>Condition {i}</a></li>" for i in range(150))
+    sidebar = "".join(f"<div class='card'><a href='/news/{i}'>Related story {i}</a><span>Ad</span></div>" for i in range(40))
+    script = "<script>window.dataLayer=window.dataLayer||[];" + "var x=1;" * 800 + "</script>"
+    titles = ["Overview", "Symptoms", "Causes", "Diagnosis", "Treatment", "Prevention", "When to see a doctor"]
+    body = ""
+    while len(body) < kb * 1024:
+        body += SECTION.format(title=titles[len(body) % len(titles)])
+    html = (
+        f"<html><head><title>Health topic {number}</title>{script}</head><body>"
+        f"<header><nav><ul>{menu}</ul></nav></header><main><article><h1>Health topic {number}</h1>{body}</article>"
+        f"<aside>{sidebar}</aside></main><footer>Cookie Policy | Privacy Policy</footer></body></html>"
+    )
+    return html.encode("utf-8")
+
+
+def save_corpus(directory: str, urls: List[str]) -> None:
+    os.makedirs(directory, exist_ok=True)
+    for number, url in enumerate(urls):
+        downloaded = trafilatura.fetch_response(url, decode=False)
+        if downloaded is None or downloaded.status != 200 or not downloaded.data:
+            print(f"skipped {url}")
+            continue
+        with open(os.path.join(directory, f"{number:03d}.html"), "wb") as f:
+            f.write(downloaded.data)
+        print(f"saved {url} ({len(downloaded.data) // 1024} KB)")
+
+
+def load_corpus(directory: Optional[str]) -> List[bytes]:
+    if not directory or not os.path.isdir(directory):
+        return []
+    pages = []
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(".html"):
+            with open(os.path.join(directory, name), "rb") as f:
+                pages.append(f.read())
+    return pages
+
+
+async def extract_all(extract: Callable[[bytes], Optional[str]], pages: List[bytes], threads: int) -> tuple:
+    """Extract all pages from the loop, timing them and the loop's stalls."""
+    loop = asyncio.get_running_loop()
+    lags: List[float] = []
+    running = True
+
+    async def ticker() -> None:
+        while running:
+            due = loop.time() + 0.01
+            await asyncio.sleep(0.01)
+            lags.append(max(0.0, loop.time() - due) * 1000)
+
+    tick = asyncio.create_task(ticker())
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        start = time.perf_counter()
+        texts = await asyncio.gather(*(loop.run_in_executor(pool, extract, page) for page in pages))
+        elapsed = time.perf_counter() - start
+    running = False
+    await tick
+    return texts, elapsed, sorted(lags)
+
+
+def report(name: str, pages: List[bytes], elapsed: float, lags: List[float]) -> None:
+    megabytes = sum(len(page) for page in pages) / 1024 / 1024
+    print(
+        f"{name:<24} {len(pages) / elapsed:8.1f} {megabytes / elapsed:8.2f} "
+        f"{statistics.median(lags):10.1f} {lags[int(len(lags) * 0.99)]:10.1f} {lags[-1]:10.1f}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=os.path.join(PROJECT_DIR, "benchmarks", "corpus"))
+    parser.add_argument("--save-corpus", metavar="DIR", help="download the corpus into DIR and exit")
+    parser.add_argument("--urls", help="file of URLs to save instead of PAGES, one per line")
+    parser.add_argument("--threads", type=int, default=8, help="extractions requested at once")
+    parser.add_argument("--workers", type=int, default=None, help="extraction processes (default: one per CPU)")
+    parser.add_argument("--rounds", type=int, default=3, help="passes over the corpus")
+    parser.add_argument("--pages", type=int, default=24, help="generated pages if there is no corpus")
+    parser.add_argument("--page-kb", type=int, default=150, help="size of a generated page")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    if args.save_corpus:
+        urls = PAGES
+        if args.urls:
+            with open(args.urls) as f:
+                urls = [line.strip() for line in f if line.strip()]
+        save_corpus(args.save_corpus, urls)
+        return
+
+    corpus = load_corpus(args.corpus)
+    if corpus:
+        print(f"corpus: {len(corpus)} saved pages from {args.corpus}")
+    else:
+        corpus = [generated_page(number, args.page_kb) for number in range(args.pages)]
+        print(f"corpus: no saved pages in {args.corpus}, using {len(corpus)} generated pages")
+    pages = corpus * args.rounds
+    print(
+        f"{len(pages)} extractions, {sum(len(page) for page in pages) // 1024 // 1024} MB, "
+        f"{args.threads} at a time, {os.cpu_count()} CPUs"
+    )
+
+    extraction_pool = ExtractionPool(workers=args.workers)
+    try:
+        # Start the workers and import trafilatura in them before timing
+        for page in corpus[: extraction_pool.workers * 2]:
+            extraction_pool.extract(page)
+
+        print(f"{'path':<24} {'pages/s':>8} {'MB/s':>8} {'lag p50 ms':>10} {'lag p99 ms':>10} {'lag max ms':>10}")
+        inline, elapsed, lags = asyncio.run(extract_all(trafilatura.extract, pages, args.threads))
+        report("inline", pages, elapsed, lags)
+        pooled, elapsed, lags = asyncio.run(extract_all(extraction_pool.extract, pages, args.threads))
+        report(f"pool, {extraction_pool.workers} workers", pages, elapsed, lags)
+        assert pooled == inline, "pool and inline text differ"
+        print(extraction_pool.stats())
+    finally:
+        extraction_pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
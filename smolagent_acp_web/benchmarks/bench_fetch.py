@@ -0,0 +1,150 @@
+"""
+Benchmark: fetching search hits one at a time vs. the async batch API.
+
+Starts a local HTTP fixture: --hosts servers (one port each, so each is its
+own host to the client) serving --pages health pages of about --page-kb KB
+after --latency seconds, and records the most requests each host had in
+flight. Then extracts every page with:
+
+* sequential: ``get_website_text_content`` per URL, as ``HealthContentExtractor``
+  did (trafilatura.fetch_url, a new connection each time);
+* batch: ``iter_website_text_content`` over all URLs at once, on the pooled
+  client with its per-host limit.
+
+For the batch, the time to the first extracted page is reported too, since
+results stream out as pages arrive. No cache is used.
+
+Usage:
+    python benchmarks/bench_fetch.py [--pages 40] [--hosts 4] [--latency 0.2] [--page-kb 60] [--per-host 4]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_DIR, "src"))
+
+from smolagent_acp_web.web_content_extractor import HealthContentExtractor  # noqa: E402
+
+PARAGRAPH = (
+    "<p>Type 2 diabetes is a condition in which the body does not use insulin properly. "
+    "Common symptoms include increased thirst, frequent urination, blurred vision and fatigue. "
+    "Treatment usually combines diet, exercise and medication such as metformin.</p>\n"
+)
+
+
+def page(number: int, kb: int) -> bytes:
+    paragraphs = PARAGRAPH * max(1, kb * 1024 // len(PARAGRAPH))
+    html = (
+        f"<html><head><title>Health topic {number}</title></head><body>"
+        f"<nav>Home | Conditions | Cookie Policy</nav><article><h1>Health topic {number}</h1>"
+        f"{paragraphs}</article><footer>Privacy Policy</footer></body></html>"
+    )
+    return html.encode("utf-8")
+
+
+class FixtureHost:
+    """One fixture server and the most requests it had in flight at once."""
+
+    def __init__(self, pages: Dict[str, bytes], latency: float):
+        self.in_flight = 0
+        self.peak = 0
+        self.requests = 0
+        lock = threading.Lock()
+        host = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                with lock:
+                    host.requests += 1
+                    host.in_flight += 1
+                    host.peak = max(host.peak, host.in_flight)
+                try:
+                    time.sleep(latency)
+                    body = pages.get(self.path)
+                    if body is None:
+                        self.send_error(404)
+                        return
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/html; charset=utf-8")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                finally:
+                    with lock:
+                        host.in_flight -= 1
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def reset(self) -> None:
+        self.peak = self.requests = 0
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=40)
+    parser.add_argument("--hosts", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds each response is delayed")
+    parser.add_argument("--page-kb", type=int, default=60)
+    parser.add_argument("--per-host", type=int, default=4, help="max_connections_per_host of the batch API")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    pages = {f"/topic/{number}": page(number, args.page_kb) for number in range(args.pages)}
+    hosts = [FixtureHost(pages, args.latency) for _ in range(args.hosts)]
+    urls: List[str] = [f"{hosts[number % args.hosts].url}/topic/{number}" for number in range(args.pages)]
+    extractor = HealthContentExtractor(max_connections_per_host=args.per_host)
+
+    try:
+        start = time.perf_counter()
+        sequential = {url: extractor.get_website_text_content(url) for url in urls}
+        sequential_s = time.perf_counter() - start
+        print(f"sequential: {args.pages} pages in {sequential_s:.2f} s, peak in flight per host {max(h.peak for h in hosts)}")
+        for host in hosts:
+            host.reset()
+
+        async def batch() -> Dict[str, str]:
+            results = {}
+            start = time.perf_counter()
+            first = None
+            async for url, text in extractor.iter_website_text_content(urls):
+                first = first or time.perf_counter() - start
+                results[url] = text
+            elapsed = time.perf_counter() - start
+            await extractor.aclose()
+            print(
+                f"batch:      {args.pages} pages in {elapsed:.2f} s (first page after {first:.2f} s), "
+                f"peak in flight per host {max(h.peak for h in hosts)}; {sequential_s / elapsed:.1f}x faster"
+            )
+            return results
+
+        batched = asyncio.run(batch())
+        assert batched.keys() == sequential.keys()
+        assert all(batched[url] == sequential[url] for url in urls), "batch and sequential text differ"
+        assert all("Health topic" in text for text in batched.values())
+    finally:
+        for host in hosts:
+            host.close()
+
+
+if __name__ == "__main__":
+    main()
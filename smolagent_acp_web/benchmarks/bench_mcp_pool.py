@@ -0,0 +1,178 @@
+"""
+Benchmark: doctor_agent's MCP tool access, spawn per request vs. session pool.
+
+Times one doctor lookup per request, as doctor_agent's tools see it (the
+LLM is left out):
+
+* spawn per request: ``ToolCollection.from_mcp`` per request, as
+  doctor_agent did, starting a doctor server and loading its directory
+  before the call;
+* pool: borrow a session from a started ``MCPSessionPool`` and call the
+  tool on it;
+* pool, concurrent: --threads threads sharing the pool, so requests beyond
+  --sessions wait for a session;
+* crash recovery: on a one-session pool whose server process was killed,
+  the request that finds it dead (and fails) plus the retry that
+  reconnects it.
+
+The stdio server runs with this interpreter (``--uv`` runs it through
+``uv run`` as health_agent_server does). ``--doctors-file`` serves another
+directory, e.g. the synthetic one written by the doctor server's
+bench_location_index.py, to include a larger load in each spawn.
+
+Usage:
+    python benchmarks/bench_mcp_pool.py [--requests 200] [--spawns 10] [--sessions 2] [--threads 8]
+        [--location Orchard] [--uv] [--doctors-file PATH]
+"""
+
+import argparse
+import logging
+import os
+import signal
+import statistics
+import sys
+import threading
+import time
+from typing import Callable, List
+
+from mcp import StdioServerParameters
+from smolagents import ToolCollection
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_DIR, "src"))
+
+from smolagent_acp_web.mcp_pool import MCPSessionPool  # noqa: E402
+
+SERVER_DIR = os.path.join(os.path.dirname(PROJECT_DIR), "mcp_server", "doctor_mcp_server")
+SERVER = os.path.join(SERVER_DIR, "doctor_info_server.py")
+TOOL = "get_doctors_by_location"
+ARGUMENTS = {"location": "Orchard"}
+
+
+def server_parameters(args: argparse.Namespace) -> StdioServerParameters:
+    env = dict(os.environ, DOCTORS_RELOAD_INTERVAL="0")
+    if args.doctors_file:
+        env["DOCTORS_JSON_FILE"] = args.doctors_file
+    if args.uv:
+        return StdioServerParameters(command="uv", args=["run", SERVER], env=env, cwd=SERVER_DIR)
+    return StdioServerParameters(command=sys.executable, args=[SERVER], env=env, cwd=SERVER_DIR)
+
+
+def call(tools: list) -> None:
+    tool = next(tool for tool in tools if tool.name == TOOL)
+    if "Doctors in" not in tool(**ARGUMENTS):
+        raise RuntimeError("unexpected tool result")
+
+
+def timed(request: Callable[[], None], count: int) -> List[float]:
+    samples = []
+    for _ in range(count):
+        start = time.perf_counter()
+        request()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def report(name: str, samples: List[float], elapsed: float = 0.0) -> None:
+    samples = sorted(samples)
+    print(
+        f"{name:<26} {len(samples):5d} {statistics.median(samples) * 1000:10.2f} "
+        f"{samples[int(len(samples) * 0.95)] * 1000:10.2f} {len(samples) / (elapsed or sum(samples)):10.1f}"
+    )
+
+
+def server_pids() -> List[int]:
+    # The stdio servers are this process's only children (grandchildren under uv).
+    pids = []
+    for name in os.listdir("/proc"):
+        if name.isdigit():
+            try:
+                with open(f"/proc/{name}/stat") as f:
+                    ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+            except (OSError, IndexError, ValueError):
+                continue
+            if ppid == os.getpid():
+                pids.append(int(name))
+    return pids
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--spawns", type=int, default=10)
+    parser.add_argument("--sessions", type=int, default=2)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--crashes", type=int, default=3)
+    parser.add_argument("--location", default=ARGUMENTS["location"], help="location to look up")
+    parser.add_argument("--uv", action="store_true", help="start the server with 'uv run'")
+    parser.add_argument("--doctors-file", help="doctor JSON file for the server (default: its bundled list)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    ARGUMENTS["location"] = args.location
+    params = server_parameters(args)
+
+    print(f"{'path':<26} {'calls':>5} {'p50 ms':>10} {'p95 ms':>10} {'calls/s':>10}")
+
+    def spawn_and_call() -> None:
+        with ToolCollection.from_mcp(params, trust_remote_code=True) as tool_collection:
+            call(tool_collection.tools)
+
+    report("spawn per request", timed(spawn_and_call, args.spawns))
+
+    pool = MCPSessionPool(params, size=args.sessions, health_interval=0)
+    start = time.perf_counter()
+    pool.start()
+    while pool.stats()["connected"] < args.sessions:
+        time.sleep(0.05)
+    print(f"pool of {args.sessions} sessions connected in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    def pooled() -> None:
+        with pool.session() as session:
+            call(session.tools)
+
+    try:
+        report("pool", timed(pooled, args.requests))
+
+        samples: List[float] = []
+        per_thread = args.requests // args.threads
+
+        def worker() -> None:
+            samples.extend(timed(pooled, per_thread))
+
+        threads = [threading.Thread(target=worker) for _ in range(args.threads)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        report(f"pool, {args.threads} threads", samples, time.perf_counter() - start)
+
+        print(pool.stats())
+    finally:
+        pool.close()
+
+    pool = MCPSessionPool(params, size=1, health_interval=0)
+
+    def retried() -> None:
+        try:
+            pooled()
+        except Exception:
+            # The dead session is closed on return; the retry reconnects it.
+            pooled()
+
+    try:
+        pooled()
+        recoveries = []
+        for _ in range(args.crashes):
+            for pid in server_pids():
+                os.kill(pid, signal.SIGKILL)
+            time.sleep(0.5)
+            recoveries.extend(timed(retried, 1))
+        report("crash recovery", recoveries)
+        print(pool.stats())
+    finally:
+        pool.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+"""
+Bounded execution of blocking agent runs for the ACP server.
+
+smolagents' ``agent.run`` is synchronous: called from an ``async`` agent
+handler it holds the ACP server's event loop for the whole run, so one
+long web-research query stalls every other agent, including the instant
+keyword checks of ``health_router_agent``. ``AgentExecutor`` runs these
+calls on a bounded thread pool instead, with a concurrency limit per agent;
+requests over an agent's limit wait their turn on the event loop without
+blocking it.
+
+A run is cancelled when its ACP task is cancelled or, if given a
+``disconnected`` check, when the client that asked for it goes away. A run
+still waiting for its turn is simply dropped. A thread can't be stopped
+from outside, so a run already executing is asked to stop through its
+``interrupt`` callback (smolagents' ``agent.interrupt()``, which takes
+effect at the agent's next step) and keeps its slot until it has.
+
+Queue and run times are kept per agent and reported by ``stats()``.
+"""
+
+import asyncio
+import logging
+import statistics
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+from acp_sdk.server import Context
+
+logger = logging.getLogger(__name__)
+
+# Recent runs per agent that queue-time percentiles are computed over.
+SAMPLES = 1000
+
+
+class AgentStats:
+    """
+    Counters and recent queue/run times of one agent.
+    """
+
+    def __init__(self, limit: int):
+        """
+        Args:
+            limit: Runs of the agent allowed at once
+        """
+        self.limit = limit
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.queue_ms: Deque[float] = deque(maxlen=SAMPLES)
+        self.run_ms: Deque[float] = deque(maxlen=SAMPLES)
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Summarize the counters and recent timings.
+
+        Returns:
+            Dict[str, Any]: Limit, runs queued and running now, completed, failed and
+                cancelled runs, and queue-time p50/p95/max and mean run time in ms
+        """
+        queue_ms = sorted(self.queue_ms)
+        return dict(
+            limit=self.limit,
+            queued=self.queued,
+            running=self.running,
+            completed=self.completed,
+            failed=self.failed,
+            cancelled=self.cancelled,
+            queue_p50_ms=round(statistics.median(queue_ms), 1) if queue_ms else 0.0,
+            queue_p95_ms=round(queue_ms[int(len(queue_ms) * 0.95)], 1) if queue_ms else 0.0,
+            queue_max_ms=round(queue_ms[-1], 1) if queue_ms else 0.0,
+            run_mean_ms=round(statistics.fmean(self.run_ms), 1) if self.run_ms else 0.0,
+        )
+
+
+class AgentExecutor:
+    """
+    Runs blocking agent calls on a thread pool, at most ``limit`` at a time per agent.
+    """
+
+    def __init__(self, limits: Dict[str, int], default_limit: int = 1, poll_interval: float = 0.5):
+        """
+        Args:
+            limits: Runs allowed at once, by agent name
+            default_limit: Limit of agents missing from ``limits``
+            poll_interval: Seconds between checks that a waiting client is still connected
+        """
+        self.limits = dict(limits)
+        self.default_limit = default_limit
+        self.poll_interval = poll_interval
+        # One thread per slot, so a run that got its slot never waits again for a thread.
+        self._pool = ThreadPoolExecutor(
+            max_workers=max(sum(self.limits.values()), 1) + default_limit, thread_name_prefix="agent-run"
+        )
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._stats: Dict[str, AgentStats] = {}
+
+    def _agent(self, agent_name: str) -> AgentStats:
+        if agent_name not in self._stats:
+            limit = self.limits.get(agent_name, self.default_limit)
+            self._stats[agent_name] = AgentStats(limit)
+            self._semaphores[agent_name] = asyncio.Semaphore(limit)
+        return self._stats[agent_name]
+
+    async def _watch(self, task: asyncio.Task, disconnected: Callable[[], Awaitable[bool]]) -> None:
+        while not task.done():
+            await asyncio.sleep(self.poll_interval)
+            if await disconnected():
+                logger.info("Client disconnected, cancelling its run")
+                task.cancel()
+                return
+
+    async def run(
+        self,
+        agent_name: str,
+        fn: Callable[..., Any],
+        *args: Any,
+        interrupt: Optional[Callable[[], None]] = None,
+        disconnected: Optional[Callable[[], Awaitable[bool]]] = None,
+    ) -> Any:
+        """
+        Run ``fn(*args)`` on the pool once the agent has a free slot.
+
+        Args:
+            agent_name: Agent the run counts against
+            fn: Blocking call, e.g. ``agent.run``
+            *args: Arguments for ``fn``
+            interrupt: Asks a started run to stop early (e.g. ``agent.interrupt``)
+            disconnected: Returns True once the requesting client has gone away
+
+        Returns:
+            Any: What ``fn`` returned
+
+        Raises:
+            asyncio.CancelledError: If the run was cancelled or its client disconnected
+        """
+        stats = self._agent(agent_name)
+        semaphore = self._semaphores[agent_name]
+        loop = asyncio.get_running_loop()
+        watcher = None
+        if disconnected is not None:
+            watcher = asyncio.create_task(self._watch(asyncio.current_task(), disconnected))
+
+        try:
+            stats.queued += 1
+            queued_at = time.perf_counter()
+            try:
+                await semaphore.acquire()
+            except asyncio.CancelledError:
+                stats.cancelled += 1
+                raise
+            finally:
+                stats.queued -= 1
+            started_at = time.perf_counter()
+            queue_ms = (started_at - queued_at) * 1000
+            stats.queue_ms.append(queue_ms)
+            stats.running += 1
+
+            def finished(done: Any) -> None:
+                stats.running -= 1
+                if not done.cancelled():
+                    stats.run_ms.append((time.perf_counter() - started_at) * 1000)
+                semaphore.release()
+
+            future = self._pool.submit(fn, *args)
+            # The slot is freed when the thread is done, even if the caller stopped waiting.
+            future.add_done_callback(lambda f: loop.call_soon_threadsafe(finished, f))
+            try:
+                result = await asyncio.shield(asyncio.wrap_future(future))
+            except asyncio.CancelledError:
+                stats.cancelled += 1
+                if not future.cancel() and interrupt is not None:
+                    interrupt()
+                raise
+            except Exception:
+                stats.failed += 1
+                raise
+            stats.completed += 1
+            logger.info(
+                f"{agent_name} run finished: queued {queue_ms:.0f} ms, "
+                f"ran {(time.perf_counter() - started_at) * 1000:.0f} ms"
+            )
+            return result
+        finally:
+            if watcher is not None:
+                watcher.cancel()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Report queue and run metrics by agent.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: ``AgentStats.report()`` of each agent that has run
+        """
+        return {agent_name: stats.report() for agent_name, stats in self._stats.items()}
+
+    def shutdown(self) -> None:
+        """Stop the pool once the runs in progress finish; queued ones are dropped."""
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+def client_disconnected(context: Context) -> Callable[[], Awaitable[bool]]:
+    """
+    Build a ``disconnected`` check for ``AgentExecutor.run`` from an ACP run context.
+
+    Only sync and stream runs are tied to their request: an async run has
+    already answered 202 and is polled for, so it never counts as disconnected.
+
+    Args:
+        context: Context ACP passes to an agent function
+
+    Returns:
+        Callable[[], Awaitable[bool]]: Whether the client that created the run has disconnected
+    """
+    request = context.request
+    mode: Optional[str] = None
+
+    async def disconnected() -> bool:
+        nonlocal mode
+        if mode is None:
+            try:
+                mode = (await request.json()).get("mode") or "sync"
+            except Exception:
+                mode = "async"
+        return mode != "async" and await request.is_disconnected()
+
+    return disconnected
@@ -0,0 +1,168 @@
+"""
+Process pool for trafilatura extraction.
+
+``trafilatura.extract`` parses and scores a whole HTML document in Python
+and lxml, holding the GIL for tens of milliseconds on a large page. Run on a
+request thread it stalls every other thread of the server, including the
+event loop. ``ExtractionPool`` runs it in worker processes instead:
+
+* at most ``max_pending`` documents are queued or being extracted at once;
+  a caller submitting more blocks until one finishes (back-pressure), so a
+  burst of pages can't pile up unbounded HTML in memory;
+* HTML goes to the workers as the downloaded bytes where the caller has
+  them (trafilatura detects the encoding), so the parent never decodes a
+  page it only hands on, and bytes pickle as a single copy;
+* workers are started with ``spawn`` (forking a threaded server is unsafe)
+  and replaced after ``MAX_TASKS_PER_CHILD`` documents, which bounds what
+  lxml's caches grow to. If the pool breaks, the document is extracted
+  inline and a new pool is started for the next one.
+
+``get_extraction_pool()`` returns the process-wide pool that
+``HealthContentExtractor`` uses for every caller.
+"""
+
+import atexit
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Optional, Union
+
+import trafilatura
+
+logger = logging.getLogger(__name__)
+
+# Documents a worker extracts before it is replaced.
+MAX_TASKS_PER_CHILD = 500
+
+
+def _extract(html: Union[str, bytes]) -> Optional[str]:
+    return trafilatura.extract(html)
+
+
+class ExtractionPool:
+    """
+    Bounded pool of worker processes running ``trafilatura.extract``.
+    """
+
+    def __init__(self, workers: Optional[int] = None, max_pending: Optional[int] = None):
+        """
+        Args:
+            workers: Worker processes (default: one per CPU)
+            max_pending: Documents queued or in progress at once before ``extract``
+                blocks (default: 4 per worker)
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or self.workers * 4
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+        self.submitted = 0
+        self.completed = 0
+        self.inline = 0
+        self.blocked = 0
+        self._blocked_seconds = 0.0
+        self._extract_seconds = 0.0
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    max_tasks_per_child=MAX_TASKS_PER_CHILD,
+                )
+            return self._executor
+
+    def _restart(self, broken: ProcessPoolExecutor) -> None:
+        with self._lock:
+            if self._executor is broken:
+                self._executor = None
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def extract(self, html: Union[str, bytes]) -> Optional[str]:
+        """
+        Extract a page's main text in a worker process, waiting if the pool is full.
+
+        Args:
+            html: The page as downloaded (bytes, preferably) or decoded
+
+        Returns:
+            Optional[str]: Extracted text, or None if trafilatura found none
+        """
+        start = time.perf_counter()
+        if not self._slots.acquire(blocking=False):
+            self.blocked += 1
+            self._slots.acquire()
+        queued_at = time.perf_counter()
+        self._blocked_seconds += queued_at - start
+        try:
+            pool = self._pool()
+            self.submitted += 1
+            try:
+                text = pool.submit(_extract, html).result()
+            except BrokenProcessPool as e:
+                logger.error(f"Extraction worker died, extracting inline and restarting the pool: {e}")
+                self._restart(pool)
+                self.inline += 1
+                text = _extract(html)
+            self.completed += 1
+            self._extract_seconds += time.perf_counter() - queued_at
+            return text
+        finally:
+            self._slots.release()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Report pool size, load and timings.
+
+        Returns:
+            Dict[str, Any]: Workers, pending limit, documents submitted and completed, those
+                extracted inline after a worker died, how many callers were blocked by
+                back-pressure and for how long on average, and mean extraction time
+        """
+        return dict(
+            workers=self.workers,
+            max_pending=self.max_pending,
+            submitted=self.submitted,
+            completed=self.completed,
+            inline=self.inline,
+            blocked=self.blocked,
+            mean_blocked_ms=round(self._blocked_seconds * 1000 / self.submitted, 2) if self.submitted else 0.0,
+            mean_extract_ms=round(self._extract_seconds * 1000 / self.completed, 2) if self.completed else 0.0,
+        )
+
+    def shutdown(self) -> None:
+        """Stop the worker processes."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+_shared_pool: Optional[ExtractionPool] = None
+_shared_lock = threading.Lock()
+
+
+def get_extraction_pool() -> ExtractionPool:
+    """
+    Get the process-wide extraction pool, creating it on first use.
+
+    Its size comes from ``EXTRACTION_WORKERS`` and ``EXTRACTION_MAX_PENDING``
+    (defaults: one worker per CPU, 4 pending documents per worker).
+
+    Returns:
+        ExtractionPool: The shared pool
+    """
+    global _shared_pool
+    with _shared_lock:
+        if _shared_pool is None:
+            workers = int(os.getenv("EXTRACTION_WORKERS", "0")) or None
+            max_pending = int(os.getenv("EXTRACTION_MAX_PENDING", "0")) or None
+            _shared_pool = ExtractionPool(workers, max_pending)
+            atexit.register(_shared_pool.shutdown)
+        return _shared_pool
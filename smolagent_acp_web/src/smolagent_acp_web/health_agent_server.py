@@ -1,6 +1,8 @@
+import atexit
 import os
 import logging
 import asyncio
+import threading
 import time
 from typing import AsyncGenerator, List
 from collections.abc import AsyncGenerator as AsyncGeneratorType
@@ -10,14 +12,17 @@ from dotenv import load_dotenv
 load_dotenv()
 
 # ACP SDK imports
-from acp_sdk.server import Server, RunYield, RunYieldResume
+from acp_sdk.server import Context, Server, RunYield, RunYieldResume
 from acp_sdk.models import Message, MessagePart
 
 # smolagents imports
-from smolagents import CodeAgent, DuckDuckGoSearchTool, VisitWebpageTool, OpenAIServerModel, ToolCallingAgent, ToolCollection
+from smolagents import CodeAgent, OpenAIServerModel, ToolCallingAgent
 
 # Local imports
 from .web_content_extractor import HealthContentExtractor
+from .mcp_pool import MCPSessionPool
+from .agent_executor import AgentExecutor, client_disconnected
+from .web_cache import CachedDuckDuckGoSearchTool, CachedVisitWebpageTool, WebCache
 
 # MCP server
 from mcp import StdioServerParameters
@@ -57,18 +62,51 @@ def create_health_agent_server() -> Server:
     )
     
 
-    server_parameters = StdioServerParameters(
-    command="uv",
-    #args=["run", "src\\smolagent_acp_web\\doctor_info_server.py"],
-    args=["run", "..\\mcp_server\\doctor_mcp_server\\doctor_info_server.py"],
-    env=None,
+    # Doctor MCP server: a running HTTP server if DOCTOR_MCP_URL is set
+    # (e.g. http://localhost:8002/mcp), otherwise stdio server processes.
+    doctor_mcp_url = getenv("DOCTOR_MCP_URL")
+    if doctor_mcp_url:
+        server_parameters = {"url": doctor_mcp_url, "transport": "streamable-http"}
+    else:
+        server_parameters = StdioServerParameters(
+        command="uv",
+        #args=["run", "src\\smolagent_acp_web\\doctor_info_server.py"],
+        args=["run", "..\\mcp_server\\doctor_mcp_server\\doctor_info_server.py"],
+        env=None,
+        )
+
+    # Long-lived MCP sessions for doctor_agent, connected in the background now
+    # rather than a server process started per request.
+    doctor_sessions = MCPSessionPool(
+        server_parameters,
+        size=int(getenv("DOCTOR_MCP_SESSIONS", "2")),
+        health_interval=float(getenv("DOCTOR_MCP_HEALTH_INTERVAL", "30")),
+    )
+    doctor_sessions.start()
+    atexit.register(doctor_sessions.close)
+
+    # Blocking agent.run calls go to a bounded thread pool so a long run doesn't
+    # hold the event loop (and every other agent) until it finishes.
+    agent_executor = AgentExecutor(
+        limits=dict(
+            health_agent=int(getenv("HEALTH_AGENT_CONCURRENCY", "4")),
+            doctor_agent=int(getenv("DOCTOR_AGENT_CONCURRENCY", str(doctor_sessions.size))),
+        ),
+    )
+    atexit.register(agent_executor.shutdown)
+
+    # Searches and pages shared by every run, kept on disk between restarts
+    web_cache = WebCache(
+        getenv("WEB_CACHE_PATH", os.path.join(os.path.expanduser("~"), ".cache", "smolagent_acp_web", "web_cache.sqlite3")),
+        max_bytes=int(getenv("WEB_CACHE_MAX_MB", "256")) * 1024 * 1024,
     )
+    atexit.register(web_cache.close)
 
     # Initialize content extractor
-    content_extractor = HealthContentExtractor()
+    content_extractor = HealthContentExtractor(cache=web_cache)
     
     @server.agent()
-    async def health_agent(messages: List[Message]) -> AsyncGeneratorType[Message, None]:
+    async def health_agent(messages: List[Message], context: Context) -> AsyncGeneratorType[Message, None]:
         """
         Health-focused CodeAgent that supports hospitals in handling health-based questions for patients.
         
@@ -78,6 +116,7 @@ def create_health_agent_server() -> Server:
         
         Args:
             messages: List of ACP-compliant messages from the client
+            context: ACP run context, used to notice the client disconnecting
             
         Yields:
             Message: ACP-compliant response messages with health information
@@ -127,8 +166,8 @@ def create_health_agent_server() -> Server:
             # Create smolagents CodeAgent with health-focused tools
             agent = CodeAgent(
                 tools=[
-                    DuckDuckGoSearchTool(),
-                    VisitWebpageTool(),
+                    CachedDuckDuckGoSearchTool(web_cache),
+                    CachedVisitWebpageTool(web_cache),
                 ],
                 model=llm
             )
@@ -139,13 +178,21 @@ def create_health_agent_server() -> Server:
             
             for attempt in range(max_retries):
                 try:
-                    response = agent.run(health_focused_prompt)
+                    response = await agent_executor.run(
+                        "health_agent",
+                        agent.run,
+                        health_focused_prompt,
+                        interrupt=agent.interrupt,
+                        disconnected=client_disconnected(context),
+                    )
                     
                     # Process and enhance the response
                     enhanced_response = content_extractor.enhance_health_response(str(response))
                     
                     # Log successful processing
                     logger.info(f"Successfully processed health query, response length: {len(enhanced_response)}")
+                    logger.info(f"Web cache: {web_cache.stats()['kinds']}")
+                    logger.info(f"Extraction pool: {content_extractor.extraction_pool.stats()}")
                     
                     # Return ACP-compliant response
                     yield Message(
@@ -297,12 +344,41 @@ def create_health_agent_server() -> Server:
             )
     
     @server.agent()
-    async def doctor_agent(input: list[Message]) -> AsyncGenerator[RunYield, RunYieldResume]:
+    async def doctor_agent(input: list[Message], context: Context) -> AsyncGenerator[RunYield, RunYieldResume]:
         "This is a Doctor Agent which helps users find doctors near them."
-        with ToolCollection.from_mcp(server_parameters, trust_remote_code=True) as tool_collection:
-            agent = ToolCallingAgent(tools=[*tool_collection.tools], model=llm)
-            prompt = input[0].parts[0].content
-            response = agent.run(prompt)
+        prompt = input[0].parts[0].content
+        agents = []
+        cancelled = threading.Event()
+
+        def run_doctor_agent() -> str:
+            # Runs on the executor's thread: waiting for an MCP session blocks it, not the event loop.
+            with doctor_sessions.session() as session:
+                if cancelled.is_set():
+                    # Cancelled while waiting for the session: hand it straight back.
+                    logger.info("doctor_agent run cancelled before it started, returning its MCP session")
+                    return ""
+                # run() clears the interrupt switch as it starts, so an interrupt landing between the
+                # check above and run() is re-applied after the first step.
+                agent = ToolCallingAgent(
+                    tools=[*session.tools],
+                    model=llm,
+                    step_callbacks=[lambda step, agent: cancelled.is_set() and agent.interrupt()],
+                )
+                agents.append(agent)
+                return agent.run(prompt)
+
+        def interrupt() -> None:
+            # agent.interrupt() only reaches a run that has started; the event covers the wait before it.
+            cancelled.set()
+            for agent in agents:
+                agent.interrupt()
+
+        response = await agent_executor.run(
+            "doctor_agent",
+            run_doctor_agent,
+            interrupt=interrupt,
+            disconnected=client_disconnected(context),
+        )
 
         yield Message(parts=[MessagePart(content=str(response))])
 
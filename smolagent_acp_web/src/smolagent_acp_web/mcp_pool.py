@@ -0,0 +1,323 @@
+"""
+Pooled MCP client sessions for the doctor agent.
+
+``ToolCollection.from_mcp`` inside a request starts the MCP server (for the
+doctor server: ``uv run``, environment resolution and a full directory load)
+and tears it down again, so every question pays seconds of startup before
+its first tool call. An ``MCPSessionPool`` instead keeps a fixed number of
+long-lived ``MCPSession`` connections, opened once when the ACP server
+starts, and lends one (with its smolagents tools) to each request, so a
+request costs only its tool round-trips.
+
+A session is lent to one request at a time and at most ``size`` are lent at
+once; further requests wait for one to come back. A background thread pings
+idle sessions. A session whose ping fails, or whose tool call fails in the
+transport (the server process died, or a call timed out), is closed and
+reconnected (its server process restarted, for stdio) before it is lent
+again. Errors a tool reports as its result leave the session alone.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional
+
+from mcpadapt.core import MCPAdapt
+from mcpadapt.smolagents_adapter import SmolAgentsAdapter
+
+logger = logging.getLogger(__name__)
+
+
+class _WatchedAdapter(SmolAgentsAdapter):
+    """Adapts MCP tools to smolagents, flagging the session when a call fails in transport."""
+
+    def __init__(self, session: "MCPSession"):
+        super().__init__()
+        self.session = session
+
+    def adapt(self, func: Callable[[Optional[dict]], Any], mcp_tool: Any) -> Any:
+        session = self.session
+
+        def call(arguments: Optional[dict] = None) -> Any:
+            # func only raises for the connection (a tool's own error comes back as a result).
+            try:
+                return func(arguments)
+            except Exception:
+                session.broken = True
+                raise
+
+        return super().adapt(call, mcp_tool)
+
+
+class MCPSession:
+    """
+    One long-lived connection to an MCP server and the smolagents tools bound to it.
+    """
+
+    def __init__(self, server_parameters: Any, connect_timeout: int = 60, call_timeout: float = 30.0):
+        """
+        Args:
+            server_parameters: ``StdioServerParameters``, or a dict with ``url`` and
+                ``transport`` for an HTTP server (as for ``ToolCollection.from_mcp``)
+            connect_timeout: Seconds to wait for the server to start and initialize
+            call_timeout: Seconds to wait for any single MCP request (tool call, ping)
+        """
+        self.server_parameters = server_parameters
+        self.connect_timeout = connect_timeout
+        self.call_timeout = call_timeout
+        self.tools: List[Any] = []
+        self.connected_at: Optional[float] = None
+        self.connections = 0
+        self.broken = False
+        self._adapter: Optional[MCPAdapt] = None
+
+    def connect(self) -> None:
+        """
+        Open the connection and load the server's tools.
+
+        Raises:
+            ConnectionError: If the server can't be started or reached
+            TimeoutError: If the server doesn't initialize within ``connect_timeout``
+        """
+        adapter = MCPAdapt(
+            self.server_parameters,
+            _WatchedAdapter(self),
+            connect_timeout=self.connect_timeout,
+            # mcpadapt only applies a float (or timedelta) timeout.
+            client_session_timeout_seconds=float(self.call_timeout),
+        )
+        self._adapter = adapter
+        self.broken = False
+        try:
+            # As MCPAdapt.start, but give up as soon as the connection fails instead
+            # of waiting out connect_timeout.
+            adapter.thread.start()
+            deadline = time.monotonic() + self.connect_timeout
+            while not adapter.ready.wait(0.1):
+                if not adapter.thread.is_alive():
+                    raise ConnectionError("MCP server closed the connection before initializing")
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"MCP server didn't initialize within {self.connect_timeout} s")
+            self.tools = adapter.tools()
+        except BaseException:
+            self.close()
+            raise
+        self.connected_at = time.time()
+        self.connections += 1
+
+    @property
+    def alive(self) -> bool:
+        """Whether the session is open and none of its calls has failed in transport."""
+        adapter = self._adapter
+        return (
+            not self.broken
+            and adapter is not None
+            and bool(adapter.sessions)
+            and adapter.thread.is_alive()
+            and adapter.task is not None
+            and not adapter.task.done()
+        )
+
+    def ping(self) -> bool:
+        """
+        Check the server answers an MCP ping within ``call_timeout``.
+
+        Returns:
+            bool: Whether the server answered
+        """
+        if not self.alive:
+            return False
+        try:
+            asyncio.run_coroutine_threadsafe(self._adapter.sessions[0].send_ping(), self._adapter.loop).result(
+                timeout=self.call_timeout
+            )
+            return True
+        except Exception as e:
+            logger.warning(f"MCP session failed its ping: {e}")
+            return False
+
+    def close(self) -> None:
+        """Close the connection (for stdio, the server process exits with it)."""
+        adapter, self._adapter = self._adapter, None
+        self.tools = []
+        self.connected_at = None
+        if adapter is None or not adapter.thread.is_alive():
+            return
+        try:
+            adapter.close()
+        except Exception as e:
+            logger.warning(f"Error closing MCP session: {e}")
+
+
+class MCPSessionPool:
+    """
+    A fixed set of ``MCPSession`` connections to one server, lent one request at a time.
+    """
+
+    def __init__(
+        self,
+        server_parameters: Any,
+        size: int = 2,
+        health_interval: float = 30.0,
+        connect_timeout: int = 60,
+        call_timeout: float = 30.0,
+        acquire_timeout: Optional[float] = 120.0,
+    ):
+        """
+        Args:
+            server_parameters: ``StdioServerParameters``, or a dict with ``url`` and
+                ``transport`` for an HTTP server
+            size: Sessions kept open, and so requests served at once
+            health_interval: Seconds between pings of idle sessions; 0 disables them
+            connect_timeout: Seconds to wait for a session's server to start
+            call_timeout: Seconds to wait for any single MCP request
+            acquire_timeout: Seconds a request waits for a free session (None waits forever)
+        """
+        if size < 1:
+            raise ValueError("size must be at least 1")
+        self.size = size
+        self.health_interval = health_interval
+        self.acquire_timeout = acquire_timeout
+
+        self._sessions = [MCPSession(server_parameters, connect_timeout, call_timeout) for _ in range(size)]
+        self._idle: Deque[MCPSession] = deque(self._sessions)
+        self._lock = threading.Lock()
+        self._available = threading.Semaphore(size)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.connects = 0
+        self.restarts = 0
+        self.failures = 0
+        self.requests = 0
+        self.waited = 0
+        self.last_error: Optional[str] = None
+        self._wait_seconds = 0.0
+
+    def _take(self, timeout: Optional[float]) -> Optional[MCPSession]:
+        if not self._available.acquire(timeout=timeout):
+            return None
+        with self._lock:
+            return self._idle.popleft()
+
+    def _give_back(self, session: MCPSession) -> None:
+        with self._lock:
+            self._idle.append(session)
+        self._available.release()
+
+    def _ensure_connected(self, session: MCPSession) -> None:
+        if session.alive:
+            return
+        if session.connections:
+            self.restarts += 1
+        session.close()
+        start = time.perf_counter()
+        try:
+            session.connect()
+        except Exception as e:
+            self.failures += 1
+            self.last_error = f"{type(e).__name__}: {e}"
+            logger.error(f"Could not connect an MCP session: {e}")
+            raise
+        self.connects += 1
+        logger.info(
+            f"MCP session connected with {len(session.tools)} tools in {(time.perf_counter() - start) * 1000:.0f} ms"
+        )
+
+    @contextmanager
+    def session(self) -> Iterator[MCPSession]:
+        """
+        Borrow a connected session for the duration of a request.
+
+        A session whose connection failed during the request is closed when
+        it is returned, and reconnected before it is lent again.
+
+        Yields:
+            MCPSession: A connected session; use its ``tools``
+
+        Raises:
+            TimeoutError: If no session frees up within ``acquire_timeout``
+        """
+        start = time.perf_counter()
+        session = self._take(timeout=0)
+        if session is None:
+            self.waited += 1
+            session = self._take(self.acquire_timeout)
+            if session is None:
+                raise TimeoutError(f"All {self.size} MCP sessions are busy")
+        self._wait_seconds += time.perf_counter() - start
+        self.requests += 1
+        try:
+            self._ensure_connected(session)
+            yield session
+        finally:
+            if session.broken:
+                logger.warning("MCP session failed during a request, closing it")
+                session.close()
+            self._give_back(session)
+
+    def check(self) -> None:
+        """Ping each idle session once, reconnecting the ones that don't answer."""
+        for _ in range(self.size):
+            session = self._take(timeout=0)
+            if session is None:
+                # The rest are lent out, which checks them.
+                return
+            try:
+                if session.connected_at is not None and not session.ping():
+                    logger.warning("MCP session stopped answering, restarting it")
+                    session.close()
+                self._ensure_connected(session)
+            except Exception:
+                # Logged and counted; the next borrower or check tries again.
+                pass
+            finally:
+                self._give_back(session)
+
+    def _watch(self) -> None:
+        # Connect every session up front, then keep them healthy.
+        self.check()
+        while not self._stop.wait(self.health_interval or None):
+            self.check()
+
+    def start(self) -> None:
+        """Connect the sessions and start health checks from a daemon thread (no-op if started)."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, name="mcp-session-pool", daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        """Stop health checks and close every session."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        for session in self._sessions:
+            session.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Report pool occupancy and session churn.
+
+        Returns:
+            Dict[str, Any]: Size, connected and idle sessions, requests served, how many
+                waited for a session and the mean wait, connects, restarts, failures and
+                the last connection error
+        """
+        return dict(
+            size=self.size,
+            connected=sum(session.alive for session in self._sessions),
+            idle=len(self._idle),
+            requests=self.requests,
+            waited=self.waited,
+            mean_wait_ms=round(self._wait_seconds * 1000 / self.requests, 2) if self.requests else 0.0,
+            connects=self.connects,
+            restarts=self.restarts,
+            failures=self.failures,
+            last_error=self.last_error,
+        )
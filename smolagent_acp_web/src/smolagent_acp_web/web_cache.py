@@ -0,0 +1,526 @@
+"""
+Disk-backed cache for web searches and fetched pages.
+
+Every ``health_agent`` run searches DuckDuckGo and visits pages from
+scratch, so common questions re-run the same searches and re-download the
+same Mayo Clinic or NHS pages. ``WebCache`` keeps what those calls produce
+in one SQLite file:
+
+* search results, normalized to title/href/body records and keyed by the
+  normalized query (case and whitespace folded);
+* page text, keyed by normalized URL and by what the page was converted to
+  (markdown for ``visit_webpage``, trafilatura text for
+  ``HealthContentExtractor``), along with the page's ``ETag`` and
+  ``Last-Modified`` headers.
+
+Entries are fresh for a TTL. After that a page is revalidated with a
+conditional GET; a 304 keeps the stored text without downloading or
+re-extracting the page. When the file outgrows ``max_bytes`` the least
+recently used entries are evicted. If a fetch fails, a stale copy is served
+rather than an error.
+
+``stats()`` reports lookups, hits, revalidations and the bytes that were
+not downloaded, by kind of entry.
+"""
+
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, NamedTuple, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+import requests
+from smolagents import DuckDuckGoSearchTool, VisitWebpageTool
+
+logger = logging.getLogger(__name__)
+
+# How long entries stay fresh before they are fetched (or revalidated) again.
+SEARCH_TTL = 24 * 3600
+PAGE_TTL = 6 * 3600
+
+# Seconds to wait for a page.
+FETCH_TIMEOUT = 20
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    source_bytes INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    expires_at REAL NOT NULL,
+    used_at REAL NOT NULL,
+    PRIMARY KEY (kind, key)
+);
+CREATE INDEX IF NOT EXISTS entries_used_at ON entries (used_at);
+"""
+
+
+class CacheEntry(NamedTuple):
+    """A stored value and what is needed to revalidate it."""
+
+    value: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    source_bytes: int
+    expires_at: float
+
+    @property
+    def fresh(self) -> bool:
+        return time.time() < self.expires_at
+
+
+class CacheStats:
+    """
+    Lookup counters of one kind of entry.
+
+    Agent runs look pages up from several threads at once, so counters are
+    only changed through ``count``, which holds the counters' lock.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.hits = 0
+        self.revalidated = 0
+        self.stale_served = 0
+        self.bytes_saved = 0
+        self.bytes_fetched = 0
+
+    def count(self, **increments: int) -> None:
+        """
+        Add to counters in one step.
+
+        Args:
+            **increments: Amount to add, by counter name (e.g. ``lookups=1, hits=1``)
+        """
+        with self._lock:
+            for name, amount in increments.items():
+                setattr(self, name, getattr(self, name) + amount)
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Summarize the counters.
+
+        Returns:
+            Dict[str, Any]: Lookups, fresh hits, 304 revalidations, stale copies served
+                after a failed fetch, hit ratio (hits and revalidations over lookups), and
+                bytes not downloaded and downloaded
+        """
+        with self._lock:
+            return dict(
+                lookups=self.lookups,
+                hits=self.hits,
+                revalidated=self.revalidated,
+                stale_served=self.stale_served,
+                hit_ratio=round((self.hits + self.revalidated) / self.lookups, 3) if self.lookups else 0.0,
+                bytes_saved=self.bytes_saved,
+                bytes_fetched=self.bytes_fetched,
+            )
+
+
+def normalize_query(query: str) -> str:
+    """
+    Fold case and whitespace so equivalent searches share an entry.
+
+    Args:
+        query: Search query as written
+
+    Returns:
+        str: Normalized query ("Symptoms of  Diabetes " -> "symptoms of diabetes")
+    """
+    return " ".join(query.casefold().split())
+
+
+def normalize_url(url: str) -> str:
+    """
+    Canonicalize a URL for use as a cache key.
+
+    Args:
+        url: Page URL
+
+    Returns:
+        str: The URL with lower-case scheme and host, no default port and no fragment
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and (scheme, parts.port) not in (("http", 80), ("https", 443)):
+        host = f"{host}:{parts.port}"
+    if parts.username:
+        host = f"{parts.username}@{host}"
+    return urlunsplit((scheme, host, parts.path or "/", parts.query, ""))
+
+
+class WebCache:
+    """
+    Search results and page text in a size-bounded SQLite file.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 256 * 1024 * 1024):
+        """
+        Args:
+            path: SQLite file to keep entries in (created with its directory if missing)
+            max_bytes: Total size of stored values above which the least recently used are evicted
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        # Agent runs use the cache from several threads; one connection, serialized by the lock.
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self._bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        self._stats: Dict[str, CacheStats] = {}
+        self.evictions = 0
+
+    def counters(self, kind: str) -> CacheStats:
+        """
+        Lookup counters of one kind of entry, for callers to update with ``CacheStats.count``.
+
+        Args:
+            kind: Kind of entry ("search", "page_markdown", "page_text", ...)
+
+        Returns:
+            CacheStats: The kind's counters
+        """
+        with self._lock:
+            return self._stats.setdefault(kind, CacheStats())
+
+    def get(self, kind: str, key: str) -> Optional[CacheEntry]:
+        """
+        Look up an entry, fresh or not, and mark it recently used.
+
+        Args:
+            kind: Kind of entry
+            key: Normalized key
+
+        Returns:
+            Optional[CacheEntry]: The entry, or None if there is none
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value, etag, last_modified, source_bytes, expires_at FROM entries WHERE kind = ? AND key = ?",
+                (kind, key),
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE entries SET used_at = ? WHERE kind = ? AND key = ?", (time.time(), kind, key))
+        return CacheEntry(*row)
+
+    def put(
+        self,
+        kind: str,
+        key: str,
+        value: str,
+        ttl: float,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        source_bytes: int = 0,
+    ) -> None:
+        """
+        Store an entry, evicting least recently used ones if the cache is over size.
+
+        Args:
+            kind: Kind of entry
+            key: Normalized key
+            value: Text to store
+            ttl: Seconds the entry stays fresh
+            etag: ``ETag`` of the page it came from
+            last_modified: ``Last-Modified`` of the page it came from
+            source_bytes: Bytes downloaded to produce it (counted as saved on each hit)
+        """
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock:
+            old = self._db.execute("SELECT size FROM entries WHERE kind = ? AND key = ?", (kind, key)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (kind, key, value, etag, last_modified, source_bytes, size, now + ttl, now),
+            )
+            self._bytes += size - (old[0] if old else 0)
+            if self._bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        rows = self._db.execute("SELECT kind, key, size FROM entries ORDER BY used_at").fetchall()
+        doomed = []
+        for kind, key, size in rows:
+            if self._bytes <= self.max_bytes:
+                break
+            doomed.append((kind, key))
+            self._bytes -= size
+        self._db.executemany("DELETE FROM entries WHERE kind = ? AND key = ?", doomed)
+        self.evictions += len(doomed)
+
+    def refresh(self, kind: str, key: str, ttl: float, etag: Optional[str] = None, last_modified: Optional[str] = None) -> None:
+        """
+        Make a revalidated entry fresh again, keeping its value.
+
+        Args:
+            kind: Kind of entry
+            key: Normalized key
+            ttl: Seconds the entry stays fresh from now
+            etag: New ``ETag``, if the 304 carried one
+            last_modified: New ``Last-Modified``, if the 304 carried one
+        """
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "UPDATE entries SET expires_at = ?, used_at = ?, etag = COALESCE(?, etag), "
+                "last_modified = COALESCE(?, last_modified) WHERE kind = ? AND key = ?",
+                (now + ttl, now, etag, last_modified, kind, key),
+            )
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Report the cache's size and per-kind hit counters.
+
+        Returns:
+            Dict[str, Any]: Path, entries, stored bytes, limit, evictions, and
+                ``CacheStats.report()`` by kind of entry
+        """
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            stored_bytes, evictions = self._bytes, self.evictions
+            kinds = {kind: counters.report() for kind, counters in self._stats.items()}
+        return dict(
+            path=self.path,
+            entries=entries,
+            bytes=stored_bytes,
+            max_bytes=self.max_bytes,
+            evictions=evictions,
+            kinds=kinds,
+        )
+
+    def close(self) -> None:
+        """Close the SQLite file."""
+        with self._lock:
+            self._db.close()
+
+
+class PageLookup:
+    """
+    One page fetched through the cache, split around the HTTP request itself
+    so that synchronous and asynchronous clients share the cache logic.
+    """
+
+    def __init__(self, cache: WebCache, kind: str, url: str, ttl: float = PAGE_TTL):
+        """
+        Args:
+            cache: Cache to use
+            kind: Kind of entry, naming the conversion (e.g. "page_markdown")
+            url: Page URL
+            ttl: Seconds a stored page stays fresh
+        """
+        self.cache = cache
+        self.kind = kind
+        self.url = url
+        self.ttl = ttl
+        self.key = normalize_url(url)
+        self.counters = cache.counters(kind)
+        self.entry = cache.get(kind, self.key)
+        # The stored text if it is still fresh, so no request is needed.
+        self.cached: Optional[str] = None
+        if self.entry is not None and self.entry.fresh:
+            self.counters.count(lookups=1, hits=1, bytes_saved=self.entry.source_bytes)
+            self.cached = self.entry.value
+        else:
+            self.counters.count(lookups=1)
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        """Conditional request headers revalidating the stored copy, if there is one."""
+        headers = {}
+        if self.entry is not None:
+            if self.entry.etag:
+                headers["If-None-Match"] = self.entry.etag
+            if self.entry.last_modified:
+                headers["If-Modified-Since"] = self.entry.last_modified
+        return headers
+
+    def not_modified(self, response_headers: Any) -> Optional[str]:
+        """
+        Handle a response to the conditional request.
+
+        Args:
+            response_headers: Headers of the response (``requests`` or ``httpx``)
+
+        Returns:
+            Optional[str]: The stored text if the response was a 304 for it, else None
+        """
+        if self.entry is None:
+            return None
+        self.counters.count(revalidated=1, bytes_saved=self.entry.source_bytes)
+        self.cache.refresh(self.kind, self.key, self.ttl, response_headers.get("ETag"), response_headers.get("Last-Modified"))
+        return self.entry.value
+
+    def failed(self, error: Exception) -> str:
+        """
+        Fall back to the stored copy after a failed fetch.
+
+        Args:
+            error: Why the fetch failed
+
+        Returns:
+            str: The stored text, however old
+
+        Raises:
+            Exception: ``error``, if there is no stored copy
+        """
+        if self.entry is None:
+            raise error
+        logger.warning(f"Fetching {self.url} failed, serving the stored copy: {error}")
+        self.counters.count(stale_served=1)
+        return self.entry.value
+
+    def fetched(self, text: Optional[str], content_bytes: int, response_headers: Any) -> Optional[str]:
+        """
+        Store the text converted from a freshly downloaded page.
+
+        Args:
+            text: Converted text; None if the page couldn't be converted (nothing is stored)
+            content_bytes: Size of the downloaded body
+            response_headers: Headers of the response, for its validators
+
+        Returns:
+            Optional[str]: ``text``
+        """
+        self.counters.count(bytes_fetched=content_bytes)
+        if text is not None:
+            self.cache.put(
+                self.kind,
+                self.key,
+                text,
+                self.ttl,
+                etag=response_headers.get("ETag"),
+                last_modified=response_headers.get("Last-Modified"),
+                source_bytes=content_bytes,
+            )
+        return text
+
+
+def fetch_page(
+    cache: WebCache,
+    kind: str,
+    url: str,
+    convert: Callable[[str], Optional[str]],
+    ttl: float = PAGE_TTL,
+    timeout: float = FETCH_TIMEOUT,
+) -> Optional[str]:
+    """
+    Fetch and convert a page through the cache.
+
+    A fresh entry is returned as is; an expired one is revalidated with
+    ``If-None-Match``/``If-Modified-Since`` and kept on a 304. Otherwise the
+    page is downloaded, converted and stored.
+
+    Args:
+        cache: Cache to use
+        kind: Kind of entry, naming the conversion (e.g. "page_markdown")
+        url: Page URL
+        convert: Turns the page's HTML into the text to return and store; None if it can't
+        ttl: Seconds a stored page stays fresh
+        timeout: Seconds to wait for the page
+
+    Returns:
+        Optional[str]: Converted text, or None if ``convert`` returned None
+
+    Raises:
+        requests.RequestException: If the page can't be fetched and there is no stored copy
+    """
+    lookup = PageLookup(cache, kind, url, ttl)
+    if lookup.cached is not None:
+        return lookup.cached
+    try:
+        response = requests.get(url, headers=lookup.headers, timeout=timeout)
+        if response.status_code == 304 and lookup.entry is not None:
+            return lookup.not_modified(response.headers)
+        response.raise_for_status()
+    except requests.RequestException as e:
+        return lookup.failed(e)
+    return lookup.fetched(convert(response.text), len(response.content), response.headers)
+
+
+class CachedDuckDuckGoSearchTool(DuckDuckGoSearchTool):
+    """
+    ``DuckDuckGoSearchTool`` that answers repeated searches from a ``WebCache``.
+    """
+
+    def __init__(self, cache: WebCache, ttl: float = SEARCH_TTL, **kwargs):
+        """
+        Args:
+            cache: Cache to keep results in
+            ttl: Seconds results stay fresh
+            **kwargs: ``DuckDuckGoSearchTool`` arguments (max_results, rate_limit, ...)
+        """
+        super().__init__(**kwargs)
+        self.cache = cache
+        self.ttl = ttl
+
+    def forward(self, query: str) -> str:
+        counters = self.cache.counters("search")
+        key = f"{self.max_results}:{normalize_query(query)}"
+        entry = self.cache.get("search", key)
+        if entry is not None and entry.fresh:
+            counters.count(lookups=1, hits=1, bytes_saved=entry.source_bytes)
+            results = json.loads(entry.value)
+        else:
+            counters.count(lookups=1)
+            self._enforce_rate_limit()
+            results = [
+                dict(title=result.get("title", ""), href=result.get("href", ""), body=result.get("body", ""))
+                for result in self.ddgs.text(query, max_results=self.max_results)
+            ]
+            value = json.dumps(results)
+            counters.count(bytes_fetched=len(value))
+            if results:
+                self.cache.put("search", key, value, self.ttl, source_bytes=len(value))
+        if len(results) == 0:
+            raise Exception("No results found! Try a less restrictive/shorter query.")
+        postprocessed_results = [f"[{result['title']}]({result['href']})\n{result['body']}" for result in results]
+        return "## Search Results\n\n" + "\n\n".join(postprocessed_results)
+
+
+def _to_markdown(html: str) -> str:
+    from markdownify import markdownify
+
+    return re.sub(r"\n{3,}", "\n\n", markdownify(html).strip())
+
+
+class CachedVisitWebpageTool(VisitWebpageTool):
+    """
+    ``VisitWebpageTool`` that keeps pages' markdown in a ``WebCache`` and revalidates it.
+    """
+
+    def __init__(self, cache: WebCache, ttl: float = PAGE_TTL, max_output_length: int = 40000):
+        """
+        Args:
+            cache: Cache to keep pages in
+            ttl: Seconds a page stays fresh before it is revalidated
+            max_output_length: Characters returned to the agent (longer pages are truncated)
+        """
+        super().__init__(max_output_length=max_output_length)
+        self.cache = cache
+        self.ttl = ttl
+
+    def forward(self, url: str) -> str:
+        try:
+            markdown_content = fetch_page(self.cache, "page_markdown", url, _to_markdown, ttl=self.ttl)
+            return self._truncate_content(markdown_content, self.max_output_length)
+        except requests.exceptions.Timeout:
+            return "The request timed out. Please try again later or check the URL."
+        except requests.RequestException as e:
+            return f"Error fetching the webpage: {str(e)}"
+        except Exception as e:
+            return f"An unexpected error occurred: {str(e)}"
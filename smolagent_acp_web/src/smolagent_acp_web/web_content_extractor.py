@@ -3,20 +3,66 @@ Web Content Extractor for Health Information
 Enhanced content extraction and processing for health-related web content.
 """
 
+import asyncio
 import logging
 import re
-from typing import List, Dict, Optional
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Iterable, List, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
 import trafilatura
 
+from .extraction_pool import ExtractionPool, get_extraction_pool
+from .web_cache import PageLookup, WebCache, fetch_page
+
 logger = logging.getLogger(__name__)
 
+# Limits of the shared client used by the async batch API
+MAX_CONNECTIONS = 32
+MAX_CONNECTIONS_PER_HOST = 4
+FETCH_TIMEOUT = 20.0
+CONNECT_TIMEOUT = 5.0
+
+class _HostSlots:
+    """Requests allowed to one host at once, and how many requests hold or wait for one."""
+
+    def __init__(self, limit: int):
+        self.semaphore = asyncio.Semaphore(limit)
+        self.users = 0
+
 class HealthContentExtractor:
     """
     Enhanced content extractor specifically designed for health information.
     """
     
-    def __init__(self):
-        """Initialize the health content extractor."""
+    def __init__(
+        self,
+        cache: Optional[WebCache] = None,
+        max_connections: int = MAX_CONNECTIONS,
+        max_connections_per_host: int = MAX_CONNECTIONS_PER_HOST,
+        timeout: float = FETCH_TIMEOUT,
+        extraction_pool: Optional[ExtractionPool] = None,
+    ):
+        """
+        Initialize the health content extractor.
+        
+        Args:
+            cache: Keeps extracted page text between calls (and revalidates it); None fetches every time
+            max_connections: Connections the async batch API keeps open at most
+            max_connections_per_host: Requests the async batch API sends to one host at once
+            timeout: Seconds the async batch API waits for a page
+            extraction_pool: Worker processes running trafilatura; None uses the process-wide pool
+        """
+        self.cache = cache
+        self.extraction_pool = extraction_pool or get_extraction_pool()
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self.timeout = timeout
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+        # Only hosts with a request in flight or waiting, so the dict doesn't grow with every host seen.
+        self._host_slots: Dict[str, _HostSlots] = {}
         self.trusted_health_sources = [
             'mayoclinic.org', 'webmd.com', 'healthline.com', 'medlineplus.gov',
             'nih.gov', 'cdc.gov', 'who.int', 'nhs.uk', 'clevelandclinic.org',
@@ -45,14 +91,18 @@ class HealthContentExtractor:
             str: Extracted text content from the website
         """
         try:
-            # Send a request to the website
-            downloaded = trafilatura.fetch_url(url)
-            if downloaded is None:
-                logger.warning(f"Failed to download content from {url}")
-                return f"Unable to access content from {url}"
-            
-            # Extract text content
-            text = trafilatura.extract(downloaded)
+            if self.cache is not None:
+                # Only a new or changed page is downloaded and extracted again
+                text = fetch_page(self.cache, "page_text", url, self.extraction_pool.extract)
+            else:
+                # Send a request to the website
+                downloaded = trafilatura.fetch_url(url)
+                if downloaded is None:
+                    logger.warning(f"Failed to download content from {url}")
+                    return f"Unable to access content from {url}"
+                
+                # Extract text content in a worker process
+                text = self.extraction_pool.extract(downloaded)
             if text is None:
                 logger.warning(f"Failed to extract text from {url}")
                 return f"Unable to extract readable content from {url}"
@@ -67,6 +117,145 @@ class HealthContentExtractor:
             logger.error(f"Error extracting content from {url}: {e}")
             return f"Error accessing {url}: {str(e)}"
     
+    def _async_client(self) -> httpx.AsyncClient:
+        """
+        Get the shared HTTP client of the current event loop, creating it on first use.
+        
+        Returns:
+            httpx.AsyncClient: Pooled client reused by every batch on this loop
+        """
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client_loop is not loop:
+            # A client (and its connections) belongs to the loop it was first used on.
+            self._client = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_connections),
+                timeout=httpx.Timeout(self.timeout, connect=min(CONNECT_TIMEOUT, self.timeout)),
+                follow_redirects=True,
+            )
+            self._client_loop = loop
+            self._host_slots = {}
+        return self._client
+    
+    @asynccontextmanager
+    async def _host_slot(self, host: str) -> AsyncIterator[None]:
+        """
+        Hold one of a host's ``max_connections_per_host`` request slots.
+        
+        Args:
+            host: Host the request goes to
+        """
+        slots = self._host_slots.get(host)
+        if slots is None:
+            slots = self._host_slots[host] = _HostSlots(self.max_connections_per_host)
+        slots.users += 1
+        try:
+            async with slots.semaphore:
+                yield
+        finally:
+            slots.users -= 1
+            # The last user drops the host's slots (unless the client, and its slots, were replaced).
+            if not slots.users and self._host_slots.get(host) is slots:
+                del self._host_slots[host]
+    
+    async def _fetch_text_content(self, client: httpx.AsyncClient, url: str) -> str:
+        """
+        Fetch and extract one page for the async batch API.
+        
+        Args:
+            client: Shared HTTP client
+            url: The URL to extract content from
+            
+        Returns:
+            str: Extracted text content, or a message saying why there is none
+        """
+        loop = asyncio.get_running_loop()
+        lookup = None
+        try:
+            # The cache is a SQLite file: its reads and writes run on the executor, not the event loop
+            if self.cache is not None:
+                lookup = await loop.run_in_executor(None, PageLookup, self.cache, "page_text", url)
+            if lookup is not None and lookup.cached is not None:
+                text = lookup.cached
+            else:
+                host = urlsplit(url).netloc.lower()
+                try:
+                    async with self._host_slot(host):
+                        response = await client.get(url, headers=lookup.headers if lookup is not None else None)
+                    if response.status_code == 304 and lookup is not None and lookup.entry is not None:
+                        text = await loop.run_in_executor(None, lookup.not_modified, response.headers)
+                    else:
+                        response.raise_for_status()
+                        # Extract in a worker process, waiting off the event loop so other pages keep
+                        # downloading; the raw bytes are sent and trafilatura detects their encoding
+                        text = await loop.run_in_executor(None, self.extraction_pool.extract, response.content)
+                        if lookup is not None:
+                            await loop.run_in_executor(
+                                None, lookup.fetched, text, len(response.content), response.headers
+                            )
+                except httpx.HTTPError as e:
+                    if lookup is None:
+                        raise
+                    text = lookup.failed(e)
+            
+            if text is None:
+                logger.warning(f"Failed to extract text from {url}")
+                return f"Unable to extract readable content from {url}"
+            
+            enhanced_text = self._enhance_health_content(text, url)
+            logger.info(f"Successfully extracted {len(enhanced_text)} characters from {url}")
+            return enhanced_text
+            
+        except Exception as e:
+            logger.error(f"Error extracting content from {url}: {e}")
+            return f"Error accessing {url}: {str(e)}"
+    
+    async def iter_website_text_content(self, urls: Iterable[str]) -> AsyncIterator[Tuple[str, str]]:
+        """
+        Fetch many URLs concurrently and yield each page's text as soon as it is extracted.
+        
+        Pages are downloaded over one pooled client, at most ``max_connections_per_host``
+        at a time from any one host, and go through the cache like
+        ``get_website_text_content``. Stopping the iteration cancels the remaining fetches.
+        
+        Args:
+            urls: The URLs to extract content from (duplicates are fetched once)
+            
+        Yields:
+            Tuple[str, str]: (url, extracted text or error message), in completion order
+        """
+        client = self._async_client()
+        tasks = {asyncio.ensure_future(self._fetch_text_content(client, url)): url for url in dict.fromkeys(urls)}
+        pending = set(tasks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield tasks[task], task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+    
+    async def get_websites_text_content(self, urls: Iterable[str]) -> Dict[str, str]:
+        """
+        Fetch many URLs concurrently and return all their texts.
+        
+        Args:
+            urls: The URLs to extract content from
+            
+        Returns:
+            Dict[str, str]: Extracted text content (or error message) by URL, in input order
+        """
+        urls = list(dict.fromkeys(urls))
+        results = {url: text async for url, text in self.iter_website_text_content(urls)}
+        return {url: results[url] for url in urls}
+    
+    async def aclose(self) -> None:
+        """Close the shared HTTP client of the async batch API."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._client_loop = None
+    
     def _enhance_health_content(self, content: str, url: str) -> str:
         """
         Enhance extracted health content with additional context and validation.